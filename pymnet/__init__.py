@@ -23,6 +23,8 @@ from .isomorphisms import (
 )
 from .models import (
     conf,
+    conf_ensemble,
+    ensemble,
     er,
     er_multilayer,
     er_partially_interconnected,
@@ -31,10 +33,17 @@ from .models import (
     single_layer_conf,
     single_layer_er,
 )
-from .net import MultilayerNetwork, MultiplexNetwork
+from .net import (
+    CSRMultilayerNetwork,
+    MultilayerNetwork,
+    MultiplexNetwork,
+    SubnetView,
+)
 from .netio import (
+    read_binary,
     read_edge_file,
     read_ucinet,
+    write_binary,
     write_edge_file,
     write_edge_files,
     write_json,
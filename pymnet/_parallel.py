@@ -0,0 +1,92 @@
+"""Helpers for running computations in pools of worker processes."""
+
+import multiprocessing
+import os
+import sys
+
+
+def _pool_context():
+    """Returns the multiprocessing context used for the worker pools.
+
+    The workers are forked where it is safe, so that they get the arguments of
+    the computation without pickling. On macOS forking is unsafe with the system
+    frameworks and threads, and the platform default (spawn) is used instead, as
+    it is on the platforms that do not support forking at all.
+    """
+    if sys.platform != "darwin" and "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+
+def _worker_pool(workers, initializer=None, initargs=(), context=None):
+    """Starts a pool of worker processes.
+
+    The workers that are not forked start new interpreters, whose string hashes
+    would otherwise be randomized independently of each other. They are started
+    with a fixed PYTHONHASHSEED, unless one is already set, such that sets of
+    strings are iterated in the same order in all of the workers and in every
+    run. Results that depend on the iteration order, e.g., the samples drawn
+    with a seed, are then reproducible for any number of workers.
+
+    The arguments of the pool must be picklable when the workers are not
+    forked.
+    """
+    if context is None:
+        context = _pool_context()
+    if context.get_start_method() == "fork" or "PYTHONHASHSEED" in os.environ:
+        return context.Pool(workers, initializer=initializer, initargs=initargs)
+    os.environ["PYTHONHASHSEED"] = "0"
+    try:
+        return context.Pool(workers, initializer=initializer, initargs=initargs)
+    finally:
+        del os.environ["PYTHONHASHSEED"]
+
+
+# The arguments of the computation, set in each worker process by _init_worker
+_worker_args = None
+
+
+def _init_worker(args):
+    global _worker_args
+    _worker_args = args
+
+
+def _call_in_worker(task):
+    # Runs function(args, chunk) with the arguments given to the worker
+    function, chunk = task
+    return function(_worker_args, chunk)
+
+
+def _map_chunks(function, args, chunks, workers=None, progress=None):
+    """Returns the list of function(args, chunk) for each of the chunks.
+
+    If workers is given, the chunks are computed in a pool of this many worker
+    processes, which are given the arguments once when they are started. The
+    function must then be defined at the top level of a module, such that it
+    can be pickled.
+
+    If progress is given, it is called after each chunk with the total length
+    of the chunks computed so far.
+    """
+    if workers is None:
+        pool = None
+        results = (function(args, chunk) for chunk in chunks)
+    else:
+        pool = _worker_pool(workers, initializer=_init_worker, initargs=(args,))
+        results = pool.imap(_call_in_worker, [(function, chunk) for chunk in chunks])
+    values = []
+    done = 0
+    try:
+        for chunk, chunkValues in zip(chunks, results):
+            values.append(chunkValues)
+            done += len(chunk)
+            if progress is not None:
+                progress(done)
+    except BaseException:
+        if pool is not None:
+            pool.terminate()
+        raise
+    if pool is not None:
+        pool.close()
+        pool.join()
+    return values
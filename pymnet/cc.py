@@ -7,6 +7,16 @@ from . import transforms
 from .net import MultiplexNetwork
 
 
+def _get_anet(net, anet=None):
+    """Returns anet, or the aggregated network of net if anet is None. The
+    aggregated network is cached in net until the network is modified."""
+    if anet is None:
+        anet = net.get_derived(
+            ("aggregate", 1), lambda net: transforms.aggregate(net, 1)
+        )
+    return anet
+
+
 def cc_num_den(net, node):
     degree = net[node].deg()
     t = 0
@@ -160,7 +170,7 @@ def cc_barrat(net, node, undefReturn=0.0):
         return undefReturn
 
 
-def cc_barrett_optimized(net, node, anet, undefReturn=0.0):
+def cc_barrett_optimized(net, node, anet=None, undefReturn=0.0):
     r"""Multiplex clustering coefficient defined by Barrett et al.
 
     See SI of "Taking sociality seriously: the structure of multi-dimensional
@@ -169,7 +179,11 @@ def cc_barrett_optimized(net, node, anet, undefReturn=0.0):
     August 2012 vol. 367 no. 1599 2108-2118
 
     \frac{\sum_j^n \sum_h^n \sum_k^b ( a_{ijk} \sum_l^b (a_{ihl} \sum_m^b a_{jhm} ) )} {\sum_j^n \sum_h^n \sum_k^b (a_{ijk} \sum_l^b \max(a_{ihl},a_{jhl}) )}
+
+    If the aggregated network anet is not given, the one cached in the network
+    is used.
     """
+    anet = _get_anet(net, anet)
     degree = anet[node].deg()
     if degree >= 2:
         nom, den = 0, 0
@@ -202,7 +216,7 @@ def cc_barrett_optimized(net, node, anet, undefReturn=0.0):
         return undefReturn
 
 
-def cc_barrett(net, node, anet, undefReturn=0.0):
+def cc_barrett(net, node, anet=None, undefReturn=0.0):
     r"""Barrett's local clustering coefficient of a node in multiplex network.
 
     The clustering coefficient for node i is given by formula:
@@ -212,7 +226,13 @@ def cc_barrett(net, node, anet, undefReturn=0.0):
     References
     ----------
     See SI of "Taking sociality seriously: the structure of multi-dimensional social networks as a source of information for individuals.", Louise Barrett, S. Peter Henzi, David Lusseau, Phil. Trans. R. Soc. B 5 August 2012 vol. 367 no. 1599 2108-2118
+
+    Notes
+    -----
+    If the aggregated network anet is not given, the one cached in the network
+    is used.
     """
+    anet = _get_anet(net, anet)
     degree = anet[node].deg()
     if degree >= 2:
         nom, den = 0, 0
@@ -327,7 +347,7 @@ def gcc_super_graph(net):
         return None
 
 
-def elementary_cycles(net, node=None, layer=None, anet=None):
+def elementary_cycles(net, node=None, layer=None, anet=None, method="auto"):
     """Returns the elementary 3-cycle counts in a multiplex network.
 
     Parameters
@@ -338,6 +358,14 @@ def elementary_cycles(net, node=None, layer=None, anet=None):
        The focal node. Given as node index in the network.
     layer : any object
        The focal layer. Given as layer index in the network.
+    anet : MultilayerNetwork
+       The aggregated network, used with method 'anet'.
+    method : str
+       'bf' counts the cycles of each node-layer by walking its neighborhood,
+       'anet' uses the aggregated network and works only for fully
+       interconnected networks, and 'sparse' uses sparse matrix products, see
+       elementary_cycles_all. 'auto' uses 'bf' for single node-layers and
+       'sparse' when node is None.
 
     Returns
     -------
@@ -351,13 +379,36 @@ def elementary_cycles(net, node=None, layer=None, anet=None):
     "Clustering Coefficients in Multiplex Networks", E. Cozzo et al. , arXiv:1307.6780 [physics.soc-ph]
 
     """
-    if node != None and layer != None:
-        return cc_cycle_vector_bf(net, node, layer)
+    if method == "auto":
+        if node != None and layer != None:
+            method = "bf"
+        elif node == None:
+            method = "sparse"
+        elif net.fullyInterconnected and anet != None:
+            method = "anet"
+        else:
+            method = "bf"
+    if method not in ["bf", "anet", "sparse"]:
+        raise ValueError("Invalid method: '" + str(method) + "'")
+    if method == "anet" and not net.fullyInterconnected:
+        raise ValueError("Method 'anet' works only for fully interconnected networks.")
+
+    if method == "sparse":
+        if node == None and layer == None:
+            nodelayers = None
+        else:
+            nodelayers = [
+                nl
+                for nl in net.iter_node_layers()
+                if (node == None or nl[0] == node) and (layer == None or nl[1] == layer)
+            ]
+        nodelayers, cycles = elementary_cycles_all(net, nodelayers)
+        return tuple(int(x) for x in cycles.sum(axis=0))
+
     sums = [0 for i in range(10)]
     nodes = list(net) if node == None else [node]
-    if net.fullyInterconnected and (anet != None or node == None):
-        if anet == None:
-            anet = transforms.aggregate(net, 1)
+    if method == "anet":
+        anet = _get_anet(net, anet)
         for n in nodes:
             sums = map(
                 lambda x, y: x + y,
@@ -372,6 +423,151 @@ def elementary_cycles(net, node=None, layer=None, anet=None):
     return tuple(sums)
 
 
+def elementary_cycles_all(net, nodelayers=None):
+    """Returns the elementary 3-cycle counts of all node-layers in a multiplex
+    network.
+
+    The counts are the diagonals of the products of the intra-layer adjacency
+    matrix A, coupling matrix C and full intra-layer matrix F of the
+    supra-graph, computed with sparse matrices for all node-layers at once.
+    They are equal to the counts given by elementary_cycles for each
+    node-layer pair.
+
+    Parameters
+    ----------
+    net : MultiplexNetwork with aspects=1
+       The input network.
+    nodelayers : list of tuples, None
+       The node-layer pairs (node, layer) for which the cycles are counted. If
+       None, all the node-layers of the network are used. Only the rows of
+       the products for these node-layers are computed, so the memory use
+       depends on their neighborhoods instead of the whole network.
+
+    Returns
+    -------
+    nodelayers : list of tuples
+       The node-layer pairs (node, layer).
+    cycles : numpy.ndarray
+       Array of shape (len(nodelayers), 10), where row i contains the
+       elementary cycles around nodelayers[i] in the following order:
+       aaa,aacac,acaac,acaca,acacac,afa,afcac,acfac,acfca,acfcac
+
+    References
+    ----------
+    "Clustering Coefficients in Multiplex Networks", E. Cozzo et al. , arXiv:1307.6780 [physics.soc-ph]
+
+    See also
+    --------
+    elementary_cycles : The elementary cycles of a single node-layer pair.
+    """
+    import numpy
+    import scipy.sparse
+
+    assert isinstance(net, MultiplexNetwork)
+    assert net.aspects == 1
+
+    all_nodelayers, a, c, nl_layers = net.get_derived("aw_matrices", _aw_matrices)
+    if nodelayers is None:
+        nodelayers = all_nodelayers
+        rows = numpy.arange(len(all_nodelayers))
+    else:
+        nodelayers = list(nodelayers)
+        index = dict((nl, i) for i, nl in enumerate(all_nodelayers))
+        rows = numpy.array([index[nl] for nl in nodelayers], dtype=numpy.int64)
+    n, m = len(all_nodelayers), len(rows)
+
+    def diagonal(x, y):
+        # Diagonal of the product x*y for symmetric y, given the selected rows
+        # of both, i.e. the row sums of the elementwise product
+        return numpy.asarray(x.multiply(y).sum(axis=1)).ravel()
+
+    layer_matrix = scipy.sparse.csr_matrix(
+        (numpy.ones(n, dtype=numpy.int64), (numpy.arange(n), nl_layers)),
+        shape=(n, len(net.slices[1])),
+    )
+
+    # Selected rows of the products, all matrices are symmetric except AC
+    # and CA, which are transposes of each other
+    a_r = a[rows]
+    c_r = c[rows]
+    aa_r = a_r @ a
+    ac_r = a_r @ c
+    ca_r = c_r @ a
+    aca_r = ac_r @ a
+    cac_r = ca_r @ c
+    cacl_r = cac_r @ layer_matrix
+
+    aaa = diagonal(a_r, aa_r)
+    aacac = diagonal(aa_r, cac_r)
+    acaac = diagonal(aca_r, ca_r)
+    acaca = diagonal(ac_r, aca_r)
+    acacac = diagonal(aca_r, cac_r)
+
+    k_all = numpy.asarray(a.sum(axis=1)).ravel()
+    k = k_all[rows]
+    afa = k * (k - 1)
+    # Walks through C*A*C that return to the layer of the node-layer
+    cac_same_layer = numpy.asarray(cacl_r[numpy.arange(m), nl_layers[rows]]).ravel()
+    afcac = k * cac_same_layer - diagonal(a_r, cac_r)
+
+    if net.fullyInterconnected:
+        b = len(net.slices[1])
+        acfca = afa * (b - 1)
+        acfac = afcac
+        acfcac = afcac * (b - 2)
+    else:
+        # F connects all different nodes within a layer, so its products are
+        # sums over the layers minus the terms where the nodes are the same
+        acl_r = ac_r @ layer_matrix
+        ckl_r = c_r @ scipy.sparse.diags(k_all, dtype=numpy.int64) @ layer_matrix
+        acfac = diagonal(acl_r, ckl_r) - diagonal(ac_r, ca_r)
+        acfca = diagonal(acl_r, acl_r) - diagonal(ac_r, ac_r)
+        acfcac = diagonal(acl_r, cacl_r) - diagonal(ac_r, cac_r)
+
+    cycles = numpy.column_stack(
+        [aaa, aacac, acaac, acaca, acacac, afa, afcac, acfac, acfca, acfcac]
+    ).reshape((m, 10))
+    return nodelayers, cycles
+
+
+def _aw_matrices(net):
+    """Returns the node-layers of a multiplex network, its binary sparse
+    intra-layer adjacency and coupling matrices in the order of the
+    node-layers, and the indices of the layers of the node-layers."""
+    import numpy
+    import scipy.sparse
+
+    nodelayers = list(net.iter_node_layers())
+    index = dict((nl, i) for i, nl in enumerate(nodelayers))
+    layers = dict((layer, i) for i, layer in enumerate(net.slices[1]))
+    nl_layers = numpy.array([layers[nl[1]] for nl in nodelayers], dtype=numpy.int64)
+    n = len(nodelayers)
+
+    a_rows, a_cols, c_rows, c_cols = [], [], [], []
+    for edge in net.edges:
+        nl1, nl2 = index[edge[0], edge[2]], index[edge[1], edge[3]]
+        if edge[2] == edge[3]:
+            a_rows.extend((nl1, nl2))
+            a_cols.extend((nl2, nl1))
+        elif edge[0] == edge[1]:
+            c_rows.extend((nl1, nl2))
+            c_cols.extend((nl2, nl1))
+
+    def binary_matrix(rows, cols):
+        m = scipy.sparse.csr_matrix(
+            (numpy.ones(len(rows), dtype=numpy.int64), (rows, cols)), shape=(n, n)
+        )
+        m.data[:] = 1
+        return m
+
+    return (
+        nodelayers,
+        binary_matrix(a_rows, a_cols),
+        binary_matrix(c_rows, c_cols),
+        nl_layers,
+    )
+
+
 def cc_cycle_vector_bf(net, node, layer, undefReturn=0.0):
     """Counts all the cycles.
 
@@ -742,13 +938,25 @@ def gcc_aw_vector_adj(net):
     return c1_nom, c1_den, c2_nom, c2_den, c3_nom, c3_den
 
 
-def cc_aw_vector(net):
+def cc_aw_vector(net, method="auto"):
+    """Returns the numerators and denominators of the three alternating walk
+    clustering coefficients of each node-layer pair. The cycles are counted
+    with the given method, see elementary_cycles. 'auto' uses 'sparse'.
+    """
+    if method == "auto":
+        method = "sparse"
+    if method == "sparse":
+        nodelayers, cycles = elementary_cycles_all(net)
+        nl_cycles = dict(zip(nodelayers, cycles.tolist()))
+        no_cycles = [0] * 10
     c1_nom, c1_den, c2_nom, c2_den, c3_nom, c3_den = [], [], [], [], [], []
     for node in net:
         for layer in net.get_layers(1):
-            aaa, aacac, acaac, acaca, acacac, afa, afcac, acfac, acfca, acfcac = (
-                elementary_cycles(net, node, layer)
-            )
+            if method == "sparse":
+                cycles = nl_cycles.get((node, layer), no_cycles)
+            else:
+                cycles = elementary_cycles(net, node, layer, method=method)
+            aaa, aacac, acaac, acaca, acacac, afa, afcac, acfac, acfca, acfcac = cycles
             c1_nom.append(aaa)
             c1_den.append(afa)
             c2_nom.append(aacac + acaac + acaca)
@@ -759,21 +967,39 @@ def cc_aw_vector(net):
 
 
 def gcc_aw_seplayers_adj(
-    net, w1=1.0 / 3.0, w2=1.0 / 3.0, w3=1.0 / 3.0, returnCVector=False
+    net, w1=1.0 / 3.0, w2=1.0 / 3.0, w3=1.0 / 3.0, returnCVector=False, method="auto"
 ):
-    c1_nom, c1_den, c2_nom, c2_den, c3_nom, c3_den = gcc_aw_vector_adj(net)
-    if sum(c1_den) != 0:
-        c1 = sum(c1_nom) / float(sum(c1_den))
+    """The global alternating walker clustering coefficient as a weighted sum
+    of the clustering coefficients of the three types of cycles.
+
+    The cycles are counted with the given method, see elementary_cycles.
+    'adj' uses products of dense supra-adjacency matrices and works only for
+    fully interconnected networks. 'auto' uses 'sparse'.
+    """
+    if method == "adj":
+        c1_nom, c1_den, c2_nom, c2_den, c3_nom, c3_den = gcc_aw_vector_adj(net)
+        t1, d1, t2, d2, t3, d3 = map(
+            sum, (c1_nom, c1_den, c2_nom, c2_den, c3_nom, c3_den)
+        )
+    else:
+        aaa, aacac, acaac, acaca, acacac, afa, afcac, acfac, acfca, acfcac = (
+            elementary_cycles(net, method=method)
+        )
+        t1, d1 = aaa, afa
+        t2, d2 = aacac + acaac + acaca, afcac + acfac + acfca
+        t3, d3 = acacac, acfcac
+    if d1 != 0:
+        c1 = t1 / float(d1)
     else:
         c1 = 0
-    if sum(c2_den) != 0:
-        c2 = sum(c2_nom) / float(sum(c2_den))
+    if d2 != 0:
+        c2 = t2 / float(d2)
     else:
         c2 = 0
     if len(net.slices[1]) == 2:
         return w1 * c1 + w2 * c2
-    if sum(c3_den) != 0:
-        c3 = sum(c3_nom) / float(sum(c3_den))
+    if d3 != 0:
+        c3 = t3 / float(d3)
     else:
         c3 = 0
 
@@ -792,6 +1018,7 @@ def lcc_aw(
     w3=None,
     returnCVector=False,
     anet=None,
+    method="auto",
 ):
     r"""The local version of the alternating walker clustering coefficient for multiplex networks.
 
@@ -809,6 +1036,11 @@ def lcc_aw(
     returnCVector : bool
        If True, returns a vector containing the three different local clustering coefficients
        :math:`c_1,c_2,c_3`. Otherwise, return just a single value.
+    anet : MultilayerNetwork
+       The aggregated network, used with method 'anet'.
+    method : str
+       The method used for counting the cycles: 'bf', 'anet' or 'sparse'. See
+       elementary_cycles. 'auto' uses 'bf'.
 
     Returns
     -------
@@ -826,7 +1058,7 @@ def lcc_aw(
     gcc_aw : The global version of the alternating walks clustering coeffient.
     """
     aaa, aacac, acaac, acaca, acacac, afa, afcac, acfac, acfca, acfcac = (
-        elementary_cycles(net, node, layer, anet=anet)
+        elementary_cycles(net, node, layer, anet=anet, method=method)
     )
     t1 = aaa
     d1 = afa
@@ -894,21 +1126,33 @@ def avg_lcc_aw(
     sncc_aw : The super-node version of the alternating walks clustering coefficient.
     gcc_aw : The global version of the alternating walks clustering coeffient.
     """
-    c, c1, c2, c3 = 0, 0, 0, 0
-    n = 0.0
-    for layer in net.slices[1]:
-        for node in net.A[layer]:
-            n += 1.0
-            if returnCVector:
-                tc1, tc2, tc3 = lcc_aw(net, node, layer, returnCVector=True, anet=anet)
-                c1, c2, c3 = c1 + tc1, c2 + tc2, c3 + tc3
-            else:
-                c += lcc_aw(net, node, layer, w1=w1, w2=w2, w3=w3)
+    import numpy
+
+    nodelayers, cycles = elementary_cycles_all(net)
+    t1 = cycles[:, 0]
+    d1 = cycles[:, 5]
+    t2 = cycles[:, 1:4].sum(axis=1)
+    d2 = cycles[:, 6:9].sum(axis=1)
+    t3 = cycles[:, 4]
+    d3 = cycles[:, 9]
+
+    def ratio(t, d):
+        return numpy.divide(t, d, out=numpy.zeros(len(t)), where=d != 0)
+
+    n = float(len(nodelayers))
+    c1, c2, c3 = ratio(t1, d1), ratio(t2, d2), ratio(t3, d3)
 
     if returnCVector:
-        return c1 / n, c2 / n, c3 / n
+        return c1.sum() / n, c2.sum() / n, c3.sum() / n
+
+    if w3 != None:
+        c = w1 * c1 + w2 * c2 + w3 * c3
     else:
-        return c / n
+        a, b = w1, w2
+        t = t1 * a**3 + t2 * a * b * b + t3 * b**3
+        d = d1 * a**3 + d2 * a * b * b + d3 * b**3
+        c = ratio(t, d)
+    return c.sum() / n
 
 
 def sncc_aw(
@@ -1013,7 +1257,9 @@ def sncc_aw_layercost(net, supernode, a=0.5, b=0.5):
         return 0
 
 
-def gcc_aw(net, w1=1.0 / 2.0, w2=1.0 / 2.0, w3=None, returnCVector=False):
+def gcc_aw(
+    net, w1=1.0 / 2.0, w2=1.0 / 2.0, w3=None, returnCVector=False, method="auto"
+):
     r"""The global version of the alternating walker clustering coefficient for multiplex networks.
 
     Parameters
@@ -1026,6 +1272,9 @@ def gcc_aw(net, w1=1.0 / 2.0, w2=1.0 / 2.0, w3=None, returnCVector=False):
     returnCVector : bool
        If True, returns a vector containing the three different global clustering coefficients
        :math:`c_1,c_2,c_3`. Otherwise, return just a single value.
+    method : str
+       The method used for counting the cycles: 'bf', 'anet' or 'sparse'. See
+       elementary_cycles. 'auto' uses 'sparse'.
 
     Returns
     -------
@@ -1055,7 +1304,7 @@ def gcc_aw(net, w1=1.0 / 2.0, w2=1.0 / 2.0, w3=None, returnCVector=False):
     #        #print node,layer,aaa,aacac,acaac,acaca,acacac, afa,afcac,acfac,acfca,acfcac
 
     aaa, aacac, acaac, acaca, acacac, afa, afcac, acfac, acfca, acfcac = (
-        elementary_cycles(net)
+        elementary_cycles(net, method=method)
     )
     t1 = aaa
     d1 = afa
@@ -1795,3 +2044,63 @@ def lcc_criado(net, node, undefReturn=0.0, anet=None):
         return undefReturn
     else:
         return s / float(d)
+
+
+def compute_all(
+    measure, net, nodes=None, workers=None, chunkSize=None, progress=None, **kwargs
+):
+    """Computes a clustering coefficient defined per node for many nodes.
+
+    Parameters
+    ----------
+    measure : function
+       The clustering coefficient, called as measure(net, node, **kwargs), e.g.,
+       lcc, cc_zhang, cc_barrett, lcc_brodka or lcc_criado.
+    net : MultilayerNetwork
+       The input network.
+    nodes : iterable, None
+       The nodes for which the clustering coefficient is computed. If None,
+       all the nodes of the network are used.
+    workers : int, None
+       If given, the nodes are divided between this many worker processes,
+       which are given the network once.
+    chunkSize : int, None
+       Number of nodes given to a worker at a time. By default the nodes are
+       divided to four chunks per worker.
+    progress : function, None
+       If given, this function is called after each chunk with the total
+       number of nodes computed so far.
+    **kwargs
+       Other arguments given to the measure. If the measure takes the
+       aggregated network as argument anet, and it is not given, it is
+       computed once and given to the measure for all the nodes.
+
+    Returns
+    -------
+    ccs : dict
+       The values of the clustering coefficient, keyed by the nodes.
+    """
+    import inspect
+
+    from ._parallel import _map_chunks
+
+    nodes = list(net) if nodes is None else list(nodes)
+    if "anet" in inspect.signature(measure).parameters and kwargs.get("anet") is None:
+        kwargs["anet"] = _get_anet(net)
+
+    if chunkSize is None:
+        chunkSize = max(1, -(-len(nodes) // (4 * (workers or 1))))
+    chunks = [nodes[i : i + chunkSize] for i in range(0, len(nodes), chunkSize)]
+
+    values = _map_chunks(
+        _compute_chunk, (measure, net, kwargs), chunks, workers, progress
+    )
+    ccs = {}
+    for chunk, chunkValues in zip(chunks, values):
+        ccs.update(zip(chunk, chunkValues))
+    return ccs
+
+
+def _compute_chunk(args, nodes):
+    measure, net, kwargs = args
+    return [measure(net, node, **kwargs) for node in nodes]
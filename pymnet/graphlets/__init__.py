@@ -17,5 +17,11 @@ from .graphlet_measures import (
     orbit_numbers,
     ordered_orbit_list,
 )
-from .graphlets import automorphism_orbits, graphlets, list_orbits, orbit_equations
+from .graphlets import (
+    automorphism_orbits,
+    cached_graphlets,
+    graphlets,
+    list_orbits,
+    orbit_equations,
+)
 from .independent_equations import independent_equations, redundant_orbits
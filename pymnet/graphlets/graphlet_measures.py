@@ -1,6 +1,7 @@
 """Module for graphlet data analysis
 """
 
+import itertools
 import math
 from collections import defaultdict as dd
 
@@ -38,10 +39,18 @@ def orbit_counts_all(net, n, nets, invs, auts, orbit_list, allowed_aspects="all"
     -----
     Should be faster than orbit_counts if the counts are computed for all
     (/ most of) the nodes
+
+    The connected node sets are enumerated with the ESU algorithm, so that
+    each of them is found once. If net is a fully interconnected multiplex
+    network with the same type of couplings as the graphlets, and the nodes can
+    be permuted, the graphlet and the orbits of the nodes of each node set are
+    looked up from a table of the adjacency codes of all the node and layer
+    permutations of the graphlets. Otherwise they are found with complete
+    invariants and isomorphisms. The network is not modified.
     """
 
-    nodes = net.slices[0]
-    layers = net.slices[1]
+    nodes = list(net.slices[0])
+    layers = list(net.slices[1])
 
     orbits = dd()
 
@@ -49,57 +58,152 @@ def orbit_counts_all(net, n, nets, invs, auts, orbit_list, allowed_aspects="all"
         for orbit in orbit_list:
             orbits[node, orbit] = 0
 
-    processed = set()
-
-    for node0 in nodes:
-        node_sets = set()
-        set_p = set([frozenset([node0])])
-        for _ in range(n - 1):
-            set_c = set()
-            for p in set_p:
-                for node_p in p:
-                    for layer in layers:
-                        node_o = net.__getitem__((node_p, layer))
-                        for neighbor in node_o.iter_total():
-                            if not (neighbor[0] in p or neighbor[0] in processed):
-                                set_n = frozenset(p | set([neighbor[0]]))
-                                set_c.add(set_n)
-
-            node_sets = node_sets.union(set_c)
-            set_p = set_c.copy()
-
-        processed.add(node0)
-        for node_comb in node_sets:
-            sub_net = pymnet.subnet(net, node_comb, layers)
-            ci_sub = pymnet.get_complete_invariant(
-                sub_net, allowed_aspects=allowed_aspects)
-            if ci_sub not in invs:
-                raise KeyError(
-                    "The network contains a graphlet not found in the "
-                    "pre-constructed complete invariant dictionary (invs). "
-                    "This can be caused by invs creation not being compatible "
-                    "with the attributes of the network. For example, the "
-                    "network might not be fully interconnected."
-                )
-            i = invs[ci_sub][0]
-            j = invs[ci_sub][1]
-            nw = nets[i][j]
-            iso = pymnet.get_isomorphism(
-                sub_net, nw, allowed_aspects=allowed_aspects)
-            for node in node_comb:
-                if node in iso[0]:
-                    orbits[node, (i, j, auts[i, j, iso[0][node]])] += 1
-                else:
-                    orbits[node, (i, j, auts[i, j, node])] += 1
-
-        for layer in layers:
-            nls = list(net[node0, :, layer])
-            for node1 in nls:
-                net[node0, node1[0], layer] = 0  # remove edges
+    table = _orbit_table(net, layers, nets, auts, allowed_aspects)
+    node_ids = dict((node, i) for i, node in enumerate(nodes))
+    layer_neighbors = [[set() for _ in nodes] for _ in layers]
+    neighbors = [set() for _ in nodes]
+    for edge in net.edges:
+        if edge[0] != edge[1]:
+            i, j = node_ids[edge[0]], node_ids[edge[1]]
+            neighbors[i].add(j)
+            neighbors[j].add(i)
+            if edge[2] == edge[3]:
+                q = layers.index(edge[2])
+                layer_neighbors[q][i].add(j)
+                layer_neighbors[q][j].add(i)
+
+    for node_ids_comb in _connected_node_sets(neighbors, n):
+        node_comb = [nodes[i] for i in node_ids_comb]
+        if table != None:
+            key = (len(node_ids_comb), _adjacency_code(node_ids_comb, layer_neighbors))
+            if key not in table:
+                raise KeyError(_missing_graphlet_message)
+            i, j, node_orbits = table[key]
+            for node, orbit in zip(node_comb, node_orbits):
+                orbits[node, (i, j, orbit)] += 1
+            continue
+
+        sub_net = pymnet.subnet(net, node_comb, layers)
+        ci_sub = pymnet.get_complete_invariant(sub_net, allowed_aspects=allowed_aspects)
+        if ci_sub not in invs:
+            raise KeyError(_missing_graphlet_message)
+        i = invs[ci_sub][0]
+        j = invs[ci_sub][1]
+        nw = nets[i][j]
+        iso = pymnet.get_isomorphism(sub_net, nw, allowed_aspects=allowed_aspects)
+        for node in node_comb:
+            if node in iso[0]:
+                orbits[node, (i, j, auts[i, j, iso[0][node]])] += 1
+            else:
+                orbits[node, (i, j, auts[i, j, node])] += 1
 
     return orbits
 
 
+_missing_graphlet_message = (
+    "The network contains a graphlet not found in the "
+    "pre-constructed complete invariant dictionary (invs). "
+    "This can be caused by invs creation not being compatible "
+    "with the attributes of the network. For example, the "
+    "network might not be fully interconnected."
+)
+
+
+def _connected_node_sets(neighbors, n):
+    """Yield each connected set of 2 to n nodes once, as lists of node ids.
+
+    Uses the ESU algorithm (S. Wernicke, "A Faster Algorithm for Detecting
+    Network Motifs", WABI 2005) on the node ids 0,...,len(neighbors)-1.
+    """
+
+    def extend(subgraph, extension, v):
+        while extension:
+            w = extension.pop()
+            new_subgraph = subgraph + [w]
+            yield new_subgraph
+            if len(new_subgraph) < n:
+                new_extension = set(extension)
+                for u in neighbors[w]:
+                    if (
+                        u > v
+                        and u not in new_extension
+                        and all(u != x and u not in neighbors[x] for x in subgraph)
+                    ):
+                        new_extension.add(u)
+                yield from extend(new_subgraph, new_extension, v)
+
+    if n < 2:
+        return
+    for v in range(len(neighbors)):
+        yield from extend([v], set(u for u in neighbors[v] if u > v), v)
+
+
+def _adjacency_code(node_ids, layer_neighbors):
+    """Return an int whose bits tell which pairs of the nodes, in the given
+    order, are connected in each layer."""
+    code = 0
+    bit = 1
+    for neighbors in layer_neighbors:
+        for k, i in enumerate(node_ids):
+            for j in node_ids[k + 1 :]:
+                if j in neighbors[i]:
+                    code |= bit
+                bit <<= 1
+    return code
+
+
+def _orbit_table(net, layers, nets, auts, allowed_aspects):
+    """Return a dict from (n_nodes, adjacency code) to the graphlet
+    (n_nodes, net_index) and the orbits of its nodes, for all the orderings of
+    the nodes and all the allowed mappings of the layers of net to the layers
+    of the graphlets. Returns None if the graphlets cannot be matched by the
+    codes, in which case isomorphisms need to be used."""
+    if allowed_aspects == "all":
+        allowed_aspects = [0, 1]
+    if (
+        0 not in allowed_aspects
+        or not isinstance(net, pymnet.MultiplexNetwork)
+        or net.aspects != 1
+        or net.directed
+        or not net.fullyInterconnected
+        or net.couplings[0][0] not in ["categorical", "none"]
+    ):
+        return None
+
+    table = {}
+    for n_nodes in nets:
+        for j, nw in enumerate(nets[n_nodes]):
+            if (
+                not isinstance(nw, pymnet.MultiplexNetwork)
+                or not nw.fullyInterconnected
+                or nw.couplings[0][0] != net.couplings[0][0]
+            ):
+                return None
+            nw_nodes = list(nw.slices[0])
+            nw_layers = list(nw.slices[1])
+            if len(nw_layers) != len(layers):
+                continue
+            if 1 in allowed_aspects:
+                layer_maps = itertools.permutations(nw_layers)
+            elif set(nw_layers) == set(layers):
+                layer_maps = [layers]
+            else:
+                continue
+            for layer_map in layer_maps:
+                nw_neighbors = [
+                    dict((node, set(nw.A[layer][node])) for node in nw_nodes)
+                    for layer in layer_map
+                ]
+                for node_map in itertools.permutations(nw_nodes):
+                    code = _adjacency_code(node_map, nw_neighbors)
+                    table[n_nodes, code] = (
+                        n_nodes,
+                        j,
+                        tuple(auts[n_nodes, j, node] for node in node_map),
+                    )
+    return table
+
+
 def orbit_numbers(n, nets, auts):
     """
     Assign numbers to the orbits.
@@ -224,13 +328,15 @@ def GCM(orbits):
 
     Parameters
     ----------
-    orbits : pandas dataframe
-        Orbit counts for nodes in the network
+    orbits : pandas dataframe, 2-d array
+        Orbit counts for nodes in the network, with a row for each node and a
+        column for each orbit. The argument is not modified.
     """
+    import numpy
+
     # add dummy vector
-    n_rows = orbits.shape[0]
-    n_cols = orbits.shape[1]
-    orbits.loc[n_rows] = [1] * n_cols
+    orbits = numpy.asarray(orbits, dtype=float)
+    orbits = numpy.vstack([orbits, numpy.ones((1, orbits.shape[1]))])
 
     corr, p = spearmanr(orbits, axis=0)
 
@@ -251,41 +357,57 @@ def GCD(gcm1, gcm2):
     gcd : float
         Graphlet correlation distance
     """
+    import numpy
 
+    gcm1 = numpy.asarray(gcm1, dtype=float)
+    gcm2 = numpy.asarray(gcm2, dtype=float)
     assert gcm1.shape == gcm2.shape, "matrix dimensions do not match"
 
-    gcd = 0
-    for i in range(len(gcm1)):
-        for j in range(i + 1, len(gcm1[i])):
-            gcd += (gcm1[i][j] - gcm2[i][j]) ** 2
-
-    gcd = math.sqrt(gcd)
+    upper = numpy.triu_indices(gcm1.shape[0], 1, gcm1.shape[1])
+    gcd = math.sqrt(numpy.sum((gcm1[upper] - gcm2[upper]) ** 2))
 
     return gcd
 
 
-def GCD_matrix(gcms):
+def GCD_matrix(gcms, chunk_size=None):
     """
     Produce a distance matrix of GCDs between networks
 
     Parameters
     ----------
-    gcms : list of 2-d arrays
+    gcms : list of 2-d arrays, 3-d array
         Graphlet correlation matrices
+    chunk_size : int, None
+        If given, the distances are computed for this many networks at a time,
+        which limits the size of the temporary arrays when there are thousands
+        of networks.
 
     Returns
     -------
-    gcds : list of lists
-        Graphlet correlation distances
+    gcds : 2-d array
+        Graphlet correlation distances, gcds[i][j] is the distance between
+        gcms[i] and gcms[j]
     """
-
-    gcds = []
-    for gcm1 in gcms:
-        gcds_t = []
-        for gcm2 in gcms:
-            gcd = GCD(gcm1, gcm2)
-            gcds_t.append(gcd)
-
-        gcds.append(gcds_t)
+    import numpy
+    from scipy.spatial.distance import cdist, pdist, squareform
+
+    gcms = numpy.asarray(gcms, dtype=float)
+    assert gcms.ndim == 3, "matrix dimensions do not match"
+
+    # The distances are Euclidean distances between the upper triangles
+    upper = numpy.triu_indices(gcms.shape[1], 1, gcms.shape[2])
+    vectors = gcms[:, upper[0], upper[1]]
+
+    if chunk_size is None:
+        return squareform(pdist(vectors))
+
+    n_nets = len(vectors)
+    gcds = numpy.zeros((n_nets, n_nets))
+    for start in range(0, n_nets, chunk_size):
+        stop = min(start + chunk_size, n_nets)
+        block = cdist(vectors[start:stop], vectors[start:])
+        gcds[start:stop, start:] = block
+        gcds[start:, start:stop] = block.T
+    numpy.fill_diagonal(gcds, 0)
 
     return gcds
@@ -1,13 +1,19 @@
 """ Module for theoretical analysis of graphlets.
 """
 
+import hashlib
 import itertools
+import os
+import pickle
+import tempfile
 from collections import defaultdict as dd
 
 import pymnet
 
+from .._parallel import _worker_pool
 
-def graphlets(n, layers, n_l=None, couplings=None, allowed_aspects="all"):
+
+def graphlets(n, layers, n_l=None, couplings=None, allowed_aspects="all", workers=None):
     """
     Generate graphlets up to n nodes
 
@@ -24,6 +30,9 @@ def graphlets(n, layers, n_l=None, couplings=None, allowed_aspects="all"):
         inter-layer edges are present.
     allowed_aspects : list, string
         the aspects that can be permutated when computing isomorphisms
+    workers : int, None
+        If given, the graphlets with more than two nodes are generated in a
+        pool of this many processes. The result is the same as without it.
 
     Returns
     -------
@@ -31,6 +40,10 @@ def graphlets(n, layers, n_l=None, couplings=None, allowed_aspects="all"):
         graphlets
     invariants : dict (key: complete invariant, value: tuple(index in 'nets': n_nodes, index in the list of multiplex networks))
         complete invariants of the graphlets, the values can be used to match the graphlets in 'nets'
+
+    See also
+    --------
+    cached_graphlets : Load the graphlets and their automorphism orbits from disk
     """
     if n_l is None:
         n_l = len(layers)
@@ -61,38 +74,56 @@ def graphlets(n, layers, n_l=None, couplings=None, allowed_aspects="all"):
     for i in range(2, n):
         nets_i = nets[i]
         nets_i_1 = []
-        for net in nets_i:
-            net_nodes = net.slices[0]
-            net_layers = list(net.slices[1])
-            net_layers.sort()
-            layer_combs = layer_combinations(net_layers)
-            for n_n in range(1, i + 1):
-                for node_comb in itertools.combinations(range(i), n_n):
-                    node_layers = [layer_combs] * n_n
-                    for node_layer_comb in itertools.product(*node_layers):
-                        new_net = pymnet.subnet(net, net_nodes, net_layers)
-                        for node_i in range(n_n):
-                            node = node_comb[node_i]
-                            for layer in node_layer_comb[node_i]:
-                                new_net[node, i, layer] = 1
-
-                        for layer in net_layers:
-                            new_net.add_layer(layer)
-                        # check if isomorphic with a previous graph & add only
-                        # if not isomorphic
-                        ci = pymnet.get_complete_invariant(
-                            new_net, allowed_aspects=allowed_aspects
-                        )
-                        if ci not in invariants:
-                            invariants[ci] = (i + 1, len(nets_i_1))
-                            nets_i_1.append(new_net)
+        args = [(net, i, allowed_aspects) for net in nets_i]
+        if workers is None:
+            extensions = map(_graphlet_extensions, args)
+        else:
+            extensions = _map_in_workers(_graphlet_extensions, args, workers)
+        for net_extensions in extensions:
+            for ci, new_net in net_extensions:
+                if ci not in invariants:
+                    invariants[ci] = (i + 1, len(nets_i_1))
+                    nets_i_1.append(new_net)
 
         nets[i + 1] = nets_i_1
 
     return nets, invariants
 
 
-def automorphism_orbits(nets, allowed_aspects="all"):
+def _graphlet_extensions(args):
+    """Returns the networks made by adding node i to the graphlet net, as a
+    list of (complete invariant, network) pairs without isomorphic networks."""
+    net, i, allowed_aspects = args
+    extensions = []
+    invariants = set()
+    net_nodes = net.slices[0]
+    net_layers = list(net.slices[1])
+    net_layers.sort()
+    layer_combs = layer_combinations(net_layers)
+    for n_n in range(1, i + 1):
+        for node_comb in itertools.combinations(range(i), n_n):
+            node_layers = [layer_combs] * n_n
+            for node_layer_comb in itertools.product(*node_layers):
+                new_net = pymnet.subnet(net, net_nodes, net_layers)
+                for node_i in range(n_n):
+                    node = node_comb[node_i]
+                    for layer in node_layer_comb[node_i]:
+                        new_net[node, i, layer] = 1
+
+                for layer in net_layers:
+                    new_net.add_layer(layer)
+                # check if isomorphic with a previous graph & add only
+                # if not isomorphic
+                ci = pymnet.get_complete_invariant(
+                    new_net, allowed_aspects=allowed_aspects
+                )
+                if ci not in invariants:
+                    invariants.add(ci)
+                    extensions.append((ci, new_net))
+    return extensions
+
+
+def automorphism_orbits(nets, allowed_aspects="all", workers=None):
     """
     Computes the node automorphism orbits of each network in nets
 
@@ -102,6 +133,8 @@ def automorphism_orbits(nets, allowed_aspects="all"):
         Graphlets, see function 'graphlets'
     allowed_aspects : list, string
         the aspects that can be permutated when computing isomorphisms
+    workers : int, None
+        If given, the orbits are computed in a pool of this many processes.
 
     Returns
     -------
@@ -112,29 +145,174 @@ def automorphism_orbits(nets, allowed_aspects="all"):
         the same orbit.
     """
 
-    auts = dd()
-    for n_nodes in nets:
-        for i in range(len(nets[n_nodes])):
-            net = nets[n_nodes][i]
-            aut = pymnet.get_automorphism_generators(
-                net, allowed_aspects=allowed_aspects
-            )
-            for node in net.slices[0]:
-                auts[n_nodes, i, node] = set([node])
-            for a in aut:
-                for key in a[0]:
-                    for j in net.slices[0]:
-                        if key in auts[n_nodes, i, j]:
-                            auts[n_nodes, i, j] = auts[n_nodes, i, j].union(
-                                auts[n_nodes, i, a[0][key]]
-                            )
+    keys = [(n_nodes, i) for n_nodes in nets for i in range(len(nets[n_nodes]))]
+    args = [(nets[n_nodes][i], allowed_aspects) for n_nodes, i in keys]
+    if workers is None:
+        orbits = map(_net_automorphism_orbits, args)
+    else:
+        orbits = _map_in_workers(_net_automorphism_orbits, args, workers)
 
-            for node in net.slices[0]:
-                auts[n_nodes, i, node] = min(auts[n_nodes, i, node])
+    auts = dd()
+    for (n_nodes, i), net_orbits in zip(keys, orbits):
+        for node, orbit in net_orbits.items():
+            auts[n_nodes, i, node] = orbit
 
     return auts
 
 
+def _net_automorphism_orbits(args):
+    """Returns a dict from the nodes of a network to the smallest node in their
+    automorphism orbit."""
+    net, allowed_aspects = args
+    aut = pymnet.get_automorphism_generators(net, allowed_aspects=allowed_aspects)
+    orbits = {}
+    for node in net.slices[0]:
+        orbits[node] = set([node])
+    for a in aut:
+        for key in a[0]:
+            for j in net.slices[0]:
+                if key in orbits[j]:
+                    orbits[j] = orbits[j].union(orbits[a[0][key]])
+
+    for node in net.slices[0]:
+        orbits[node] = min(orbits[node])
+
+    return orbits
+
+
+def _map_in_workers(function, args, workers):
+    """Returns the list of function(arg) for each arg in args, computed in a
+    pool of processes."""
+    with _worker_pool(workers) as pool:
+        return pool.map(function, args)
+
+
+# Version of the format of the graphlet cache files, included in the cache keys
+# so that files written in an older format are not loaded.
+_CACHE_FORMAT = 1
+
+
+def _library_version():
+    """Returns the version of the installed pymnet, or None if it is run from
+    a source tree that is not installed."""
+    from importlib import metadata
+
+    try:
+        return metadata.version("pymnet")
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def cached_graphlets(
+    n,
+    layers,
+    n_l=None,
+    couplings=None,
+    allowed_aspects="all",
+    cache_dir=None,
+    workers=None,
+):
+    """
+    Generate graphlets up to n nodes and their automorphism orbits, or load
+    them from an on-disk cache if they have been generated before with the
+    same parameters
+
+    Parameters
+    ----------
+    n : int
+        maximum number of nodes
+    layers : list of layers
+    n_l : int
+        Number of layers in the generated graphlets
+    couplings : list, str, tuple, None
+        Parameter determining how the layers are coupled. Couplings given as a
+        network are not cached.
+    allowed_aspects : list, string
+        the aspects that can be permutated when computing isomorphisms
+    cache_dir : str, None
+        Directory of the cache files. If None, the directory 'pymnet/graphlets'
+        in $XDG_CACHE_HOME (default ~/.cache) is used.
+    workers : int, None
+        Number of processes used for generating graphlets that are not in
+        the cache, see graphlets
+
+    Returns
+    -------
+    nets : dict (key: n_nodes, value: list of MultiplexNetwork objects)
+        graphlets, see graphlets
+    invariants : dict (key: complete invariant, value: tuple(n_nodes, net_index))
+        complete invariants of the graphlets, see graphlets
+    auts : dd (key: (n_nodes, net_index, node), value: node)
+        automorphism orbits, see automorphism_orbits
+
+    Notes
+    -----
+    Complete invariants cannot be saved, so they are recomputed for the
+    graphlets when loading them, which takes one invariant per graphlet.
+
+    The cache files are keyed by the parameters, the version of pymnet and the
+    version of the cache format, so that the graphlets generated by another
+    version are not loaded.
+    """
+    if isinstance(couplings, pymnet.MultilayerNetwork):
+        nets, invariants = graphlets(
+            n, layers, n_l, couplings, allowed_aspects, workers=workers
+        )
+        auts = automorphism_orbits(nets, allowed_aspects, workers=workers)
+        return nets, invariants, auts
+
+    if cache_dir is None:
+        cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+            os.path.expanduser("~"), ".cache"
+        )
+        cache_dir = os.path.join(cache_home, "pymnet", "graphlets")
+    key = repr(
+        (
+            _CACHE_FORMAT,
+            _library_version(),
+            n,
+            list(layers),
+            n_l,
+            couplings,
+            allowed_aspects,
+        )
+    )
+    path = os.path.join(
+        cache_dir, "graphlets-" + hashlib.sha1(key.encode()).hexdigest() + ".pickle"
+    )
+
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            cached = pickle.load(f)
+        if cached["key"] == key:
+            nets = cached["nets"]
+            invariants = {}
+            for n_nodes in nets:
+                for i, net in enumerate(nets[n_nodes]):
+                    ci = pymnet.get_complete_invariant(
+                        net, allowed_aspects=allowed_aspects
+                    )
+                    invariants[ci] = (n_nodes, i)
+            return nets, invariants, cached["auts"]
+
+    nets, invariants = graphlets(
+        n, layers, n_l, couplings, allowed_aspects, workers=workers
+    )
+    auts = automorphism_orbits(nets, allowed_aspects, workers=workers)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump({"key": key, "nets": nets, "auts": auts}, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+    return nets, invariants, auts
+
+
 def automorphism_orbits_nl(nets, allowed_aspects="all"):
     """
     computes the automorphism orbits for node-layers for each network in nets
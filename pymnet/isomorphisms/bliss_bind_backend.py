@@ -1,5 +1,7 @@
 """Multilayer network isomorphism backend using Bliss through bliss_bind."""
 
+import copyreg
+
 import bliss_bind
 
 from . import isomcore
@@ -34,3 +36,30 @@ class AuxiliaryGraphBuilderBlissBind(isomcore.AuxiliaryGraphBuilder):
 
     def _isomorphism_mapping(self, other):
         return self.bbgraph.get_isomorphism(other.bbgraph)
+
+
+def _named_graph(nodes, links):
+    graph = bliss_bind.NamedGraph()
+    for name, color in nodes:
+        graph.add_node(name, color)
+    for node1, node2 in links:
+        graph.add_link(node1, node2)
+    return graph
+
+
+def _reduce_named_graph(graph):
+    # The bliss graph inside a NamedGraph cannot be pickled, so the named
+    # graphs, e.g., in complete invariants, are pickled as their nodes and
+    # links and built again when they are unpickled
+    index = graph.node_index
+    nodes = [(name, graph.node_color[name]) for name in sorted(index, key=index.get)]
+    links = [
+        (node1, node2)
+        for node1, neighbours in graph.neighbours.items()
+        for node2 in neighbours
+        if index[node1] <= index[node2]
+    ]
+    return _named_graph, (nodes, links)
+
+
+copyreg.pickle(bliss_bind.NamedGraph, _reduce_named_graph)
@@ -35,127 +35,218 @@ def single_layer_conf(net, degs, degstype="distribution"):
     means that the sampled networks are not exactly statistically uniform.
     However, if the degrees are small compared to the number of nodes the error
     is likely to be small.
+
+    The stubs are paired with a random permutation of a stub array, and the
+    self-edges and multi-edges are then removed in rounds of vectorized edge
+    swaps.
+
+    See also
+    --------
+    conf_ensemble : generates many realizations at once
+    """
+    labels, degrees = _conf_degrees(degs, degstype)
+    rng = _numpy_rng()
+    sources, targets = _match_stubs(degrees, 1, rng)
+    _add_conf_edges(net, labels, degrees, sources[0], targets[0], rng)
+
+
+def _numpy_rng():
+    """Returns a numpy random generator seeded from the random module.
+
+    This way the results are reproducible with random.seed.
     """
-    stubs = []
-    selfedges = {}
-    multiedges = set()
-    edgetoindex = {}
+    import numpy
+
+    return numpy.random.default_rng(random.getrandbits(64))
+
+
+def _conf_degrees(degs, degstype):
+    """Returns the node labels and the degree array for the configuration model.
+
+    The labels are None if the degrees are given as a distribution, in which
+    case the nodes are labeled with integers in a random order.
+    """
+    import numpy
 
     if degstype == "distribution":
-        nstubs = sum(map(lambda x: x[0] * x[1], degs.items()))
-        nodes = sum(degs.values())
-        shuffled_node_indices = list(range(nodes))
-        random.shuffle(shuffled_node_indices)
-        node = 0
-        for k, num in degs.items():
-            if k == 0:
-                for i in range(num):
-                    net.add_node(shuffled_node_indices[node])
-                    node += 1
-            else:
-                for i in range(num):
-                    for j in range(k):
-                        stubs.append(shuffled_node_indices[node])
-                    node += 1
+        labels = None
+        degrees = numpy.repeat(
+            numpy.array(list(degs.keys()), dtype=numpy.int64),
+            numpy.array(list(degs.values()), dtype=numpy.int64),
+        )
     elif degstype == "nodes":
-        nstubs = sum(degs.values())
-        nodes = len(degs)
-        # for node,k in degs.iteritems():
-        for node in degs:
-            k = degs[node]
-            for i in range(k):
-                stubs.append(node)
-            if k == 0:
-                net.add_node(node)
+        labels = list(degs)
+        degrees = numpy.array([degs[node] for node in labels], dtype=numpy.int64)
     else:
         raise ValueError("Invalid degstype: '" + str(degstype) + "'")
 
-    # Here we should do the Erdos-Gallai test
-    assert nstubs % 2 == 0
-    assert (nodes * (nodes - 1)) >= nstubs
+    if not _is_graphical(degrees):
+        raise ValueError("The degrees are not the degrees of any simple graph.")
+
+    return labels, degrees
 
-    random.shuffle(stubs)
 
-    for s in range(int(len(stubs) / 2)):
-        node1, node2 = sorted([stubs[2 * s], stubs[2 * s + 1]])
+def _is_graphical(degrees):
+    """Tells if the degrees are the degrees of a simple graph.
+
+    The degree sequence d_1 >= ... >= d_n is graphical if its sum is even and,
+    by the Erdos-Gallai theorem, for every k
+    d_1 + ... + d_k <= k(k-1) + min(d_{k+1}, k) + ... + min(d_n, k).
+    """
+    import numpy
+
+    n = len(degrees)
+    if n == 0:
+        return True
+    if degrees.min() < 0 or degrees.sum() % 2 != 0:
+        return False
+
+    ascending = numpy.sort(degrees)
+    prefix = numpy.concatenate([[0], numpy.cumsum(ascending[::-1])])
+    k = numpy.arange(1, n + 1, dtype=numpy.int64)
+    # the nodes with degree at least k are the first p of the sorted sequence,
+    # and the tail of min(d_i, k) is k for those of them after the k first
+    p = n - numpy.searchsorted(ascending, k, side="left")
+    split = numpy.maximum(k, p)
+    tail = k * (split - k) + prefix[-1] - prefix[split]
+    return bool(numpy.all(prefix[1:] <= k * (k - 1) + tail))
+
+
+def _add_conf_edges(net, labels, degrees, sources, targets, rng):
+    """Adds the nodes and the edges given as arrays of node indices to net."""
+    if labels is None:
+        labels = rng.permutation(len(degrees)).tolist()
+    for i in (degrees == 0).nonzero()[0].tolist():
+        net.add_node(labels[i])
+    net.add_edges(
+        node1=[labels[i] for i in sources.tolist()],
+        node2=[labels[i] for i in targets.tolist()],
+        weight=1,
+    )
+
+
+def _match_stubs(degrees, count, rng, forbidden=()):
+    """Pairs the stubs of the nodes into simple graphs.
 
-        edgetoindex[(node1, node2)] = edgetoindex.get((node1, node2), []) + [2 * s]
+    Parameters
+    ----------
+    degrees : numpy array
+       Degree of each node.
+    count : int
+       Number of independent realizations produced at once.
+    rng : numpy.random.Generator
+       The source of randomness.
+    forbidden : iterable
+       Edges, as pairs of node indices, that are not allowed in the results.
 
-        if net[node1, node2] != 0:
-            multiedges.add((node1, node2))
+    Returns
+    -------
+    sources, targets : numpy arrays
+       Arrays of shape (count, m) containing the node indices of the m edges of
+       each realization, with sources[r, e] < targets[r, e].
 
-        if node1 == node2:
-            selfedges[node1] = selfedges.get(node1, []) + [2 * s]
+    Notes
+    -----
+    Each stub array is permuted and consecutive stubs are paired. The
+    self-edges, the extra copies of multi-edges and the forbidden edges are
+    then swapped with random edges of the same realization, (a, b), (c, d) ->
+    (a, c), (b, d), such that neither of the new edges is a self-edge or
+    already exists. The swaps are proposed in parallel, and the conflicting
+    ones are dropped, so that every round of swaps reduces the number of bad
+    edges. If no such swaps are found, random swaps are made to escape the
+    configuration. A ValueError is raised if the stubs cannot be paired after
+    a thousand such rounds, which can happen with forbidden edges.
+    """
+    import numpy
+
+    n = len(degrees)
+    m = int(degrees.sum()) // 2
+    if m == 0:
+        empty = numpy.zeros((count, 0), dtype=numpy.int64)
+        return empty, empty.copy()
+
+    stubs = numpy.repeat(numpy.arange(n, dtype=numpy.int64), degrees)
+    pairs = rng.permuted(numpy.tile(stubs, (count, 1)), axis=1).reshape(-1, 2)
+    sources = pairs.min(axis=1)
+    targets = pairs.max(axis=1)
+
+    # edges are identified by keys which are unique over all realizations
+    offsets = numpy.repeat(numpy.arange(count, dtype=numpy.int64) * n * n, m)
+    forbidden = numpy.array([min(e) * n + max(e) for e in forbidden], dtype=numpy.int64)
+    forbidden = numpy.sort(
+        (offsets[::m, None] + forbidden[None, :]).ravel(), kind="stable"
+    )
+
+    stalled = 0
+    while True:
+        keys = offsets + sources * n + targets
+        order = numpy.argsort(keys, kind="stable")
+        sortedKeys = keys[order]
+        bad = sources == targets
+        bad[order[1:]] |= sortedKeys[1:] == sortedKeys[:-1]
+        bad |= _sorted_contains(forbidden, keys)
+        badEdges = bad.nonzero()[0]
+        if len(badEdges) == 0:
+            break
+
+        # propose swaps with random partner edges of the same realization
+        proposals = min(1024 * count, 2**20)
+        edges = numpy.repeat(badEdges, max(1, proposals // len(badEdges)))
+        partners = (edges // m) * m + rng.integers(0, m, size=len(edges))
+        flip = rng.random(len(edges)) < 0.5
+        a, b = sources[edges], targets[edges]
+        c = numpy.where(flip, targets[partners], sources[partners])
+        d = numpy.where(flip, sources[partners], targets[partners])
+        key1 = offsets[edges] + numpy.minimum(a, c) * n + numpy.maximum(a, c)
+        key2 = offsets[edges] + numpy.minimum(b, d) * n + numpy.maximum(b, d)
+        allowed = (a != c) & (b != d) & (edges != partners)
+        valid = allowed & ~bad[partners] & (key1 != key2)
+        for newKeys in (key1, key2):
+            valid &= ~_sorted_contains(sortedKeys, newKeys)
+            valid &= ~_sorted_contains(forbidden, newKeys)
+
+        if valid.any():
+            # each edge takes part in at most one swap, and the new edges must
+            # differ from each other, so a swap is dropped if one of its new
+            # edges is created by an earlier swap
+            valid = valid.nonzero()[0]
+            valid = valid[numpy.unique(edges[valid], return_index=True)[1]]
+            valid = valid[numpy.unique(partners[valid], return_index=True)[1]]
+            newKeys = numpy.stack([key1[valid], key2[valid]], axis=1).ravel()
+            first = numpy.zeros(len(newKeys), dtype=bool)
+            first[numpy.unique(newKeys, return_index=True)[1]] = True
+            valid = valid[first.reshape(-1, 2).all(axis=1)]
         else:
-            net[node1, node2] = 1
-
-    for node, sis in selfedges.items():
-        for si in sis:
-            repeat = True
-            while repeat:
-                # select two edges at random
-                e1i, e2i = map(
-                    lambda x: 2 * x, random.sample(range(int(len(stubs) / 2)), 2)
-                )
-                c = [node, stubs[e1i], stubs[e1i + 1], stubs[e2i], stubs[e2i + 1]]
-                n2, n3 = sorted([c[1], c[2]])
-                n4, n5 = sorted([c[3], c[4]])
-                if len(set(c)) == len(c):
-                    if (n2, n3) not in multiedges and (n4, n5) not in multiedges:
-                        if (
-                            net[node, n2] == 0
-                            and net[node, n4] == 0
-                            and net[n3, n5] == 0
-                        ):
-                            net[n2, n3] = 0
-                            net[n4, n5] = 0
-                            net[node, n2] = 1
-                            net[node, n4] = 1
-                            net[n3, n5] = 1
-                            stubs[si], stubs[si + 1] = sorted([n3, n5])
-                            stubs[e1i], stubs[e1i + 1] = sorted([node, n2])
-                            stubs[e2i], stubs[e2i + 1] = sorted([node, n4])
-                            repeat = False
-
-    for n1, n2 in multiedges:
-        for dummy in range(int(math.floor(len(edgetoindex[(n1, n2)]) / 2.0))):
-            repeat = True
-            while repeat:
-                # select two edges at random
-                e1i, e2i = map(
-                    lambda x: 2 * x, random.sample(range(int(len(stubs) / 2)), 2)
-                )
-                c = [n1, n2, stubs[e1i], stubs[e1i + 1], stubs[e2i], stubs[e2i + 1]]
-                n3, n4 = sorted([c[2], c[3]])
-                n5, n6 = sorted([c[4], c[5]])
-                if len(set(c)) == len(c):
-                    if (n3, n4) not in multiedges and (n5, n6) not in multiedges:
-                        if (
-                            net[n1, n3] == 0
-                            and net[n2, n4] == 0
-                            and net[n1, n5] == 0
-                            and net[n2, n6] == 0
-                        ):
-                            if len(edgetoindex[n1, n2]) == 2:
-                                net[n1, n2] = 0
-                            assert net[n3, n4] == 1
-                            assert net[n5, n6] == 1
-                            net[n3, n4] = 0
-                            net[n5, n6] = 0
-                            net[n1, n3] = 1
-                            net[n2, n4] = 1
-                            net[n1, n5] = 1
-                            net[n2, n6] = 1
-                            si1, si2 = sorted(
-                                [edgetoindex[n1, n2].pop(), edgetoindex[n1, n2].pop()]
-                            )
-                            stubs[si1], stubs[si1 + 1] = sorted([n1, n3])
-                            stubs[si2], stubs[si2 + 1] = sorted(
-                                [n2, n4]
-                            )  # stubs[si1],stubs[si1+1]=sorted([n2,n4])
-                            stubs[e1i], stubs[e1i + 1] = sorted([n1, n5])
-                            stubs[e2i], stubs[e2i + 1] = sorted([n2, n6])
-                            repeat = False
+            # escape the configurations where no swap reduces the number of bad
+            # edges with a single unchecked swap in each realization. The
+            # stalled rounds are counted over the whole run, as the unchecked
+            # swaps can undo the progress made between them.
+            stalled += 1
+            if stalled > 1000:
+                raise ValueError("Could not pair the stubs into a simple graph.")
+            if stalled % 10 != 0:
+                continue
+            valid = allowed.nonzero()[0]
+            valid = valid[numpy.unique(edges[valid] // m, return_index=True)[1]]
+
+        a, b, c, d = a[valid], b[valid], c[valid], d[valid]
+        edges, partners = edges[valid], partners[valid]
+        sources[edges], targets[edges] = numpy.minimum(a, c), numpy.maximum(a, c)
+        sources[partners] = numpy.minimum(b, d)
+        targets[partners] = numpy.maximum(b, d)
+
+    return sources.reshape(count, m), targets.reshape(count, m)
+
+
+def _sorted_contains(sortedValues, values):
+    """Tells which of the values are in the sorted array."""
+    import numpy
+
+    if len(sortedValues) == 0:
+        return numpy.zeros(len(values), dtype=bool)
+    indices = numpy.searchsorted(sortedValues, values)
+    indices[indices == len(sortedValues)] = 0
+    return sortedValues[indices] == values
 
 
 def single_layer_er(net, nodes, p=None, edges=None):
@@ -172,10 +263,20 @@ def single_layer_er(net, nodes, p=None, edges=None):
     edges : int
        Number of edges that are present.
 
+    Notes
+    -----
+    The node pairs are indexed such that pair (v, w) with w < v has index
+    v(v-1)/2 + w. If p is given, the indices of the edges are found by drawing
+    the geometrically distributed gaps between them in blocks. Otherwise, the
+    given number of distinct indices are drawn uniformly at random. The indices
+    are then decoded to node pairs, and the edges are added to the network at
+    once.
+
     References
     ----------
     Efficient generation of large random networks. PRE 71, 036113 (2005)
     """
+    import numpy
 
     if (p is None and edges is None) or (p is not None and edges is not None):
         raise ValueError("Give one of the parameters: p or edges.")
@@ -184,27 +285,58 @@ def single_layer_er(net, nodes, p=None, edges=None):
     for node in nodes:
         net.add_node(node)
 
+    rng = _numpy_rng()
+    pairs = n * (n - 1) // 2
     if p is not None:
         if p == 1.0:
-            for node1 in nodes:
-                for node2 in nodes:
-                    if node1 != node2:
-                        net[node1, node2] = 1
+            v, w = (~numpy.eye(n, dtype=bool)).nonzero()
         else:
-            v, w = 1, -1
-            while v < n:
-                r = random.random()
-                w = w + 1 + int(math.floor(math.log(1 - r) / math.log(1 - p)))
-                while (w >= v) and (v < n):
-                    w = w - v
-                    v = v + 1
-                if v < n:
-                    net[nodes[v], nodes[w]] = 1
+            v, w = _decode_pair_indices(_geometric_skip_indices(pairs, p, rng))
     else:
-        for edge_index in random.sample(range(int((n * (n - 1)) / 2)), edges):
-            v = int(1 + math.floor(-0.5 + math.sqrt(0.25 + 2 * edge_index)))
-            w = edge_index - int((v * (v - 1)) / 2)
-            net[nodes[v], nodes[w]] = 1
+        v, w = _decode_pair_indices(rng.choice(pairs, size=edges, replace=False))
+
+    nodes = list(nodes)
+    net.add_edges(
+        node1=[nodes[i] for i in v.tolist()],
+        node2=[nodes[i] for i in w.tolist()],
+        weight=1,
+    )
+
+
+def _geometric_skip_indices(size, p, rng):
+    """Returns the indices of successes in size Bernoulli trials, each
+    succeeding with probability p.
+
+    The gaps between the successes are geometrically distributed, and they are
+    drawn in blocks whose size is a bit larger than the expected number of
+    successes.
+    """
+    import numpy
+
+    if p == 0 or size == 0:
+        return numpy.zeros(0, dtype=numpy.int64)
+    blockSize = int(size * p + 5 * math.sqrt(size * p) + 10)
+    blocks = []
+    last = -1
+    while last < size:
+        indices = last + numpy.cumsum(rng.geometric(p, size=blockSize))
+        blocks.append(indices)
+        last = int(indices[-1])
+    indices = numpy.concatenate(blocks)
+    return indices[: numpy.searchsorted(indices, size)]
+
+
+def _decode_pair_indices(indices):
+    """Returns the node indices (v, w), w < v, of the node pairs with the given
+    pair indices v(v-1)/2 + w."""
+    import numpy
+
+    indices = numpy.asarray(indices, dtype=numpy.int64)
+    v = numpy.floor(0.5 + numpy.sqrt(0.25 + 2.0 * indices)).astype(numpy.int64)
+    # correct the rounding errors of the floating point square root
+    v -= v * (v - 1) // 2 > indices
+    v += (v + 1) * v // 2 <= indices
+    return v, indices - v * (v - 1) // 2
 
 
 def conf(degs, degstype="distribution", couplings=("categorical", 1.0)):
@@ -239,59 +371,18 @@ def conf(degs, degstype="distribution", couplings=("categorical", 1.0)):
     See also
     --------
     single_layer_conf : the function used to generate a network on each layer
+    conf_ensemble : generates many realizations at once
 
 
     """
-    if isinstance(degs, MultiplexNetwork):
-        assert degs.aspects == 1
-        d = {}
-        for layer in degs.iter_layers():
-            dd = {}
-            d[layer] = dd
-            for node in degs.A[layer]:
-                dd[node] = degs.A[layer][node].deg()
-        return conf(d, degstype="nodes")
-    elif isinstance(degs, MultilayerNetwork):
-        assert degs.aspects == 0
-        d = {}
-        for node in degs:
-            d[node] = degs[node].deg()
-        return conf(d, degstype="nodes")
-    elif isinstance(degs, dict) and not isinstance(
-        degs[(k for k in degs).send(None)], dict
-    ):
+    if isinstance(degs, MultilayerNetwork):
+        return conf(_network_degs(degs), degstype="nodes")
+    elif _is_monoplex_degs(degs):
         net = MultilayerNetwork(aspects=0)
         single_layer_conf(net, degs, degstype=degstype)
     else:
-        # check if the network is going to be node-aligned
-        namedlayers = isinstance(degs, dict)
-        if namedlayers:
-            degslist = degs.values()
-        else:
-            degslist = degs
-        nnodes = None
-        nodeAligned = True
-        if degstype == "distribution":
-            for ldegs in degslist:
-                lnnodes = sum(ldegs.values())
-                if nnodes is not None and lnnodes != nnodes:
-                    nodeAligned = False
-                nnodes = lnnodes
-        elif degstype == "nodes":
-            for ldegs in degslist:
-                lnnodes = set(ldegs.keys())
-                if nnodes is not None and lnnodes != nnodes:
-                    nodeAligned = False
-                nnodes = lnnodes
-        else:
-            raise ValueError("degstype should be either `distribution' or `nodes'")
-
+        layers, nodeAligned = _conf_layers(degs, degstype)
         net = MultiplexNetwork(couplings=[couplings], fullyInterconnected=nodeAligned)
-        if namedlayers:
-            # layers=degs.iteritems()
-            layers = ((node, degs[node]) for node in degs)
-        else:
-            layers = enumerate(degs)
         for la, ldegs in layers:
             net.add_layer(la)
             single_layer_conf(net.A[la], ldegs, degstype=degstype)
@@ -299,6 +390,134 @@ def conf(degs, degstype="distribution", couplings=("categorical", 1.0)):
     return net
 
 
+def conf_ensemble(degs, count, degstype="distribution", couplings=("categorical", 1.0)):
+    """Generates realizations of the independent configuration model in batch.
+
+    The stubs of all of the realizations are paired at once, which is much
+    faster than calling conf repeatedly when the networks are small. Large
+    ensembles are processed in chunks so that the memory use stays bounded.
+
+    Parameters
+    ----------
+    degs : dict, dict of dicts, list of dicts, MultiplexNetwork,
+       MultilayerNetwork Degrees. See conf.
+    count : int
+       Number of realizations.
+    degstype : string
+       If 'distribution', then degs dicts give the degree distributions. If
+       'nodes', then degs dicts give node degrees. See conf.
+    couplings : tuple
+       The coupling types of the multiplex network objects.
+
+    Yields
+    ------
+    net : MultilayerNetwork or MultiplexNetwork
+       The realizations of the configuration model one at a time.
+
+    See also
+    --------
+    conf
+    """
+    if isinstance(degs, MultilayerNetwork):
+        yield from conf_ensemble(_network_degs(degs), count, degstype="nodes")
+        return
+
+    rng = _numpy_rng()
+    if _is_monoplex_degs(degs):
+        labels, degrees = _conf_degrees(degs, degstype)
+        for sources, targets in _conf_realizations(degrees, count, rng):
+            net = MultilayerNetwork(aspects=0)
+            _add_conf_edges(net, labels, degrees, sources, targets, rng)
+            yield net
+    else:
+        layers, nodeAligned = _conf_layers(degs, degstype)
+        layers = [(la, _conf_degrees(ldegs, degstype)) for la, ldegs in layers]
+        realizations = [
+            _conf_realizations(degrees, count, rng) for la, (labels, degrees) in layers
+        ]
+        for edges in zip(*realizations):
+            net = MultiplexNetwork(
+                couplings=[couplings], fullyInterconnected=nodeAligned
+            )
+            for (la, (labels, degrees)), (sources, targets) in zip(layers, edges):
+                net.add_layer(la)
+                _add_conf_edges(net.A[la], labels, degrees, sources, targets, rng)
+            yield net
+
+
+def _network_degs(net):
+    """Returns the degrees of a monoplex or a multiplex network as dicts."""
+    if isinstance(net, MultiplexNetwork):
+        assert net.aspects == 1
+        d = {}
+        for layer in net.iter_layers():
+            dd = {}
+            d[layer] = dd
+            for node in net.A[layer]:
+                dd[node] = net.A[layer][node].deg()
+        return d
+    else:
+        assert net.aspects == 0
+        d = {}
+        for node in net:
+            d[node] = net[node].deg()
+        return d
+
+
+def _is_monoplex_degs(degs):
+    """Tells if the degrees given to conf describe a single network."""
+    return isinstance(degs, dict) and not isinstance(
+        degs[(k for k in degs).send(None)], dict
+    )
+
+
+def _conf_layers(degs, degstype):
+    """Returns the layers and their degrees, and if the network is node-aligned."""
+    # check if the network is going to be node-aligned
+    namedlayers = isinstance(degs, dict)
+    if namedlayers:
+        degslist = degs.values()
+    else:
+        degslist = degs
+    nnodes = None
+    nodeAligned = True
+    if degstype == "distribution":
+        for ldegs in degslist:
+            lnnodes = sum(ldegs.values())
+            if nnodes is not None and lnnodes != nnodes:
+                nodeAligned = False
+            nnodes = lnnodes
+    elif degstype == "nodes":
+        for ldegs in degslist:
+            lnnodes = set(ldegs.keys())
+            if nnodes is not None and lnnodes != nnodes:
+                nodeAligned = False
+            nnodes = lnnodes
+    else:
+        raise ValueError("degstype should be either `distribution' or `nodes'")
+
+    if namedlayers:
+        layers = [(la, degs[la]) for la in degs]
+    else:
+        layers = list(enumerate(degs))
+    return layers, nodeAligned
+
+
+def _conf_realizations(degrees, count, rng):
+    """Yields the edges of count configuration model realizations.
+
+    The stubs are matched in chunks of realizations, whose size is limited by
+    the memory use and by the range of the edge keys in _match_stubs.
+    """
+    n = len(degrees)
+    m = max(1, int(degrees.sum()) // 2)
+    chunk = max(1, min(count, 2**22 // m, 2**62 // max(1, n * n)))
+    for start in range(0, count, chunk):
+        sources, targets = _match_stubs(degrees, min(chunk, count - start), rng)
+        for r in range(len(sources)):
+            yield sources[r], targets[r]
+
+
 def er(n, p=None, edges=None):
     """Multiplex Erdos-Renyi model.
 
@@ -562,191 +781,26 @@ def conf_overlaps(ol_degs, couplings=None):
     net = MultiplexNetwork(couplings=couplings)
     used_edges = set()
 
+    rng = _numpy_rng()
     for layer_comb in ol_degs:
-        degs = ol_degs[layer_comb]
-
-        # mostly modified from single_layer_conf
-        stubs = []
-        selfedges = {}
-        multiedges = set()
-        takenedges = set()
-        edgetoindex = {}
-
-        net_temp = MultilayerNetwork()
-
-        nstubs = sum(degs.values())
-        n_nodes = len(degs)
-        for node in degs:
-            k = degs[node]
-            for i in range(k):
-                stubs.append(node)
-            if k == 0:
-                net_temp.add_node(node)
-
-        # Here we should do the Erdos-Gallai test
-        assert nstubs % 2 == 0
-        assert (n_nodes * (n_nodes - 1)) >= nstubs
-
-        random.shuffle(stubs)
-
-        for s in range(int(len(stubs) / 2)):
-            node1, node2 = sorted([stubs[2 * s], stubs[2 * s + 1]])
-
-            edgetoindex[(node1, node2)] = edgetoindex.get((node1, node2), []) + [2 * s]
-
-            if node1 == node2:
-                selfedges[node1] = selfedges.get(node1, []) + [2 * s]
-            elif net_temp[node1, node2] != 0:
-                multiedges.add((node1, node2))
-            elif (node1, node2) in used_edges:
-                takenedges.add((node1, node2))
-            else:
-                net_temp[node1, node2] = 1
-                used_edges.add((node1, node2))
-
-        for node, sis in selfedges.items():
-            for si in sis:
-                repeat = True
-                while repeat:
-                    # select two edges at random
-                    e1i, e2i = map(
-                        lambda x: 2 * x, random.sample(range(int(len(stubs) / 2)), 2)
-                    )
-                    c = [node, stubs[e1i], stubs[e1i + 1], stubs[e2i], stubs[e2i + 1]]
-                    n2, n3 = sorted([c[1], c[2]])
-                    n4, n5 = sorted([c[3], c[4]])
-                    if len(set(c)) == len(c):
-                        if (
-                            (n2, n3) not in multiedges
-                            and (n4, n5) not in multiedges
-                            and (n2, n3) not in takenedges
-                            and (n4, n5) not in takenedges
-                        ):
-                            e1 = tuple(sorted([node, n2]))
-                            e2 = tuple(sorted([node, n4]))
-                            e3 = tuple(sorted([n3, n5]))
-                            if (
-                                e1 not in used_edges
-                                and e2 not in used_edges
-                                and e3 not in used_edges
-                            ):
-                                net_temp[n2, n3] = 0
-                                net_temp[n4, n5] = 0
-                                net_temp[node, n2] = 1
-                                net_temp[node, n4] = 1
-                                net_temp[n3, n5] = 1
-                                stubs[si], stubs[si + 1] = sorted([n3, n5])
-                                stubs[e1i], stubs[e1i + 1] = sorted([node, n2])
-                                stubs[e2i], stubs[e2i + 1] = sorted([node, n4])
-                                repeat = False
-
-                                used_edges.remove((n2, n3))
-                                used_edges.remove((n4, n5))
-                                used_edges.add(e1)
-                                used_edges.add(e2)
-                                used_edges.add(e3)
-
-        for n1, n2 in multiedges:
-            for dummy in range(len(edgetoindex[(n1, n2)]) // 2):
-                repeat = True
-                while repeat:
-                    # select two edges at random
-                    e1i, e2i = map(
-                        lambda x: 2 * x, random.sample(range(int(len(stubs) / 2)), 2)
-                    )
-                    c = [n1, n2, stubs[e1i], stubs[e1i + 1], stubs[e2i], stubs[e2i + 1]]
-                    n3, n4 = sorted([c[2], c[3]])
-                    n5, n6 = sorted([c[4], c[5]])
-                    if len(set(c)) == len(c):
-                        if (
-                            (n3, n4) not in multiedges
-                            and (n5, n6) not in multiedges
-                            and (n3, n4) not in takenedges
-                            and (n5, n6) not in takenedges
-                        ):
-                            e1 = tuple(sorted([n1, n3]))
-                            e2 = tuple(sorted([n2, n4]))
-                            e3 = tuple(sorted([n1, n5]))
-                            e4 = tuple(sorted([n2, n6]))
-                            if (
-                                e1 not in used_edges
-                                and e2 not in used_edges
-                                and e3 not in used_edges
-                                and e4 not in used_edges
-                            ):
-                                if len(edgetoindex[n1, n2]) == 2:
-                                    net_temp[n1, n2] = 0
-                                    used_edges.remove((n1, n2))
-                                net_temp[n3, n4] = 0
-                                net_temp[n5, n6] = 0
-                                net_temp[n1, n3] = 1
-                                net_temp[n2, n4] = 1
-                                net_temp[n1, n5] = 1
-                                net_temp[n2, n6] = 1
-                                si1, si2 = sorted(
-                                    [
-                                        edgetoindex[n1, n2].pop(),
-                                        edgetoindex[n1, n2].pop(),
-                                    ]
-                                )
-                                stubs[si1], stubs[si1 + 1] = sorted([n1, n3])
-                                stubs[si2], stubs[si2 + 1] = sorted(
-                                    [n2, n4]
-                                )  # stubs[si1],stubs[si1+1]=sorted([n2,n4])
-                                stubs[e1i], stubs[e1i + 1] = sorted([n1, n5])
-                                stubs[e2i], stubs[e2i + 1] = sorted([n2, n6])
-                                repeat = False
-
-                                used_edges.remove((n3, n4))
-                                used_edges.remove((n5, n6))
-                                used_edges.add(e1)
-                                used_edges.add(e2)
-                                used_edges.add(e3)
-                                used_edges.add(e4)
-
-        for n1, n2 in takenedges:
-            for si1 in edgetoindex[(n1, n2)]:
-                repeat = True
-                while repeat:
-                    # select two edges at random
-                    e1i, e2i = map(
-                        lambda x: 2 * x, random.sample(range(int(len(stubs) / 2)), 2)
-                    )
-                    c = [n1, n2, stubs[e1i], stubs[e1i + 1], stubs[e2i], stubs[e2i + 1]]
-                    n3, n4 = sorted([c[2], c[3]])
-                    n5, n6 = sorted([c[4], c[5]])
-                    if len(set(c)) == len(c):
-                        if (n3, n4) not in takenedges and (n5, n6) not in takenedges:
-                            e1 = tuple(sorted([n1, n3]))
-                            e2 = tuple(sorted([n2, n5]))
-                            e3 = tuple(sorted([n4, n6]))
-                            if (
-                                e1 not in used_edges
-                                and e2 not in used_edges
-                                and e3 not in used_edges
-                            ):
-                                assert net_temp[n3, n4] == 1
-                                assert net_temp[n5, n6] == 1
-                                net_temp[n3, n4] = 0
-                                net_temp[n5, n6] = 0
-                                net_temp[n1, n3] = 1
-                                net_temp[n2, n5] = 1
-                                net_temp[n4, n6] = 1
-
-                                stubs[si1], stubs[si1 + 1] = sorted([n1, n3])
-                                stubs[e1i], stubs[e1i + 1] = sorted([n2, n5])
-                                stubs[e2i], stubs[e2i + 1] = sorted([n4, n6])
-                                repeat = False
-
-                                used_edges.remove((n3, n4))
-                                used_edges.remove((n5, n6))
-                                used_edges.add(e1)
-                                used_edges.add(e2)
-                                used_edges.add(e3)
-
-        for e in net_temp.edges:
-            for layer in layer_comb:
-                net[e[0], e[1], layer] = 1
+        nodes, degrees = _conf_degrees(ol_degs[layer_comb], "nodes")
+        index = dict((node, i) for i, node in enumerate(nodes))
+        forbidden = [
+            (index[n1], index[n2])
+            for n1, n2 in used_edges
+            if n1 in index and n2 in index
+        ]
+        sources, targets = _match_stubs(degrees, 1, rng, forbidden=forbidden)
+
+        node1, node2 = [], []
+        for i, j in zip(sources[0].tolist(), targets[0].tolist()):
+            n1, n2 = sorted([nodes[i], nodes[j]])
+            used_edges.add((n1, n2))
+            node1.append(n1)
+            node2.append(n2)
+        for layer in layer_comb:
+            layers = [layer] * len(node1)
+            net.add_edges(node1=node1, node2=node2, layer1=layers, layer2=layers)
 
     return net
 
@@ -857,33 +911,232 @@ def ba_total_degree(n, ms, couplings=None):
     """
 
     net = MultiplexNetwork(couplings=couplings)
-    links = []
-
     for i in range(n):
         net.add_node(i)
-        link_sets = []
-        for layer, m in enumerate(ms):
-            if i == m:
-                link_set = set(range(i))
+    sources, targets, layers = _ba_total_degree_edges(n, ms, _numpy_rng())
+    layers = layers.tolist()
+    net.add_edges(
+        node1=sources.tolist(), node2=targets.tolist(), layer1=layers, layer2=layers
+    )
+    return net
 
-            elif i > m:
-                link_set = set()
-                while len(link_set) < m:
-                    link_set |= set(random.sample(links, m - len(link_set)))
 
-            else:
-                link_set = set()
+def _ba_total_degree_edges(n, ms, rng):
+    """Returns the edges of ba_total_degree as arrays of sources, targets and
+    layers.
 
-            link_sets.append(link_set)
+    Notes
+    -----
+    The edges are numbered in the order in which they are added, and every edge
+    contributes two entries, its source and its target, to the list of nodes
+    weighted by their total degree. A target is thus chosen by drawing an
+    earlier edge uniformly at random and then taking either its source, which
+    is known beforehand, or its target, which is found by following the chain
+    of drawn edges.
+
+    The draws are made for blocks of consecutive edges at once. The targets
+    that repeat within the links of a node in a layer are redrawn in rounds
+    until there are none left in the block, after which the targets of the
+    block are final.
+    """
+    import numpy
+
+    ms = numpy.array(ms, dtype=numpy.int64)
+    nLayers = len(ms)
+    maxM = min(n, int(ms.max(initial=0)))
+    linkCounts = numpy.full(n, ms.sum(), dtype=numpy.int64)
+    linkCounts[:maxM] = [ms[ms <= i].sum() for i in range(maxM)]
+    nodeStarts = numpy.concatenate([[0], numpy.cumsum(linkCounts)])
+    nEdges = int(nodeStarts[-1])
+    dtype = numpy.int32 if max(n, nEdges) < 2**31 else numpy.int64
+
+    # the nodes i >= m get m links in a layer with m links per node
+    layers = [
+        numpy.repeat(numpy.arange(nLayers, dtype=dtype)[ms <= i], ms[ms <= i])
+        for i in range(maxM)
+    ]
+    if n > maxM:
+        nodeLayers = numpy.repeat(numpy.arange(nLayers, dtype=dtype), ms)
+        layers.append(numpy.tile(nodeLayers, n - maxM))
+    layers = numpy.concatenate(layers + [numpy.zeros(0, dtype=dtype)])
+    sources = numpy.repeat(numpy.arange(n, dtype=dtype), linkCounts)
+    targets = numpy.full(nEdges, -1, dtype=dtype)
+
+    # the blocks consist of whole nodes, and their size is limited to bound the
+    # memory use
+    blockEnds = numpy.minimum(2 ** numpy.arange(10, 22), nEdges)
+    blockEnds = numpy.append(blockEnds, numpy.arange(2**22, nEdges, 2**22))
+    blockEnds = nodeStarts[numpy.searchsorted(nodeStarts, blockEnds)]
+    blockEnds = numpy.unique(numpy.append(blockEnds, nEdges))
+    start = 0
+    for end in blockEnds.tolist():
+        if end == start:
+            continue
+        edges = numpy.arange(start, end)
+        blockSources = sources[start:end]
+        blockLayers = layers[start:end]
+        isFirst = numpy.ones(len(edges), dtype=bool)
+        isFirst[1:] = (blockSources[1:] != blockSources[:-1]) | (
+            blockLayers[1:] != blockLayers[:-1]
+        )
+        groupStarts = numpy.maximum.accumulate(numpy.where(isFirst, edges, 0))
+
+        # node m links to all of the nodes before it, the others draw their
+        # targets, and known is the part of targets that does not need a chain
+        known = targets[start:end]
+        fixed = blockSources == ms[blockLayers]
+        known[fixed] = (edges - groupStarts)[fixed]
+        direct = edges.copy()
+
+        redraw = (~fixed).nonzero()[0] + start
+        while len(redraw) > 0:
+            drawn = rng.random(len(redraw)) * nodeStarts[sources[redraw]]
+            drawn = drawn.astype(numpy.int64)
+            isSource = rng.random(len(redraw)) < 0.5
+            known[redraw - start] = numpy.where(isSource, sources[drawn], -1)
+            direct[redraw - start] = numpy.where(isSource, redraw, drawn)
+
+            # follow the drawn edges until a source or a final target is found
+            blockTargets = known.copy()
+            chained = (blockTargets < 0).nonzero()[0]
+            pointers = direct[chained]
+            while len(chained) > 0:
+                found = targets[pointers]
+                isFound = found >= 0
+                blockTargets[chained[isFound]] = found[isFound]
+                chained = chained[~isFound]
+                pointers = direct[pointers[~isFound] - start]
+
+            # pairs of repeated targets within the links of a node in a layer
+            later, earlier = [numpy.zeros(0, dtype=numpy.int64)], []
+            for d in range(1, maxM):
+                isRepeat = (groupStarts[d:] <= edges[d:] - d) & (
+                    blockTargets[d:] == blockTargets[:-d]
+                )
+                later.append(isRepeat.nonzero()[0] + d)
+                earlier.append(later[-1] - d)
+            later = numpy.concatenate(later)
+            earlier = numpy.concatenate([later[:0]] + earlier)
+            repeated = numpy.zeros(len(edges), dtype=bool)
+            repeated[later] = True
+
+            # a repeat is redrawn only if neither of the targets depends on an
+            # edge that is redrawn, as the targets would not be final otherwise
+            tainted = numpy.zeros(len(edges), dtype=bool)
+            chained = (known < 0).nonzero()[0]
+            pointers = direct[chained]
+            while len(chained) > 0:
+                isChained = pointers >= start
+                chained, pointers = chained[isChained], pointers[isChained] - start
+                tainted[chained] |= repeated[pointers]
+                isChained = known[pointers] < 0
+                chained = chained[isChained]
+                pointers = direct[pointers[isChained]]
+            final = ~tainted[later] & ~tainted[earlier] & ~repeated[earlier]
+            redraw = numpy.unique(later[final]) + start
+
+        targets[start:end] = blockTargets
+        start = end
+
+    return sources, targets, layers
+
+
+def ensemble(
+    model,
+    count,
+    *args,
+    statistic=None,
+    seed=None,
+    workers=None,
+    chunkSize=None,
+    progress=None,
+    **kwargs,
+):
+    """Generates many realizations of a network model.
+
+    Each realization is generated with its own seed, which is derived from the
+    seed of the ensemble and the index of the realization. The results are thus
+    reproducible, and they do not depend on the number of workers.
 
-            for j in link_set:
-                net[i, j, layer] = 1
+    Parameters
+    ----------
+    model : function
+       The network model, called as model(*args, **kwargs), e.g., er, conf,
+       er_multilayer, er_partially_interconnected, ba_total_degree,
+       conf_overlaps or full. The model should use the random module as the
+       source of randomness, which is true for all of the models in this module.
+    count : int
+       Number of realizations.
+    *args
+       Positional arguments given to the model.
+    statistic : function, None
+       If given, each realization is reduced to statistic(net) right after it
+       is generated, and only the statistics are returned. When workers are
+       used, the networks then never have to be sent between the processes.
+    seed : int, None
+       The seed of the ensemble. If None, the seed is drawn from the random
+       module, and the ensemble can be reproduced with random.seed.
+    workers : int, None
+       If given, the realizations are divided between this many worker
+       processes.
+    chunkSize : int, None
+       Number of realizations given to a worker at a time. By default the
+       realizations are divided to four chunks per worker.
+    progress : function, None
+       If given, this function is called after each chunk with the total
+       number of realizations generated so far.
+    **kwargs
+       Other arguments given to the model.
 
-        for link_set in link_sets:
-            links += list(link_set)
-            links += [i] * (len(link_set))
+    Returns
+    -------
+    results : list
+       The realizations, or their statistics if statistic is given, in the
+       order of the realization indices.
 
-    return net
+    See also
+    --------
+    conf_ensemble : batch generation of configuration model networks
+
+    Examples
+    --------
+    Computing the global clustering coefficient for a thousand realizations of
+    a multiplex Erdos-Renyi network in four processes:
+
+    >>> ccs = models.ensemble(models.er, 1000, 100, [0.1, 0.2],
+    ...                       statistic=cc.gcc_aw, workers=4)
+    """
+    from ._parallel import _map_chunks
+
+    if seed is None:
+        seed = random.getrandbits(128)
+
+    if chunkSize is None:
+        chunkSize = max(1, -(-count // (4 * (workers or 1))))
+    chunks = [range(i, min(i + chunkSize, count)) for i in range(0, count, chunkSize)]
+
+    ensembleArgs = (model, args, kwargs, statistic, seed)
+    values = _map_chunks(_generate_chunk, ensembleArgs, chunks, workers, progress)
+    return [value for chunkValues in values for value in chunkValues]
+
+
+def _generate_chunk(args, indices):
+    import numpy
+
+    model, modelArgs, kwargs, statistic, seed = args
+    state = random.getstate()
+    try:
+        values = []
+        for index in indices:
+            seedSequence = numpy.random.SeedSequence(seed, spawn_key=(index,))
+            random.seed(
+                int.from_bytes(seedSequence.generate_state(4).tobytes(), "little")
+            )
+            net = model(*modelArgs, **kwargs)
+            values.append(net if statistic is None else statistic(net))
+        return values
+    finally:
+        random.setstate(state)
 
 
 try:
@@ -4,6 +4,7 @@
 import itertools
 import math
 import pickle
+from array import array
 
 import pymnet.transforms as transforms
 
@@ -123,6 +124,91 @@ class MultilayerNetwork(object):
 
         # should keep table of degs and strenghts
 
+    # Caching of degrees is off unless cache_degrees is called
+    _degreeCache = None
+
+    def cache_degrees(self, cache=True):
+        """Turns the caching of degrees and strengths on or off.
+
+        When the cache is on, the degrees and strengths of the node-layers
+        towards each neighboring layer are kept up to date every time a link
+        is set or removed. Strengths, degrees restricted to given layers and
+        the number of edges can then be read without iterating through the
+        neighbors of the node-layers. Setting links becomes slightly slower.
+        Multiplex networks cache only their intra-layer networks, see
+        MultiplexNetwork.cache_degrees.
+
+        Parameters
+        ----------
+        cache : bool
+           If True, the cache is built from the current edges of the network.
+           If False, the cache is removed.
+
+        Notes
+        -----
+        The cached strengths are maintained as running sums of the weights, so
+        with float weights they can differ from the sums computed from scratch
+        by a rounding error. The cache is not pickled, so it is off in copies
+        of the network made by pickling, e.g., in worker processes.
+        """
+        if cache:
+            self._degreeCache = DegreeCache(self)
+        else:
+            self._degreeCache = None
+
+    # Number of modifications made to the network, used for invalidating the
+    # data cached by get_derived
+    _version = 0
+    _derivedData = None
+
+    def get_derived(self, key, function):
+        """Returns data derived from the network, such as its aggregated
+        network, cached until the network is modified.
+
+        Parameters
+        ----------
+        key : hashable
+           Name of the data, e.g., 'aggregate'.
+        function : function
+           Called as function(net) to compute the data if it is not in the
+           cache or the network has been modified after it was computed.
+
+        Notes
+        -----
+        Modifications are tracked by the methods adding and removing nodes,
+        layers and links, so changing the attributes of the network (e.g. the
+        couplings) directly does not invalidate the cache. The cached objects
+        are shared between all callers and should not be modified.
+        """
+        version = self._get_version()
+        if self._derivedData is None or self._derivedData[0] != version:
+            self._derivedData = (version, {})
+        data = self._derivedData[1]
+        if key not in data:
+            data[key] = function(self)
+        return data[key]
+
+    def _get_version(self):
+        return self._version
+
+    # Attributes holding cached data, which are not pickled. They would
+    # otherwise change the hash of the network, which is computed from its
+    # pickle, when the caches are filled or emptied.
+    _cacheAttributes = (
+        "_version",
+        "_derivedData",
+        "_degreeCache",
+        "_cacheIntraDegrees",
+    )
+
+    def __getstate__(self):
+        """Returns the state of the network for pickling, without the cached
+        data. Caching of degrees is off in the unpickled network."""
+        state = self.__dict__.copy()
+        for name in self._cacheAttributes:
+            state.pop(name, None)
+        return state
+
     def _init_slices(self, aspects):
         self.slices = []  # set for each dimension
         for a in range(aspects + 1):
@@ -206,6 +292,7 @@ class MultilayerNetwork(object):
         if isinstance(layer, list):  # Lists as layers allowed
             layer = tuple(layer)
 
+        self._version += 1
         self.slices[0].add(node)
         if layer != None and not self.fullyInterconnected:
             # check that the layer exists, if not add it.
@@ -222,6 +309,7 @@ class MultilayerNetwork(object):
 
     def _add_node_to_layer(self, node, layer):
         """Add node to layer. Network must not be node-aligned."""
+        self._version += 1
         if node not in self._nodeToLayers:
             self._nodeToLayers[node] = set()
         self._nodeToLayers[node].add(layer)
@@ -242,12 +330,253 @@ class MultilayerNetwork(object):
         if aspect == 0:
             self.add_node(layer)
         else:
+            self._version += 1
             self.slices[aspect].add(layer)
             # The layers are added to self._layerToNodes in a lazy way.
             # if not self.fullyInterconnected:
             #    if layer not in self._layerToNodes:
             #        self._layerToNodes[layer]=set()
 
+    def add_edges(
+        self, edges=None, node1=None, node2=None, layer1=None, layer2=None, weight=1
+    ):
+        """Adds multiple edges to the network at once.
+
+        The edges can be given either as an iterable of edge tuples, as a numpy
+        structured array, or as separate columns. The edges are validated and the
+        new nodes and layers are added to the network only once for the whole batch,
+        which makes this much faster than setting the edges one by one.
+
+        Parameters
+        ----------
+        edges : iterable, numpy structured array, or None
+           Edge tuples in the same format as produced by the edge iterator, i.e.,
+           (i,j,s_1,r_1, ... ,s_d,r_d,w), or (i,j,s_1,r_1, ... ,s_d,r_d) in which
+           case the weight is given by the weight parameter. If a structured array
+           is given, its fields are read in the same order as the elements of the
+           edge tuples.
+        node1, node2 : sequence
+           Columns of the source and target nodes of the edges. Used only if edges
+           is None.
+        layer1, layer2 : sequence
+           Columns of the source and target layers of the edges. If there are more
+           than one aspect, a sequence of columns with one column for each aspect.
+           Used only if edges is None.
+        weight : int, float or sequence
+           The weight of all of the edges, or a column of weights.
+
+        Notes
+        -----
+        Edges with weight equal to noEdge are removed from the network as when
+        setting a single edge. Their nodes and layers are still added to the
+        network.
+
+        See also
+        --------
+        remove_edges
+        """
+        links, weights = self._edges_to_columns(
+            edges, node1, node2, layer1, layer2, weight
+        )
+        types = set(map(type, weights))
+        for t in types:
+            if not (issubclass(t, int) or issubclass(t, float)):
+                raise TypeError(
+                    "Trying to set a value of type "
+                    + t.__name__
+                    + " to a link! Only integers and floats are supported."
+                )
+        # Validate the whole batch before the network is modified
+        self._check_links(links)
+        self._add_link_nodes(links)
+        if self.noEdge in weights:
+            keep = [w != self.noEdge for w in weights]
+            self._remove_links(
+                [[e for e, k in zip(column, keep) if not k] for column in links]
+            )
+            links = [[e for e, k in zip(column, keep) if k] for column in links]
+            weights = [w for w, k in zip(weights, keep) if k]
+        if len(weights) > 0:
+            self._set_links(links, weights)
+
+    def remove_edges(
+        self, edges=None, node1=None, node2=None, layer1=None, layer2=None
+    ):
+        """Removes multiple edges from the network at once.
+
+        The parameters are the same as for add_edges, and the weights of the
+        edges are ignored if they are given. The nodes and layers are not
+        removed from the network.
+
+        See also
+        --------
+        add_edges
+        """
+        links, weights = self._edges_to_columns(
+            edges, node1, node2, layer1, layer2, self.noEdge
+        )
+        self._check_links(links)
+        self._remove_links(links)
+
+    def _edges_to_columns(self, edges, node1, node2, layer1, layer2, weight):
+        """Return the edges given to add_edges as a list of 2*(aspects+1) columns
+        in the order of the link tuples, and a list of weights.
+        """
+
+        def to_list(column):
+            if hasattr(column, "tolist"):  # numpy arrays
+                return column.tolist()
+            return list(column)
+
+        d = self.aspects + 1
+        if edges is not None:
+            names = getattr(getattr(edges, "dtype", None), "names", None)
+            if names is not None:
+                columns = [to_list(edges[name]) for name in names]
+                nedges = len(edges)
+            else:
+                rows = list(edges)
+                lengths = set(map(len, rows))
+                if len(lengths) > 1:
+                    raise ValueError("All edges must have the same number of indices.")
+                columns = list(map(list, zip(*rows)))
+                nedges = len(rows)
+            if len(columns) == 2 * d + 1:
+                links, weights = columns[:-1], columns[-1]
+            elif len(columns) == 2 * d or nedges == 0:
+                links, weights = columns, None
+            else:
+                raise KeyError("Invalid number of indices.")
+        else:
+            if node1 is None or node2 is None:
+                raise ValueError("Give either the edges or the node columns.")
+            links = [to_list(node1), to_list(node2)]
+            if self.aspects == 1:
+                layer1, layer2 = [layer1], [layer2]
+            elif self.aspects == 0:
+                layer1, layer2 = [], []
+            if (
+                layer1 is None
+                or layer2 is None
+                or any(column is None for column in itertools.chain(layer1, layer2))
+            ):
+                raise ValueError("Give the layer columns for each aspect.")
+            for column1, column2 in zip(layer1, layer2):
+                links.append(to_list(column1))
+                links.append(to_list(column2))
+            if len(links) != 2 * d:
+                raise KeyError("Invalid number of layer columns.")
+            nedges = len(links[0])
+            weights = None
+
+        if len(links) == 0:
+            links = [[] for i in range(2 * d)]
+        if weights is None:
+            if isinstance(weight, int) or isinstance(weight, float):
+                weights = [weight] * nedges
+            else:
+                weights = to_list(weight)
+        if any(len(column) != len(weights) for column in links):
+            raise ValueError("All the columns must be of the same length.")
+        return links, weights
+
+    def _check_links(self, links):
+        """Raise an error if a batch of links cannot be set in the network.
+
+        This is called before the network is modified, so that a rejected batch
+        leaves the network unchanged.
+        """
+        pass
+
+    def _add_link_nodes(self, links):
+        """Add the nodes, layers, and node-layers of a batch of links to the network."""
+        for a in range(self.aspects + 1):
+            if self.fullyInterconnected or a > 0:
+                for elayer in set(links[2 * a]).union(links[2 * a + 1]):
+                    if elayer not in self.slices[a]:
+                        self.add_layer(elayer, a)
+        if not self.fullyInterconnected:
+            nodelayers = set(zip(links[0], *links[2::2]))
+            nodelayers.update(zip(links[1], *links[3::2]))
+            for nl in nodelayers:
+                layer = nl[1] if self.aspects == 1 else nl[1:]
+                if nl[0] not in self._nodeToLayers or (
+                    layer not in self._nodeToLayers[nl[0]]
+                ):
+                    self.add_node(nl[0], layer=layer)
+
+    def _set_links(self, links, weights):
+        """Set a batch of links given as columns. The nodes and layers must
+        already be in the network and the weights must be valid."""
+        self._add_links(
+            list(zip(links[0], *links[2::2])),
+            list(zip(links[1], *links[3::2])),
+            weights,
+        )
+
+    def _add_links(self, nodes1, nodes2, weights):
+        """Add links between the nodes of the graph representing the multislice
+        structure. None of the weights can be noEdge."""
+        self._version += 1
+        net = self._net
+        cache = self._degreeCache
+        for node1, node2, value in zip(nodes1, nodes2, weights):
+            if node1 not in net:
+                net[node1] = {}
+            if node2 not in net:
+                net[node2] = {}
+            if cache is not None:
+                cache.update_link(
+                    node1,
+                    node2,
+                    net[node1].get(node2, self.noEdge),
+                    value,
+                    node1 in net[node2],
+                )
+            net[node1][node2] = value
+            if not self.directed:
+                net[node2][node1] = value
+        if self.directed:
+            rnet = self._rnet
+            for node1, node2, value in zip(nodes1, nodes2, weights):
+                if node1 not in rnet:
+                    rnet[node1] = {}
+                if node2 not in rnet:
+                    rnet[node2] = {}
+                rnet[node2][node1] = value
+            self._update_total_degrees(set(nodes1).union(nodes2))
+
+    def _remove_links(self, links):
+        """Remove a batch of links given as columns."""
+        self._version += 1
+        nodes1 = list(zip(links[0], *links[2::2]))
+        nodes2 = list(zip(links[1], *links[3::2]))
+        net = self._net
+        cache = self._degreeCache
+        for node1, node2 in zip(nodes1, nodes2):
+            if node1 in net and node2 in net[node1]:
+                if cache is not None:
+                    cache.update_link(
+                        node1,
+                        node2,
+                        net[node1][node2],
+                        self.noEdge,
+                        node1 in net[node2],
+                    )
+                del net[node1][node2]
+                if self.directed:
+                    del self._rnet[node2][node1]
+                else:
+                    net[node2].pop(node1, None)
+        if self.directed:
+            self._update_total_degrees(set(nodes1).union(nodes2))
+
+    def _update_total_degrees(self, nodes):
+        """Recompute the total degrees of the given nodes in a directed network."""
+        for node in nodes:
+            neighbors = self._net.get(node, {}).keys() | self._rnet.get(node, {}).keys()
+            self._totalDegree[node] = len(neighbors)
+
     def _get_link(self, link):
         """Return link weight or 0 if no link.
 
@@ -273,6 +602,15 @@ class MultilayerNetwork(object):
             )
         # keep track of nodes and layers in net?
         node1, node2 = self._link_to_nodes(link)
+        self._version += 1
+        if self._degreeCache is not None:
+            self._degreeCache.update_link(
+                node1,
+                node2,
+                self._net.get(node1, {}).get(node2, self.noEdge),
+                value,
+                node1 in self._net.get(node2, {}),
+            )
         if value == self.noEdge:
             if node1 in self._net:
                 if node2 in self._net[node1]:
@@ -287,13 +625,10 @@ class MultilayerNetwork(object):
                                 or node2 not in self._rnet[node1]
                             ):
                                 self._totalDegree[node1] = self._totalDegree[node1] - 1
-                            if (
-                                node2 not in self._rnet
-                                or node1 not in self._rnet[node2]
-                            ):
+                            if node1 not in self._net[node2]:
                                 self._totalDegree[node2] = self._totalDegree[node2] - 1
                         del self._rnet[node2][node1]
-                    else:
+                    elif node1 != node2:
                         del self._net[node2][node1]
                     del self._net[node1][node2]
         else:
@@ -342,13 +677,13 @@ class MultilayerNetwork(object):
 
         See _iter_neighbors for description of the parameters.
         """
-        # TODO: lookuptables for intradimensional degrees
-
         if dims == None:
             if node in self._net:
                 return len(self._net[node])
             else:
                 return 0
+        elif self._degreeCache is not None and dims[0] == None:
+            return self._degreeCache.get_degree(node, dims, direction="out")
         else:
             return len(list(self._iter_neighbors_out(node, dims)))
 
@@ -357,6 +692,8 @@ class MultilayerNetwork(object):
         assert self.directed
         if dims == None:
             return self._totalDegree.get(node, 0)
+        elif self._degreeCache is not None and dims[0] == None:
+            return self._degreeCache.get_degree(node, dims, direction="tot")
         else:
             return len(list(self._iter_neighbors_total(node, dims)))
 
@@ -368,6 +705,8 @@ class MultilayerNetwork(object):
                 return len(self._rnet[node])
             else:
                 return 0
+        elif self._degreeCache is not None and dims[0] == None:
+            return self._degreeCache.get_degree(node, dims, direction="in")
         else:
             return len(list(self._iter_neighbors_in(node, dims)))
 
@@ -391,6 +730,8 @@ class MultilayerNetwork(object):
 
     def _get_strength_in_dir(self, node, dims=None):
         """Private method returning nodes in-strenght."""
+        if self._degreeCache is not None and (dims == None or dims[0] == None):
+            return self._degreeCache.get_strength(node, dims, direction="in")
         return sum(
             map(
                 lambda n: self._get_link(self._nodes_to_link(n, node)),
@@ -400,6 +741,8 @@ class MultilayerNetwork(object):
 
     def _get_strength_out(self, node, dims=None):
         """Private method returning nodes out-strenght."""
+        if self._degreeCache is not None and (dims == None or dims[0] == None):
+            return self._degreeCache.get_strength(node, dims, direction="out")
         return sum(
             map(
                 lambda n: self._get_link(self._nodes_to_link(node, n)),
@@ -661,7 +1004,7 @@ class MultilayerNetwork(object):
     def __hash__(self):
         return pickle.dumps(self).__hash__()
 
-    def get_supra_adjacency_matrix(self, includeCouplings=True):
+    def get_supra_adjacency_matrix(self, includeCouplings=True, sparse=False):
         """Return the supra-adjacency matrix and a list of node-layer pairs.
 
         Parameters
@@ -669,12 +1012,21 @@ class MultilayerNetwork(object):
         includeCoupings : bool
            If True, the inter-layer edges are included, if False, only intra-layer
            edges are included.
+        sparse : bool
+           If True, the matrix is returned as a scipy.sparse CSR matrix instead
+           of a dense numpy matrix.
 
         Returns
         -------
-        matrix, nodes : numpy.matrix, list
+        matrix, nodes : numpy.matrix or scipy.sparse.csr_matrix, list
            The supra-adjacency matrix and the list of node-layer pairs. The order
            of the elements in the list and the supra-adjacency matrix are the same.
+
+        Notes
+        -----
+        The matrix is built from the edge list of the network, so the running
+        time is linear in the number of edges and node-layers. The sparse version
+        should be used for large networks.
         """
         import numpy
 
@@ -692,20 +1044,51 @@ class MultilayerNetwork(object):
                     ),
                 )
             )
-            matrix = numpy.zeros((len(nodes), len(nodes)), dtype=float)
-            for i_index, i in enumerate(nodes):
-                for j_index, j in enumerate(nodes):
-                    if includeCouplings or i[1:] == j[1:]:
-                        matrix[i_index, j_index] = self[i][j]
         else:
             nodes = sorted(self)
-            matrix = numpy.zeros((len(nodes), len(nodes)), dtype=float)
-            for i_index, i in enumerate(nodes):
-                for j_index, j in enumerate(nodes):
-                    if i_index != j_index:
-                        matrix[i_index, j_index] = self[i][j]
 
-        return numpy.matrix(matrix), nodes
+        matrix = self._get_sparse_supra_adjacency_matrix(nodes, includeCouplings)
+        if sparse:
+            return matrix, nodes
+        return numpy.matrix(matrix.toarray()), nodes
+
+    def _get_sparse_supra_adjacency_matrix(self, nodes, includeCouplings):
+        """Return the supra-adjacency matrix as a sparse CSR matrix with rows
+        and columns ordered as in the list of node-layer tuples.
+        """
+        import numpy
+        import scipy.sparse
+
+        nodeToIndex = dict((node, i) for i, node in enumerate(nodes))
+        rows, cols, data = array("q"), array("q"), array("d")
+        for edge in self.edges:
+            node1, node2 = self._link_to_nodes(edge[:-1])
+            if self.aspects == 0:
+                if node1 == node2:
+                    continue
+                i, j = nodeToIndex[node1[0]], nodeToIndex[node2[0]]
+            else:
+                if not includeCouplings and node1[1:] != node2[1:]:
+                    continue
+                i, j = nodeToIndex[node1], nodeToIndex[node2]
+            rows.append(i)
+            cols.append(j)
+            data.append(edge[-1])
+            if not self.directed and i != j:
+                rows.append(j)
+                cols.append(i)
+                data.append(edge[-1])
+
+        return scipy.sparse.csr_matrix(
+            (
+                numpy.array(data, dtype=float),
+                (
+                    numpy.array(rows, dtype=numpy.int64),
+                    numpy.array(cols, dtype=numpy.int64),
+                ),
+            ),
+            shape=(len(nodes), len(nodes)),
+        )
 
 
 class MultilayerNode(object):
@@ -849,6 +1232,8 @@ class MultilayerEdges:
                 iterated.add(node)
 
     def __len__(self):
+        if self.net._degreeCache is not None:
+            return self.net._degreeCache.edges
         deg = 0
         if self.net.directed:
             for nl in self.net.iter_node_layers():
@@ -865,6 +1250,517 @@ class MultilayerEdges:
 MultilayerNetwork.edges = property(MultilayerEdges)
 
 
+class DegreeCache(object):
+    """Degrees and strengths of the node-layers of a multilayer network.
+
+    For each node-layer, the number of neighbors and the sum of the link
+    weights are stored separately for each layer of the neighbors. The tables
+    are updated by the network every time a link is changed.
+
+    Parameters
+    ----------
+    net : MultilayerNetwork
+       The network whose current edges are used to fill the tables.
+    """
+
+    def __init__(self, net):
+        self.directed = net.directed
+        self.noEdge = net.noEdge
+        self.edges = 0
+        self._out = {}
+        if self.directed:
+            self._in = {}
+            self._tot = {}
+
+        selfEdges = 0
+        for node, neighbors in net._net.items():
+            self.edges += len(neighbors)
+            for neigh, value in neighbors.items():
+                self._add(self._out, node, neigh, 1, value)
+            if node in neighbors:
+                selfEdges += 1
+            if self.directed:
+                for neigh, value in net._rnet.get(node, {}).items():
+                    self._add(self._in, node, neigh, 1, value)
+                for neigh in neighbors.keys() | net._rnet.get(node, {}).keys():
+                    self._add(self._tot, node, neigh, 1, 0)
+        if not self.directed:
+            self.edges = (self.edges + selfEdges) // 2
+
+    def _add(self, table, node, neigh, degree, strength):
+        layers = table.get(node)
+        if layers is None:
+            layers = table[node] = {}
+        entry = layers.get(neigh[1:])
+        if entry is None:
+            entry = layers[neigh[1:]] = [0, 0]
+        entry[0] += degree
+        entry[1] += strength
+        if entry[0] == 0:
+            # Drop empty entries so that rounding errors do not accumulate
+            del layers[neigh[1:]]
+            if len(layers) == 0:
+                del table[node]
+
+    def update_link(self, node1, node2, old, new, reverse):
+        """Update the tables when the weight of the link from node1 to node2
+        changes from old to new. The parameter reverse tells if there is a
+        link from node2 to node1 before the change."""
+        if old == self.noEdge:
+            if new == self.noEdge:
+                return
+            degree, strength = 1, new
+        elif new == self.noEdge:
+            degree, strength = -1, -old
+        else:
+            degree, strength = 0, new - old
+        self.edges += degree
+
+        self._add(self._out, node1, node2, degree, strength)
+        if self.directed:
+            self._add(self._in, node2, node1, degree, strength)
+            if degree != 0 and (node1 == node2 or not reverse):
+                self._add(self._tot, node1, node2, degree, 0)
+                if node1 != node2:
+                    self._add(self._tot, node2, node1, degree, 0)
+        elif node1 != node2:
+            self._add(self._out, node2, node1, degree, strength)
+
+    def _sum(self, direction, node, dims, index):
+        if not self.directed or direction == "out":
+            table = self._out
+        elif direction == "in":
+            table = self._in
+        else:
+            table = self._tot
+        s = 0
+        for layer, entry in table.get(node, {}).items():
+            if dims == None or all(
+                d == None or d == l for d, l in zip(dims[1:], layer)
+            ):
+                s += entry[index]
+        return s
+
+    def get_degree(self, node, dims=None, direction="out"):
+        """Return the number of neighbors of the node in the layers given by
+        dims. The first element of dims must be None."""
+        return self._sum(direction, node, dims, 0)
+
+    def get_strength(self, node, dims=None, direction="out"):
+        """Return the strength of the node in the layers given by dims. The
+        first element of dims must be None."""
+        return self._sum(direction, node, dims, 1)
+
+
+class CSRMultilayerNetwork(MultilayerNetwork):
+    """General multilayer network stored in compressed sparse row arrays.
+
+    This class has the same constructor parameters and the same tensor-like
+    interface as MultilayerNetwork, but the edges are kept in flat arrays
+    instead of nested dictionaries. Each node-layer tuple is given an integer
+    index, and the out-neighbors of each node-layer (and the in-neighbors in
+    directed networks) are stored as a contiguous slice of an index array and
+    a weight array.
+
+    Edges are appended to a buffer when they are set, and the buffer is merged
+    into the arrays (the network is frozen) when the network is read for the
+    first time after the modifications. The storage is thus most efficient when
+    all the edges are first added and the network is only read after that.
+
+    Parameters
+    ----------
+    aspects : int
+       Number of aspects
+    noEdge : object
+       Any object signifying that there is no edge.
+    directed : bool
+       True if the network is directed, otherwise it's
+       undirected.
+    fullyInterconnected : bool
+       Determines if the network is fully interconnected, i.e. all nodes
+       are shared between all layers. Ignored if aspects==0.
+
+    Notes
+    -----
+    The edge weights are stored as floats. If only integer weights have been
+    set to the network, the weights are returned as integers.
+
+    Setting a single edge after the network has been frozen is cheap, but the
+    next read merges the whole buffer into the arrays, which takes time linear
+    in the number of edges. Alternating single writes and reads should thus be
+    avoided.
+
+    See also
+    --------
+    MultilayerNetwork : The default dictionary based implementation
+    """
+
+    def __init__(self, aspects=0, noEdge=0, directed=False, fullyInterconnected=True):
+        MultilayerNetwork.__init__(
+            self,
+            aspects=aspects,
+            noEdge=noEdge,
+            directed=directed,
+            fullyInterconnected=fullyInterconnected,
+        )
+        self._nodeLayerToIndex = {}
+        self._indexToNodeLayer = []
+        self._intWeights = True
+        self._clear_buffer()
+
+        import numpy
+
+        self._indptr = numpy.zeros(1, dtype=numpy.int64)
+        self._indices = numpy.zeros(0, dtype=numpy.int64)
+        self._weights = numpy.zeros(0, dtype=float)
+        if self.directed:
+            self._rindptr = numpy.zeros(1, dtype=numpy.int64)
+            self._rindices = numpy.zeros(0, dtype=numpy.int64)
+            self._rweights = numpy.zeros(0, dtype=float)
+
+    def cache_degrees(self, cache=True):
+        """Overrides parents method. The degrees and strengths are read from
+        the arrays, so no cache is kept."""
+        pass
+
+    def _clear_buffer(self):
+        self._bufferSource = array("q")
+        self._bufferTarget = array("q")
+        self._bufferWeight = array("d")
+        self._bufferPresent = array("b")
+
+    def _get_index(self, node, create=False):
+        """Return the integer index of a node-layer tuple, or None if it has no index."""
+        index = self._nodeLayerToIndex.get(node)
+        if index is None and create:
+            index = len(self._indexToNodeLayer)
+            self._nodeLayerToIndex[node] = index
+            self._indexToNodeLayer.append(node)
+        return index
+
+    def _to_weight(self, value):
+        return int(value) if self._intWeights else float(value)
+
+    def freeze(self):
+        """Merge the buffered edge modifications into the sparse arrays.
+
+        This is called automatically when the network is read, but it can
+        be called explicitly after all the edges have been added.
+        """
+        if len(self._bufferSource) == 0:
+            return
+        import numpy
+
+        n = len(self._indexToNodeLayer)
+        source = numpy.array(self._bufferSource, dtype=numpy.int64)
+        target = numpy.array(self._bufferTarget, dtype=numpy.int64)
+        weight = numpy.array(self._bufferWeight, dtype=float)
+        present = numpy.array(self._bufferPresent, dtype=bool)
+        self._clear_buffer()
+
+        if not self.directed:
+            # Each undirected edge is stored in both directions. The reversed
+            # entry directly follows the original one so that the order of
+            # the modifications is kept.
+            source, target = (
+                numpy.column_stack((source, target)).ravel(),
+                numpy.column_stack((target, source)).ravel(),
+            )
+            weight = numpy.repeat(weight, 2)
+            present = numpy.repeat(present, 2)
+
+        oldSource = numpy.repeat(
+            numpy.arange(len(self._indptr) - 1, dtype=numpy.int64),
+            numpy.diff(self._indptr),
+        )
+        source = numpy.concatenate((oldSource, source))
+        target = numpy.concatenate((self._indices, target))
+        weight = numpy.concatenate((self._weights, weight))
+        present = numpy.concatenate(
+            (numpy.ones(len(self._indices), dtype=bool), present)
+        )
+
+        # Only the last modification of each edge is kept
+        key = source * n + target
+        order = numpy.argsort(key, kind="stable")
+        key = key[order]
+        last = numpy.ones(len(key), dtype=bool)
+        last[:-1] = key[1:] != key[:-1]
+        order = order[last]
+        order = order[present[order]]
+
+        source, target, weight = source[order], target[order], weight[order]
+
+        self._indptr, self._indices, self._weights = self._build_csr(
+            n, source, target, weight
+        )
+        if self.directed:
+            order = numpy.argsort(target * n + source, kind="stable")
+            self._rindptr, self._rindices, self._rweights = self._build_csr(
+                n, target[order], source[order], weight[order]
+            )
+
+    def _build_csr(self, n, source, target, weight):
+        """Return the CSR arrays for edges sorted by source and target."""
+        import numpy
+
+        indptr = numpy.zeros(n + 1, dtype=numpy.int64)
+        numpy.cumsum(numpy.bincount(source, minlength=n), out=indptr[1:])
+        if n <= numpy.iinfo(numpy.int32).max:
+            target = target.astype(numpy.int32)
+        return indptr, target, weight
+
+    def _neighbor_slice(self, node, reverse=False):
+        """Return the indices and weights of the neighbors of a node-layer tuple."""
+        self.freeze()
+        index = self._nodeLayerToIndex.get(node)
+        if reverse:
+            indptr, indices, weights = self._rindptr, self._rindices, self._rweights
+        else:
+            indptr, indices, weights = self._indptr, self._indices, self._weights
+        if index is None or index >= len(indptr) - 1:
+            return indices[0:0], weights[0:0]
+        start, end = indptr[index], indptr[index + 1]
+        return indices[start:end], weights[start:end]
+
+    def _get_link(self, link):
+        """Overrides parents method."""
+        node1, node2 = self._link_to_nodes(link)
+        index2 = self._nodeLayerToIndex.get(node2)
+        if index2 is None:
+            return self.noEdge
+        indices, weights = self._neighbor_slice(node1)
+        pos = indices.searchsorted(index2)
+        if pos < len(indices) and indices[pos] == index2:
+            return self._to_weight(weights[pos])
+        return self.noEdge
+
+    def _set_link(self, link, value):
+        """Overrides parents method."""
+        if not (isinstance(value, int) or isinstance(value, float)):
+            raise TypeError(
+                "Trying to set a value of type "
+                + type(value).__name__
+                + " to a link! Only integers and floats are supported."
+            )
+        node1, node2 = self._link_to_nodes(link)
+        self._version += 1
+        if value == self.noEdge:
+            index1, index2 = self._get_index(node1), self._get_index(node2)
+            if index1 is None or index2 is None:
+                return
+            self._bufferWeight.append(0.0)
+            self._bufferPresent.append(False)
+        else:
+            index1 = self._get_index(node1, create=True)
+            index2 = self._get_index(node2, create=True)
+            if isinstance(value, float):
+                self._intWeights = False
+            self._bufferWeight.append(value)
+            self._bufferPresent.append(True)
+        self._bufferSource.append(index1)
+        self._bufferTarget.append(index2)
+
+    def _add_links(self, nodes1, nodes2, weights):
+        """Overrides parents method."""
+        self._version += 1
+        get_index = self._get_index
+        self._bufferSource.extend(get_index(node, create=True) for node in nodes1)
+        self._bufferTarget.extend(get_index(node, create=True) for node in nodes2)
+        self._bufferWeight.extend(weights)
+        self._bufferPresent.extend([True] * len(weights))
+        if self._intWeights and not all(isinstance(w, int) for w in weights):
+            self._intWeights = False
+
+    def _remove_links(self, links):
+        """Overrides parents method."""
+        self._version += 1
+        get_index = self._nodeLayerToIndex.get
+        for node1, node2 in zip(
+            zip(links[0], *links[2::2]), zip(links[1], *links[3::2])
+        ):
+            index1, index2 = get_index(node1), get_index(node2)
+            if index1 is not None and index2 is not None:
+                self._bufferSource.append(index1)
+                self._bufferTarget.append(index2)
+                self._bufferWeight.append(0.0)
+                self._bufferPresent.append(False)
+
+    def _iter_indices(self, indices, dims):
+        for index in indices.tolist():
+            neigh = self._indexToNodeLayer[index]
+            if dims == None or all(
+                dims[i] == None or neigh[i] == dims[i] for i in range(len(dims))
+            ):
+                yield neigh
+
+    def _iter_neighbors_out(self, node, dims=None):
+        """Overrides parents method."""
+        indices, weights = self._neighbor_slice(node)
+        return self._iter_indices(indices, dims)
+
+    def _iter_neighbors_in_dir(self, node, dims=None):
+        """Overrides parents method."""
+        indices, weights = self._neighbor_slice(node, reverse=True)
+        return self._iter_indices(indices, dims)
+
+    def _get_degree_out(self, node, dims=None):
+        """Overrides parents method."""
+        if dims == None:
+            return len(self._neighbor_slice(node)[0])
+        return len(list(self._iter_neighbors_out(node, dims)))
+
+    def _get_degree_in_dir(self, node, dims=None):
+        """Overrides parents method."""
+        if dims == None:
+            return len(self._neighbor_slice(node, reverse=True)[0])
+        return len(list(self._iter_neighbors_in_dir(node, dims)))
+
+    def _get_degree_total_dir(self, node, dims=None):
+        """Overrides parents method."""
+        if dims == None:
+            import numpy
+
+            out_indices = self._neighbor_slice(node)[0]
+            in_indices = self._neighbor_slice(node, reverse=True)[0]
+            both = numpy.intersect1d(out_indices, in_indices, assume_unique=True)
+            return len(out_indices) + len(in_indices) - len(both)
+        return len(list(self._iter_neighbors_total(node, dims)))
+
+    def _get_strength_out(self, node, dims=None):
+        """Overrides parents method."""
+        if dims == None:
+            return self._to_weight(self._neighbor_slice(node)[1].sum())
+        return MultilayerNetwork._get_strength_out(self, node, dims)
+
+    def _get_strength_in_dir(self, node, dims=None):
+        """Overrides parents method."""
+        if dims == None:
+            return self._to_weight(self._neighbor_slice(node, reverse=True)[1].sum())
+        return MultilayerNetwork._get_strength_in_dir(self, node, dims)
+
+
+class CSRMultilayerEdges(MultilayerEdges):
+    def __iter__(self):
+        """Edge iterator."""
+        net = self.net
+        net.freeze()
+        sources = net._indptr[1:] - net._indptr[:-1]
+        for index1, degree in enumerate(sources.tolist()):
+            if degree == 0:
+                continue
+            node1 = net._indexToNodeLayer[index1]
+            start = net._indptr[index1]
+            indices = net._indices[start : start + degree].tolist()
+            weights = net._weights[start : start + degree].tolist()
+            for index2, weight in zip(indices, weights):
+                if net.directed or index1 <= index2:
+                    node2 = net._indexToNodeLayer[index2]
+                    yield net._nodes_to_link(node1, node2) + (net._to_weight(weight),)
+
+    def __len__(self):
+        net = self.net
+        net.freeze()
+        if net.directed:
+            return len(net._indices)
+        import numpy
+
+        sources = numpy.repeat(
+            numpy.arange(len(net._indptr) - 1), numpy.diff(net._indptr)
+        )
+        selfEdges = int(numpy.count_nonzero(sources == net._indices))
+        return (len(net._indices) + selfEdges) // 2
+
+
+CSRMultilayerNetwork.edges = property(CSRMultilayerEdges)
+
+
+class _NodeLayerList(object):
+    """The node-layer tuples of a CSRMultilayerNetwork in the order of their
+    indices, given as a table of label indices, e.g., memory-mapped from a
+    file. The tuples are decoded from the table only when they are accessed.
+    Node-layers appended later are kept in a list."""
+
+    def __init__(self, labels, table):
+        self._labels = labels
+        self._table = table
+        self._appended = []
+
+    def __len__(self):
+        return len(self._table) + len(self._appended)
+
+    def __getitem__(self, index):
+        if index >= len(self._table):
+            return self._appended[index - len(self._table)]
+        return tuple(
+            labels[i] for labels, i in zip(self._labels, self._table[index].tolist())
+        )
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def append(self, nodelayer):
+        self._appended.append(nodelayer)
+
+
+class _NodeLayerIndex(object):
+    """The indices of the node-layer tuples of a CSRMultilayerNetwork, given
+    as a table of label indices like in _NodeLayerList. The rows of the table
+    are encoded as integers, which are sorted for searching when the first
+    node-layer is looked up. Node-layers added later are kept in a dict."""
+
+    def __init__(self, labels, table):
+        self._labelToIndex = [
+            dict((label, i) for i, label in enumerate(aspectLabels))
+            for aspectLabels in labels
+        ]
+        self._table = table
+        self._keys = None
+        self._order = None
+        self._added = {}
+
+    def _build_keys(self):
+        import numpy
+
+        if math.prod(len(l) for l in self._labelToIndex) >= 2**63:
+            # The keys would overflow, so the rows are put in a dict instead
+            self._keys = dict(
+                (tuple(row), i) for i, row in enumerate(self._table.tolist())
+            )
+            return
+        keys = numpy.zeros(len(self._table), dtype=numpy.int64)
+        for a, labelToIndex in enumerate(self._labelToIndex):
+            keys = keys * len(labelToIndex) + self._table[:, a]
+        self._order = numpy.argsort(keys, kind="stable")
+        self._keys = keys[self._order]
+
+    def get(self, nodelayer, default=None):
+        index = self._added.get(nodelayer)
+        if index is not None:
+            return index
+        row = []
+        for labelToIndex, label in zip(self._labelToIndex, nodelayer):
+            i = labelToIndex.get(label)
+            if i is None:
+                return default
+            row.append(i)
+        if self._keys is None:
+            self._build_keys()
+        if isinstance(self._keys, dict):
+            return self._keys.get(tuple(row), default)
+        key = 0
+        for labelToIndex, i in zip(self._labelToIndex, row):
+            key = key * len(labelToIndex) + i
+        pos = int(self._keys.searchsorted(key))
+        if pos < len(self._keys) and self._keys[pos] == key:
+            return int(self._order[pos])
+        return default
+
+    def __setitem__(self, nodelayer, index):
+        self._added[nodelayer] = index
+
+
 class MultiplexIntraNetDict(MutableMapping):
     def __init__(self, net):
         self._net = net
@@ -886,6 +1782,7 @@ class MultiplexIntraNetDict(MutableMapping):
         assert val.aspects == 0, "Intra-layer networks need to be monoplex networks."
 
         if key in self._dict:
+            self._net._version += 1
             self._add_empty_network(key)
             transforms.subnet(val, val, newNet=self[key])  # copy the val to the layer
         else:
@@ -902,6 +1799,8 @@ class MultiplexIntraNetDict(MutableMapping):
                 net._set_name((layer,))
             else:
                 net._set_name(layer)
+        if self._net._cacheIntraDegrees:
+            net.cache_degrees()
         self._dict[layer] = net
 
 
@@ -918,6 +1817,16 @@ class MultilayerNetworkWithParent(MultilayerNetwork):
         else:
             self._layer = name
 
+    @property
+    def _version(self):
+        """The modifications of the intra-layer networks are counted in the
+        version of the multiplex network."""
+        return self.parent._version
+
+    @_version.setter
+    def _version(self, version):
+        self.parent._version = version
+
     def add_node(self, node, layer=None):
         MultilayerNetwork.add_node(self, node, layer=layer)
         if self.parent.fullyInterconnected:
@@ -1026,6 +1935,24 @@ class MultiplexNetwork(MultilayerNetwork):
 
         self._init_directions()
 
+    # Caching of degrees in the intra-layer networks is off unless
+    # cache_degrees is called
+    _cacheIntraDegrees = False
+
+    def cache_degrees(self, cache=True):
+        """Overrides parents method. The degrees and strengths are cached in
+        each of the intra-layer networks, including the ones created later.
+
+        Only the intra-layer part of the degrees and strengths is read from the
+        caches. The coupling degrees are still computed from the layers of the
+        nodes and the couplings, and the number of edges of the multiplex
+        network, len(net.edges), is still counted by iterating over the
+        node-layers.
+        """
+        self._cacheIntraDegrees = cache
+        for net in self.A.values():
+            net.cache_degrees(cache)
+
     def _get_edge_inter_aspects(self, link):
         r"""Return list of aspects where the two nodes of $G_M$ differ."""
         dims = []
@@ -1064,6 +1991,7 @@ class MultiplexNetwork(MultilayerNetwork):
             if aspect == 0:
                 self.add_node(layer)
             else:
+                self._version += 1
                 self.slices[aspect].add(layer)
             # call parent method
             # MultilayerNetwork.add_layer(self,layer,aspect)
@@ -1128,6 +2056,46 @@ class MultiplexNetwork(MultilayerNetwork):
         else:
             raise KeyError("Can only set links in the node dimension.")
 
+    def _check_links(self, links):
+        """Overrides parents method. Raises KeyError if any of the links is not
+        an intra-layer link."""
+        for a in range(1, self.aspects + 1):
+            if links[2 * a] != links[2 * a + 1]:
+                raise KeyError("Can only set links in the node dimension.")
+        if any(n1 == n2 for n1, n2 in zip(links[0], links[1])):
+            raise KeyError("No self-links.")
+
+    def _group_links_by_layer(self, links):
+        """Return a dict with layer tuples as keys and lists of indices of the
+        links in a batch of links as values. The links are assumed to be
+        intra-layer links, see _check_links."""
+        groups = {}
+        for i, layer in enumerate(zip(*links[2::2])):
+            if layer not in groups:
+                groups[layer] = []
+            groups[layer].append(i)
+        return groups
+
+    def _set_links(self, links, weights):
+        """Overrides parents method."""
+        for layer, indices in self._group_links_by_layer(links).items():
+            layerlinks = [
+                [links[0][i] for i in indices],
+                [links[1][i] for i in indices],
+            ]
+            # The nodes were already added to the intra-layer networks
+            self._get_A_with_tuple(layer)._set_links(
+                layerlinks, [weights[i] for i in indices]
+            )
+
+    def _remove_links(self, links):
+        """Overrides parents method."""
+        for layer, indices in self._group_links_by_layer(links).items():
+            if self._has_layer_with_tuple(layer):
+                self._get_A_with_tuple(layer)._remove_links(
+                    [[links[0][i] for i in indices], [links[1][i] for i in indices]]
+                )
+
     def _get_dim_degree(self, supernode, aspect, direction="tot"):
         coupling_type = self.couplings[aspect - 1][0]
         if coupling_type == "categorical":
@@ -1332,6 +2300,122 @@ class MultiplexNetwork(MultilayerNetwork):
                 for n in self._iter_dim(node, d, direction="out"):
                     yield n
 
+    def _get_sparse_supra_adjacency_matrix(self, nodes, includeCouplings):
+        """Overrides parents method.
+
+        The intra-layer edges are read from the intra-layer networks and the
+        coupling edges are generated for each aspect as a Kronecker product of
+        the coupling matrix of the aspect and identity matrices of the other
+        aspects.
+        """
+        import numpy
+        import scipy.sparse
+
+        nodeToIndex = dict((node, i) for i, node in enumerate(nodes))
+        rows, cols, data = array("q"), array("q"), array("d")
+        for layer in self.iter_layers():
+            layertuple = (layer,) if self.aspects == 1 else layer
+            for edge in self.A[layer].edges:
+                if edge[0] == edge[1]:
+                    continue
+                i = nodeToIndex[(edge[0],) + layertuple]
+                j = nodeToIndex[(edge[1],) + layertuple]
+                rows.append(i)
+                cols.append(j)
+                data.append(edge[-1])
+                if not self.directed:
+                    rows.append(j)
+                    cols.append(i)
+                    data.append(edge[-1])
+
+        matrix = scipy.sparse.csr_matrix(
+            (
+                numpy.array(data, dtype=float),
+                (
+                    numpy.array(rows, dtype=numpy.int64),
+                    numpy.array(cols, dtype=numpy.int64),
+                ),
+            ),
+            shape=(len(nodes), len(nodes)),
+        )
+
+        if includeCouplings:
+            if not self.fullyInterconnected:
+                present = numpy.zeros(len(nodes), dtype=float)
+                for nl in self.iter_node_layers():
+                    present[nodeToIndex[nl]] = 1
+                present = scipy.sparse.diags(present)
+
+            for aspect in range(1, self.aspects + 1):
+                coupling = self._get_coupling_matrix(aspect)
+                if coupling is None:
+                    continue
+                # The last aspect changes slowest in the order of node-layers
+                block = scipy.sparse.identity(1, format="csr")
+                for a in reversed(range(self.aspects + 1)):
+                    if a == aspect:
+                        block = scipy.sparse.kron(block, coupling, format="csr")
+                    else:
+                        block = scipy.sparse.kron(
+                            block,
+                            scipy.sparse.identity(len(self.slices[a])),
+                            format="csr",
+                        )
+                if not self.fullyInterconnected:
+                    block = present @ block @ present
+                matrix = matrix + block
+
+        matrix = scipy.sparse.csr_matrix(matrix)
+        matrix.eliminate_zeros()
+        return matrix
+
+    def _get_coupling_matrix(self, aspect):
+        """Return the coupling edges between the sorted elementary layers of an
+        aspect as a sparse matrix, or None if the aspect has no couplings.
+        """
+        import numpy
+        import scipy.sparse
+
+        layers = sorted(self.slices[aspect])
+        nlayers = len(layers)
+        coupling = self.couplings[aspect - 1]
+        if coupling[0] == "categorical":
+            return scipy.sparse.csr_matrix(
+                coupling[1] * (numpy.ones((nlayers, nlayers)) - numpy.eye(nlayers))
+            )
+        elif coupling[0] == "none":
+            return None
+
+        layerToIndex = dict((layer, i) for i, layer in enumerate(layers))
+        rows, cols, data = [], [], []
+        if coupling[0] == "ordinal":
+            for i, layer in enumerate(layers):
+                if layer + 1 in layerToIndex:
+                    j = layerToIndex[layer + 1]
+                    rows.extend((i, j))
+                    cols.extend((j, i))
+                    data.extend((coupling[1], coupling[1]))
+        elif isinstance(coupling[0], MultilayerNetwork):
+            for layer1, layer2, w in coupling[0].edges:
+                if (
+                    layer1 != layer2
+                    and layer1 in layerToIndex
+                    and layer2 in layerToIndex
+                ):
+                    i, j = layerToIndex[layer1], layerToIndex[layer2]
+                    rows.append(i)
+                    cols.append(j)
+                    data.append(w)
+                    if not coupling[0].directed:
+                        rows.append(j)
+                        cols.append(i)
+                        data.append(w)
+        else:
+            raise Exception("Coupling not implemented: " + str(coupling))
+        return scipy.sparse.csr_matrix(
+            (data, (rows, cols)), shape=(nlayers, nlayers), dtype=float
+        )
+
     def __eq__(self, other):
         if type(self) is type(other):
             if (
@@ -1365,13 +2449,141 @@ class MultiplexNetwork(MultilayerNetwork):
         """Add node to layer. Network must not be node-aligned and the layer
         must exist.
         """
+        self._version += 1
         if node not in self._nodeToLayers:
             self._nodeToLayers[node] = set()
         self._nodeToLayers[node].add(layer)
-        if node not in self.A[layer]:
+        if node not in self.A[layer].slices[0]:
             self.A[layer].add_node(node)
 
 
+class SubnetView(MultilayerNetwork):
+    """Read-only view of the subnetwork induced by given nodes and layers.
+
+    The view filters the node-layers and links of the original network on
+    the fly instead of copying them, so creating it is cheap even when the
+    original network is large. It supports the usual interface for reading
+    networks: indexing, iterating over nodes, node-layers and edges, and the
+    degrees and strengths of the node-layers. Changes to the original network
+    are visible in the view.
+
+    Parameters
+    ----------
+    net : MultilayerNetwork, MultiplexNetwork
+        The original network.
+    nodes : sequence
+        The nodes that span the induced subnetwork. If None, all nodes are
+        included.
+    *layers : *sequence
+        (Elementary) layers included in the subnetwork. One parameter for each
+        aspect. If None, all layers of the aspect are included.
+
+    See also
+    --------
+    transforms.subnet : A function for copying induced subnetworks
+    """
+
+    def __init__(self, net, nodes, *layers):
+        assert len(layers) == net.aspects, "Please give layers for each aspect."
+        self.net = net
+        self.aspects = net.aspects
+        self.directed = net.directed
+        self.noEdge = net.noEdge
+        self.fullyInterconnected = net.fullyInterconnected
+
+        self.slices = []
+        for a, elayers in enumerate(itertools.chain([nodes], layers)):
+            if elayers is None:
+                self.slices.append(set(net.slices[a]))
+            else:
+                self.slices.append(set(elayers) & net.slices[a])
+
+        if not self.fullyInterconnected:
+            self._layerToNodes = {}
+            self._nodeToLayers = {}
+            for node in self.slices[0]:
+                for layer in net._nodeToLayers.get(node, ()):
+                    elayers = (layer,) if self.aspects == 1 else layer
+                    if all(
+                        elayer in self.slices[a + 1] for a, elayer in enumerate(elayers)
+                    ):
+                        self._nodeToLayers.setdefault(node, set()).add(layer)
+                        self._layerToNodes.setdefault(layer, set()).add(node)
+            self.slices[0] = set(self._nodeToLayers)
+
+    def _get_version(self):
+        """Overrides parents method."""
+        return self.net._get_version()
+
+    def _has_node_layer(self, nodelayer):
+        """Return True if the node-layer tuple is in the view."""
+        if self.fullyInterconnected:
+            return all(e in self.slices[a] for a, e in enumerate(nodelayer))
+        layer = nodelayer[1] if self.aspects == 1 else nodelayer[1:]
+        return layer in self._nodeToLayers.get(nodelayer[0], ())
+
+    def materialize(self):
+        """Return a copy of the subnetwork as a network of the original type."""
+        return transforms.subnet(self.net, self.slices[0], *self.slices[1:])
+
+    def add_node(self, node, layer=None):
+        """Overrides parents method."""
+        raise TypeError("Cannot modify a subnet view.")
+
+    def add_layer(self, layer, aspect=1):
+        """Overrides parents method."""
+        raise TypeError("Cannot modify a subnet view.")
+
+    def _set_link(self, link, value):
+        """Overrides parents method."""
+        raise TypeError("Cannot modify a subnet view.")
+
+    def _check_links(self, links):
+        """Overrides parents method."""
+        raise TypeError("Cannot modify a subnet view.")
+
+    def _add_links(self, nodes1, nodes2, weights):
+        """Overrides parents method."""
+        raise TypeError("Cannot modify a subnet view.")
+
+    def _remove_links(self, links):
+        """Overrides parents method."""
+        raise TypeError("Cannot modify a subnet view.")
+
+    def _get_link(self, link):
+        """Overrides parents method."""
+        node1, node2 = self._link_to_nodes(link)
+        if self._has_node_layer(node1) and self._has_node_layer(node2):
+            return self.net._get_link(link)
+        return self.noEdge
+
+    def _iter_neighbors_out(self, node, dims=None):
+        """Overrides parents method."""
+        if self._has_node_layer(node):
+            for neigh in self.net._iter_neighbors_out(node, dims):
+                if self._has_node_layer(neigh):
+                    yield neigh
+
+    def _iter_neighbors_in_dir(self, node, dims=None):
+        """Overrides parents method."""
+        if self._has_node_layer(node):
+            for neigh in self.net._iter_neighbors_in_dir(node, dims):
+                if self._has_node_layer(neigh):
+                    yield neigh
+
+    def _get_degree_out(self, node, dims=None):
+        """Overrides parents method."""
+        return len(list(self._iter_neighbors_out(node, dims)))
+
+    def _get_degree_in_dir(self, node, dims=None):
+        """Overrides parents method."""
+        return len(list(self._iter_neighbors_in_dir(node, dims)))
+
+    def _get_degree_total_dir(self, node, dims=None):
+        """Overrides parents method."""
+        return len(list(self._iter_neighbors_total_dir(node, dims)))
+
+
 class FlatMultilayerNetworkView(MultilayerNetwork):
     """
 
@@ -1,11 +1,18 @@
 """Functions for reading and writing networks in different file formats.
 """
 
+import itertools
 import json
 import math
 import os
 
-from .net import MultilayerNetwork, MultiplexNetwork
+from .net import (
+    CSRMultilayerNetwork,
+    MultilayerNetwork,
+    MultiplexNetwork,
+    _NodeLayerIndex,
+    _NodeLayerList,
+)
 
 
 def write_json(net, outputfile=None):
@@ -57,12 +64,42 @@ def write_json(net, outputfile=None):
         return json.dumps(nets)
 
 
+def _open_input(inputfile):
+    """Open a text file for reading, decompressing it if it is compressed with
+    gzip, bzip2 or xz.
+
+    Returns the file object and a flag telling if it was opened here and should
+    thus be closed by the caller. File objects are returned as they are.
+    """
+    if hasattr(inputfile, "read"):
+        return inputfile, False
+    inputfile = os.fspath(inputfile)
+    with open(inputfile, "rb") as f:
+        magic = f.read(6)
+    if magic.startswith(b"\x1f\x8b"):
+        import gzip
+
+        return gzip.open(inputfile, "rt"), True
+    elif magic.startswith(b"BZh"):
+        import bz2
+
+        return bz2.open(inputfile, "rt"), True
+    elif magic.startswith(b"\xfd7zXZ\x00"):
+        import lzma
+
+        return lzma.open(inputfile, "rt"), True
+    return open(inputfile, "r"), True
+
+
 def read_edge_file(
     inputfile,
     couplings="categorical",
     fullyInterconnected=True,
     directed=False,
     sep="\t",
+    labelType=int,
+    chunkSize=2**20,
+    progress=None,
 ):
     """
     Read a multiplex file following the syntax::
@@ -73,10 +110,14 @@ def read_edge_file(
 
     Self-links are ignored.
 
+    The file is read in chunks of lines, and the edges of each chunk are
+    added to the network in a single batch. Files compressed with gzip, bzip2
+    or xz are decompressed transparently.
+
     Parameters
     ----------
-    inputfile: str
-        Name of the input file.
+    inputfile: str, os.PathLike or file object
+        Name of the input file, or an open text file, which is not closed.
     couplings : list, str, tuple, None, MultilayerNetwork
        Parameter determining how the layers are coupled, i.e., what
        inter-layer edges are present. Passed to the constructor of MultiplexNetwork.
@@ -87,6 +128,16 @@ def read_edge_file(
         If True, treat the input file as a directed edge list. Default is False.
     sep: str
         Column separator. Default is tab character.
+    labelType: type
+        Type of the node and layer labels. If int, the chunks are parsed with
+        numpy. If str, the labels are kept as strings such that each distinct
+        label is stored only once. Any other function taking in a string can also
+        be given. Default is int.
+    chunkSize: int
+        Approximate number of bytes read in each chunk.
+    progress: function, None
+        If given, this function is called after each chunk with the total number
+        of lines read so far.
 
     Returns
     -------
@@ -101,15 +152,53 @@ def read_edge_file(
         fullyInterconnected=fullyInterconnected,
         directed=directed,
     )
-    inputfile = open(inputfile, "r")
-
-    for line in inputfile:
-        li, fi, ti, w = line.strip().split(sep)
-        li, fi, ti, w = int(li), int(fi), int(ti), float(w)
-        if fi != ti:
-            net[fi, ti, li] = w
-
-    inputfile.close()
+    labels = {}  # interning table for the labels
+    nlines = 0
+    inputfile, owned = _open_input(inputfile)
+    try:
+        while True:
+            lines = inputfile.readlines(chunkSize)
+            if len(lines) == 0:
+                break
+            nlines += len(lines)
+            if labelType is int:
+                import numpy
+
+                data = numpy.loadtxt(
+                    lines,
+                    delimiter=sep,
+                    dtype=[
+                        ("l", numpy.int64),
+                        ("f", numpy.int64),
+                        ("t", numpy.int64),
+                        ("w", float),
+                    ],
+                    ndmin=1,
+                )
+                data = data[data["f"] != data["t"]]
+                li, fi, ti, w = data["l"], data["f"], data["t"], data["w"]
+            else:
+                li, fi, ti, w = [], [], [], []
+                for line in lines:
+                    fields = line.strip().split(sep)
+                    if len(fields) == 1 and fields[0] == "":
+                        continue
+                    l, f, t, weight = fields
+                    if f != t:
+                        li.append(labels.setdefault(l, l))
+                        fi.append(labels.setdefault(f, f))
+                        ti.append(labels.setdefault(t, t))
+                        w.append(float(weight))
+                if labelType is not str:
+                    li, fi, ti = (
+                        list(map(labelType, column)) for column in (li, fi, ti)
+                    )
+            net.add_edges(node1=fi, node2=ti, layer1=li, layer2=li, weight=w)
+            if progress is not None:
+                progress(nlines)
+    finally:
+        if owned:
+            inputfile.close()
     return net
 
 
@@ -457,3 +546,302 @@ def read_ucinet(netinput, couplings=("categorical", 1.0), fullyInterconnected=Tr
                 net.A[layer].add_node(node)
 
     return net
+
+
+_BINARY_MAGIC = b"PYMNETBN"
+_BINARY_VERSION = 1
+_BINARY_ALIGNMENT = 64
+
+
+def _check_binary_label(label):
+    if not (label is None or isinstance(label, (int, float, str))):
+        raise ValueError(
+            "Only integer, float and string labels can be written in the binary "
+            "format, got: " + repr(label)
+        )
+    return label
+
+
+def write_binary(net, outputfile):
+    """Write a network in a binary format that can be memory-mapped.
+
+    The file consists of a short header followed by a JSON document describing
+    the network (its type, flags, couplings and the tables of node and layer
+    labels) and a set of arrays: a table giving the node and elementary layer
+    of each indexed node-layer tuple, and the compressed sparse row arrays of the
+    out-neighbors (and in-neighbors for directed networks) of the node-layers.
+    Each array starts at an offset aligned to 64 bytes.
+
+    Parameters
+    ----------
+    net : MultilayerNetwork, MultiplexNetwork, or CSRMultilayerNetwork
+        The network to be written. The node and layer labels must be
+        integers, floats or strings.
+    outputfile : str
+        Name of the output file.
+
+    Notes
+    -----
+    For multiplex networks only the intra-layer edges are written, and the
+    couplings are stored in the header. Self-edges of the intra-layer networks
+    are not read back.
+
+    See also
+    --------
+    read_binary
+    """
+    import numpy
+
+    header = {
+        "version": _BINARY_VERSION,
+        "type": "multiplex" if isinstance(net, MultiplexNetwork) else "multilayer",
+        "aspects": net.aspects,
+        "directed": net.directed,
+        "noEdge": net.noEdge,
+        "fullyInterconnected": net.fullyInterconnected,
+        "labels": [
+            [_check_binary_label(label) for label in net.slices[a]]
+            for a in range(net.aspects + 1)
+        ],
+    }
+
+    if isinstance(net, CSRMultilayerNetwork):
+        cnet = net
+    else:
+        cnet = CSRMultilayerNetwork(
+            aspects=net.aspects,
+            noEdge=net.noEdge,
+            directed=net.directed,
+            fullyInterconnected=net.fullyInterconnected,
+        )
+        if isinstance(net, MultiplexNetwork):
+            for layer in net.iter_layers():
+                layertuple = (layer,) if net.aspects == 1 else layer
+                edges = list(net.A[layer].edges)
+                cnet._add_links(
+                    [(e[0],) + layertuple for e in edges],
+                    [(e[1],) + layertuple for e in edges],
+                    [e[2] for e in edges],
+                )
+        else:
+            edges = list(net.edges)
+            cnet._add_links(
+                [(e[0],) + e[2:-1:2] for e in edges],
+                [(e[1],) + e[3:-1:2] for e in edges],
+                [e[-1] for e in edges],
+            )
+    if not net.fullyInterconnected:
+        for nl in net.iter_node_layers():
+            cnet._get_index(nl, create=True)
+    cnet.freeze()
+    header["intWeights"] = cnet._intWeights
+
+    if isinstance(net, MultiplexNetwork):
+        couplings = []
+        for coupling in net.couplings:
+            if isinstance(coupling[0], MultilayerNetwork):
+                couplings.append(
+                    [
+                        "network",
+                        coupling[0].directed,
+                        [
+                            [_check_binary_label(e[0]), _check_binary_label(e[1]), e[2]]
+                            for e in coupling[0].edges
+                        ],
+                    ]
+                )
+            else:
+                couplings.append(list(coupling))
+        header["couplings"] = couplings
+
+    labelToIndex = [
+        dict((label, i) for i, label in enumerate(labels))
+        for labels in header["labels"]
+    ]
+    nodelayers = numpy.zeros(
+        (len(cnet._indexToNodeLayer), net.aspects + 1), dtype=numpy.int64
+    )
+    for a in range(net.aspects + 1):
+        nodelayers[:, a] = [labelToIndex[a][nl[a]] for nl in cnet._indexToNodeLayer]
+
+    arrays = [
+        ("nodelayers", nodelayers),
+        ("indptr", cnet._indptr),
+        ("indices", cnet._indices),
+        ("weights", cnet._weights),
+    ]
+    if net.directed:
+        arrays += [
+            ("rindptr", cnet._rindptr),
+            ("rindices", cnet._rindices),
+            ("rweights", cnet._rweights),
+        ]
+
+    # The offsets depend on the header size, which depends on the offsets.
+    # The offsets are thus computed relative to the end of the padded header.
+    header["arrays"] = {}
+    offset = 0
+    for name, a in arrays:
+        header["arrays"][name] = {
+            "dtype": a.dtype.str,
+            "shape": list(a.shape),
+            "offset": offset,
+        }
+        offset += -(-a.nbytes // _BINARY_ALIGNMENT) * _BINARY_ALIGNMENT
+    headerbytes = json.dumps(header).encode("utf-8")
+    start = len(_BINARY_MAGIC) + 12 + len(headerbytes)
+    start = -(-start // _BINARY_ALIGNMENT) * _BINARY_ALIGNMENT
+
+    with open(outputfile, "wb") as ofile:
+        ofile.write(_BINARY_MAGIC)
+        ofile.write(numpy.array([_BINARY_VERSION], dtype="<u4").tobytes())
+        ofile.write(numpy.array([len(headerbytes)], dtype="<u8").tobytes())
+        ofile.write(headerbytes)
+        for name, a in arrays:
+            ofile.seek(start + header["arrays"][name]["offset"])
+            ofile.write(numpy.ascontiguousarray(a).tobytes())
+        ofile.truncate(start + offset)
+
+
+def read_binary(inputfile, mmap=True):
+    """Read a network written with write_binary.
+
+    Multilayer networks are returned as CSRMultilayerNetwork objects whose
+    edge arrays are memory-mapped from the file if mmap is True. That is, the
+    edges are not read from the disk until they are accessed, and only the
+    parts of the file that are accessed are read.
+
+    Opening the file reads only the header, whose size is linear in the number
+    of node and layer labels. The table of node-layers is kept as an array, and
+    a node-layer tuple is decoded from it only when it is accessed. The first
+    lookup of a node-layer, e.g., the first neighbor query, sorts the encoded
+    rows of the table, which takes O(n log n) time and 16 bytes of memory per
+    node-layer. Networks that are not fully interconnected are an exception:
+    their node-layers are read when the file is opened in order to index the
+    layers of each node.
+
+    Parameters
+    ----------
+    inputfile : str
+        Name of the input file.
+    mmap : bool
+        If True, the arrays are memory-mapped instead of read into memory.
+
+    Returns
+    -------
+    net : CSRMultilayerNetwork, or MultiplexNetwork
+        Multiplex networks are returned as MultiplexNetwork objects, which
+        are always fully read into memory.
+
+    See also
+    --------
+    write_binary
+    """
+    import numpy
+
+    with open(inputfile, "rb") as ifile:
+        if ifile.read(len(_BINARY_MAGIC)) != _BINARY_MAGIC:
+            raise ValueError("Not a pymnet binary network file.")
+        version = int(numpy.frombuffer(ifile.read(4), dtype="<u4")[0])
+        if version > _BINARY_VERSION:
+            raise ValueError("Unsupported binary format version: %d" % version)
+        length = int(numpy.frombuffer(ifile.read(8), dtype="<u8")[0])
+        header = json.loads(ifile.read(length).decode("utf-8"))
+    start = len(_BINARY_MAGIC) + 12 + length
+    start = -(-start // _BINARY_ALIGNMENT) * _BINARY_ALIGNMENT
+
+    arrays = {}
+    for name, info in header["arrays"].items():
+        dtype = numpy.dtype(info["dtype"])
+        shape = tuple(info["shape"])
+        if numpy.prod(shape) == 0:
+            arrays[name] = numpy.zeros(shape, dtype=dtype)
+        elif mmap:
+            arrays[name] = numpy.memmap(
+                inputfile,
+                dtype=dtype,
+                mode="r",
+                offset=start + info["offset"],
+                shape=shape,
+            )
+        else:
+            with open(inputfile, "rb") as ifile:
+                ifile.seek(start + info["offset"])
+                arrays[name] = numpy.fromfile(
+                    ifile, dtype=dtype, count=int(numpy.prod(shape))
+                ).reshape(shape)
+
+    labels = header["labels"]
+    nodelayers = _NodeLayerList(labels, arrays["nodelayers"])
+
+    if header["type"] == "multiplex":
+        couplings = []
+        for coupling in header["couplings"]:
+            if coupling[0] == "network":
+                cnet = MultilayerNetwork(aspects=0, directed=coupling[1])
+                for l1, l2, w in coupling[2]:
+                    cnet[l1, l2] = w
+                couplings.append(cnet)
+            else:
+                couplings.append(tuple(coupling))
+        net = MultiplexNetwork(
+            couplings=couplings,
+            directed=header["directed"],
+            noEdge=header["noEdge"],
+            fullyInterconnected=header["fullyInterconnected"],
+        )
+    else:
+        net = CSRMultilayerNetwork(
+            aspects=header["aspects"],
+            directed=header["directed"],
+            noEdge=header["noEdge"],
+            fullyInterconnected=header["fullyInterconnected"],
+        )
+
+    for a in range(net.aspects + 1):
+        for label in labels[a]:
+            net.add_layer(label, a)
+    if not net.fullyInterconnected:
+        for nl in nodelayers:
+            net.add_node(nl[0], layer=nl[1] if net.aspects == 1 else nl[1:])
+
+    if header["type"] == "multiplex":
+        nodelayers = list(nodelayers)
+        indptr, indices, weights = (
+            arrays["indptr"],
+            arrays["indices"],
+            arrays["weights"],
+        )
+        sources = numpy.repeat(numpy.arange(len(indptr) - 1), numpy.diff(indptr))
+        # Self-edges are not allowed in multiplex networks
+        if net.directed:
+            mask = sources != indices
+        else:
+            mask = sources < indices
+        sources, indices, weights = sources[mask], indices[mask], weights[mask]
+        if header["intWeights"]:
+            weights = weights.astype(numpy.int64)
+        sources, indices = sources.tolist(), indices.tolist()
+        net.add_edges(
+            (nodelayers[i][0], nodelayers[j][0])
+            + tuple(itertools.chain(*zip(nodelayers[i][1:], nodelayers[j][1:])))
+            + (w,)
+            for i, j, w in zip(sources, indices, weights.tolist())
+        )
+    else:
+        net._indexToNodeLayer = nodelayers
+        net._nodeLayerToIndex = _NodeLayerIndex(labels, arrays["nodelayers"])
+        net._intWeights = header["intWeights"]
+        net._indptr, net._indices, net._weights = (
+            arrays["indptr"],
+            arrays["indices"],
+            arrays["weights"],
+        )
+        if net.directed:
+            net._rindptr, net._rindices, net._rweights = (
+                arrays["rindptr"],
+                arrays["rindices"],
+                arrays["rweights"],
+            )
+
+    return net
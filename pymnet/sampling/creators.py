@@ -65,4 +65,4 @@ def random_nodelists(poolsize, nodes_per_layer, layers, seed=None):
     else:
         random.seed(seed)
     for _ in range(layers):
-        yield random.sample(xrange(poolsize), nodes_per_layer)
+        yield random.sample(range(poolsize), nodes_per_layer)
@@ -2,6 +2,7 @@
 
 import itertools
 
+from .esu import _iter_batches
 from .reqs import (
     default_calculate_required_lengths,
     default_check_reqs,
@@ -38,6 +39,41 @@ def dumb_enumeration(
     If using one of the built-in functionalities which use default_check_reqs or
     relaxed_check_reqs, this has been taken into account and you don't have to worry about it.
     """
+    if isinstance(results, list):
+        output = results.append
+    elif callable(results):
+        output = results
+    else:
+        raise TypeError("Please provide results container as list or callable")
+    for result in iter_dumb_enumeration(
+        network,
+        sizes=sizes,
+        intersections=intersections,
+        nnodes=nnodes,
+        nlayers=nlayers,
+        intersection_type=intersection_type,
+        custom_check_function=custom_check_function,
+    ):
+        output(result)
+
+
+def iter_dumb_enumeration(
+    network,
+    sizes=None,
+    intersections=None,
+    nnodes=None,
+    nlayers=None,
+    intersection_type="strict",
+    custom_check_function=None,
+    batch_size=None,
+):
+    """A generator version of dumb_enumeration.
+
+    Takes the same parameters as dumb_enumeration except results, and yields the
+    found induced subgraphs as ([nodelist],[layerlist]) tuples. If batch_size is
+    an int, the subgraphs are yielded in batches as tuples of NumPy arrays, as in
+    iter_multilayer_subgraphs_esu.
+    """
     check_function = None
     assert (sizes != None and intersections != None) or (
         nnodes != None and nlayers != None
@@ -119,6 +155,15 @@ def dumb_enumeration(
         check_function != None
     ), "Please specify a valid combination of parameters to determine method of subgraph validity checking"
 
+    subgraphs = _iter_combinations(
+        network, check_function, req_nodelist_len, req_layerlist_len
+    )
+    if batch_size != None:
+        return _iter_batches(subgraphs, batch_size)
+    return subgraphs
+
+
+def _iter_combinations(network, check_function, req_nodelist_len, req_layerlist_len):
     for nodelist in list(
         itertools.combinations(list(network.iter_nodes()), req_nodelist_len)
     ):
@@ -126,11 +171,4 @@ def dumb_enumeration(
             itertools.combinations(list(network.iter_layers()), req_layerlist_len)
         ):
             if check_function(network, nodelist, layerlist):
-                if isinstance(results, list):
-                    results.append((list(nodelist), list(layerlist)))
-                elif callable(results):
-                    results((list(nodelist), list(layerlist)))
-                else:
-                    raise TypeError(
-                        "Please provide results container as list or callable"
-                    )
+                yield (list(nodelist), list(layerlist))
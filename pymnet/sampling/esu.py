@@ -1,10 +1,14 @@
 # -*- coding: utf-8 -*-
 
+import collections
+import functools
 import itertools
 import random
+from bisect import bisect_right
 
 import pymnet
 
+from .._parallel import _call_in_worker, _init_worker, _worker_pool
 from .reqs import (
     default_calculate_required_lengths,
     default_check_reqs,
@@ -24,6 +28,8 @@ def sample_multilayer_subgraphs_esu(
     intersection_type="strict",
     copy_network=True,
     custom_check_function=None,
+    workers=None,
+    engine="recursive",
 ):
     """A one-aspect multilayer version of the Rand-EnumerateSubgraphs (Rand-ESU) algorithm
     introduced by Wernicke [1].
@@ -53,6 +59,7 @@ def sample_multilayer_subgraphs_esu(
         which is a tuple of two lists). The callable should therefore take only one
         required parameter in the form of a tuple. If you want to pass more parameters
         to the callable, do so via e.g. an anonymous function.
+        To iterate over the induced subgraphs instead, use iter_multilayer_subgraphs_esu.
     sizes : list of ints > 0
         How many nodes should be on each layer of an acceptable induced subgraph.
         One integer for each layer of an acceptable subgraph.
@@ -130,6 +137,31 @@ def sample_multilayer_subgraphs_esu(
         to the original network's). The function should return True or False (the subgraph is acceptable
         or not acceptable, respectively). When this parameter is not None, you must also specify nnodes
         and nlayers.
+    workers : int or None
+        If None (default), the search is run in the current process. If an int, the starting
+        nodelayers are divided among this many worker processes. The nodelayers are handed out
+        in small batches as the workers become free, so that the workers that get the starting
+        nodelayers with large neighborhoods do not hold up the others. Each worker reads the
+        same (copy of the) network, which is not modified during the search. The found induced
+        subgraphs are passed to results in the main process, in the same order as they would
+        be found when starting from the nodelayers one at a time. The network and the check
+        function are sent to the workers, so on platforms where new processes are not forked
+        (e.g. macOS and Windows), a custom_check_function must be picklable (e.g. a
+        module-level function).
+        In this mode, the random numbers for the subgraphs found from each starting nodelayer
+        are drawn from a separate generator seeded with the seed and the number of the
+        nodelayer. The sample is therefore the same for any number of workers when seed is
+        given, but it is not the same sample as the one drawn with workers=None.
+    engine : string, "recursive" or "iterative"
+        The implementation of the search. The "recursive" engine (default) extends the
+        subgraphs with recursive calls. The "iterative" engine first gives integer ids to the
+        nodes and layers and sorts the neighbors of each nodelayer by their numbers, and then
+        extends the subgraphs using an explicit stack, updating the neighborhood of the
+        current subgraph as nodes and layers are added and removed. It is several times
+        faster and is not limited by the recursion depth, but uses more memory for the
+        precomputed arrays. Both engines find the same induced subgraphs. When sampling with
+        p, the subgraphs are drawn with the same probabilities, but the engines use the random
+        numbers in a different order, so the samples drawn with the same seed differ.
 
     Notes
     -----
@@ -240,6 +272,72 @@ def sample_multilayer_subgraphs_esu(
     ----------
     [1] "A Faster Algorithm for Detecting Network Motifs", S. Wernicke, WABI. Vol. 3692, pp. 165-177. Springer 2005.
     """
+    if isinstance(results, list):
+        output = results.append
+    elif callable(results):
+        output = results
+    else:
+        raise TypeError("Please provide results container as list or callable")
+    for result in iter_multilayer_subgraphs_esu(
+        network,
+        sizes=sizes,
+        intersections=intersections,
+        nnodes=nnodes,
+        nlayers=nlayers,
+        p=p,
+        seed=seed,
+        intersection_type=intersection_type,
+        copy_network=copy_network,
+        custom_check_function=custom_check_function,
+        workers=workers,
+        engine=engine,
+    ):
+        output(result)
+
+
+def iter_multilayer_subgraphs_esu(
+    network,
+    sizes=None,
+    intersections=None,
+    nnodes=None,
+    nlayers=None,
+    p=None,
+    seed=None,
+    intersection_type="strict",
+    copy_network=True,
+    custom_check_function=None,
+    workers=None,
+    engine="recursive",
+    batch_size=None,
+):
+    """A generator version of sample_multilayer_subgraphs_esu.
+
+    Takes the same parameters as sample_multilayer_subgraphs_esu except results,
+    and yields the found induced subgraphs as ([nodelist],[layerlist]) tuples.
+    The search proceeds only as far as the subgraphs are consumed, so the results
+    do not need to be kept in memory. With workers, at most a few batches of
+    starting nodelayers per worker are searched ahead of the consumer.
+
+    The parameters are checked and the network is copied (if copy_network is True)
+    when this function is called, and the search is done while iterating.
+    The random numbers are drawn from a generator of the search seeded with seed,
+    so other uses of the random module between the yielded subgraphs do not
+    affect the sample.
+
+    Parameters
+    ----------
+    batch_size : int or None
+        If None (default), the subgraphs are yielded one at a time. If an int,
+        the subgraphs are yielded in batches of (at most) batch_size subgraphs,
+        as tuples (nodes, layers) of two NumPy arrays with a row for each subgraph.
+        The rows of nodes contain the nodelists and the rows of layers the layerlists.
+        The arrays are made with numpy.array, so their dtype is determined by the
+        node and layer names (e.g. integers or strings).
+
+    See also
+    --------
+    sample_multilayer_subgraphs_esu
+    """
     if copy_network == True:
         network_copy = pymnet.subnet(
             network,
@@ -250,10 +348,7 @@ def sample_multilayer_subgraphs_esu(
     else:
         network_copy = network
 
-    if seed == None:
-        random.seed()
-    else:
-        random.seed(seed)
+    rng = random.Random(seed)
 
     check_function = None
     assert (sizes != None and intersections != None) or (
@@ -288,15 +383,13 @@ def sample_multilayer_subgraphs_esu(
                     ), "please provide nnodes (and not nlayers) if using less_or_equal intersection type"
                     req_nodelist_len = nnodes
                     req_layerlist_len = len(sizes)
-            check_function = lambda x, y, z: default_check_reqs(
-                x,
-                y,
-                z,
-                sizes,
-                intersections,
-                req_nodelist_len,
-                req_layerlist_len,
-                intersection_type,
+            check_function = functools.partial(
+                default_check_reqs,
+                sizes=sizes,
+                intersections=intersections,
+                nnodes=req_nodelist_len,
+                nlayers=req_layerlist_len,
+                intersection_type=intersection_type,
             )
         elif isinstance(intersections, int):
             assert (
@@ -309,15 +402,13 @@ def sample_multilayer_subgraphs_esu(
             req_layerlist_len = len(sizes)
             intersections_as_list = [None] * (2 ** len(sizes) - len(sizes) - 1)
             intersections_as_list[-1] = intersections
-            check_function = lambda x, y, z: default_check_reqs(
-                x,
-                y,
-                z,
-                sizes,
-                intersections_as_list,
-                req_nodelist_len,
-                req_layerlist_len,
-                intersection_type,
+            check_function = functools.partial(
+                default_check_reqs,
+                sizes=sizes,
+                intersections=intersections_as_list,
+                nnodes=req_nodelist_len,
+                nlayers=req_layerlist_len,
+                intersection_type=intersection_type,
             )
     if nnodes != None and nlayers != None and check_function == None:
         assert (
@@ -339,7 +430,6 @@ def sample_multilayer_subgraphs_esu(
     if p == None:
         p = [1] * (req_nodelist_len - 1 + req_layerlist_len - 1 + 1)
 
-    depth = 0
     numberings = dict()
     inverse_numberings = dict()
     for index, nodelayer in enumerate(network_copy.iter_node_layers()):
@@ -347,57 +437,533 @@ def sample_multilayer_subgraphs_esu(
     for nodelayer in numberings:
         inverse_numberings[numberings[nodelayer]] = nodelayer
 
-    for indexnumber in range(len(numberings)):
-        v = inverse_numberings[indexnumber]
-        if random.random() < p[depth]:
-            start_node = v[0]
-            start_layer = v[1]
-            V_extension_nodes = set()
-            V_extension_layers = set()
-            for neighbor in network_copy[v]:
-                if numberings[neighbor] > numberings[v]:
-                    no_node_conflicts = True
-                    no_layer_conflicts = True
-                    node = neighbor[0]
-                    layer = neighbor[1]
-                    if (node, start_layer) in numberings and numberings[
-                        (node, start_layer)
-                    ] < numberings[v]:
-                        no_node_conflicts = False
-                    if (start_node, layer) in numberings and numberings[
-                        (start_node, layer)
-                    ] < numberings[v]:
-                        no_layer_conflicts = False
-                    if (
-                        node != start_node
-                        and no_node_conflicts
-                        and node not in V_extension_nodes
-                    ):
-                        V_extension_nodes.add(node)
-                    if (
-                        layer != start_layer
-                        and no_layer_conflicts
-                        and layer not in V_extension_layers
-                    ):
-                        V_extension_layers.add(layer)
-            _extend_subgraph(
+    assert engine in (
+        "recursive",
+        "iterative",
+    ), "Please provide engine as 'recursive' or 'iterative'"
+    if engine == "iterative":
+        network_index = _index_network(network_copy, numberings, inverse_numberings)
+    else:
+        network_index = None
+
+    if workers != None:
+        if seed == None:
+            seed = rng.getrandbits(64)
+        subgraphs = _iter_in_workers(
+            workers,
+            (
                 network_copy,
-                [start_node],
-                [start_layer],
                 check_function,
-                V_extension_nodes,
-                V_extension_layers,
                 numberings,
+                inverse_numberings,
+                network_index,
+                req_nodelist_len,
+                req_layerlist_len,
+                p,
+                seed,
+            ),
+        )
+    else:
+        subgraphs = _iter_from_nodelayers(
+            network_copy,
+            check_function,
+            numberings,
+            inverse_numberings,
+            network_index,
+            req_nodelist_len,
+            req_layerlist_len,
+            p,
+            rng,
+            copy_network,
+        )
+    if batch_size != None:
+        return _iter_batches(subgraphs, batch_size)
+    return subgraphs
+
+
+def count_subgraph_types(
+    network,
+    sizes=None,
+    intersections=None,
+    nnodes=None,
+    nlayers=None,
+    p=None,
+    seed=None,
+    intersection_type="strict",
+    copy_network=True,
+    custom_check_function=None,
+    workers=None,
+    engine="recursive",
+    allowed_aspects="all",
+    cache_size=2**16,
+):
+    """Counts the isomorphism classes of the induced subgraphs found by the
+    multilayer Rand-ESU algorithm.
+
+    The induced subgraphs are found as in sample_multilayer_subgraphs_esu, and
+    each of them is classified by the complete invariant of the subnetwork
+    [nodelist][layerlist]. Computing a complete invariant requires solving a graph
+    isomorphism problem, so the invariants are cached. The key of the cache is
+    the pattern of the nodelayers and edges of the subgraph with the nodes and
+    layers in the order they were found, which is cheap to compute. Two subgraphs
+    with the same key are isomorphic, so most of the subgraphs can be classified
+    without computing their invariants.
+
+    Parameters
+    ----------
+    The parameters other than allowed_aspects and cache_size are the same as
+    in sample_multilayer_subgraphs_esu (except that there is no results).
+
+    allowed_aspects : list of ints, string
+        The aspects that can be permuted in the isomorphism type used to classify
+        the subgraphs. See isomorphisms.get_complete_invariant.
+    cache_size : int
+        The maximum number of keys kept in the cache of the complete invariants.
+        The least recently used keys are dropped first.
+
+    Returns
+    -------
+    counts : dict
+        The keys are the complete invariants of the found isomorphism classes and
+        the values are the numbers of subgraphs in each class.
+
+    Raises
+    ------
+    ValueError
+        If the network is directed, as the complete invariants are only defined
+        for undirected networks.
+
+    See also
+    --------
+    sample_multilayer_subgraphs_esu, isomorphisms.get_complete_invariant
+    """
+    if network.directed:
+        raise ValueError("Subgraph types can only be counted in undirected networks.")
+    if allowed_aspects == "all":
+        allowed_aspects = [0, 1]
+    nodelayers = set(network.iter_node_layers())
+    invariants = collections.OrderedDict()
+    counts = dict()
+    for nodelist, layerlist in iter_multilayer_subgraphs_esu(
+        network,
+        sizes=sizes,
+        intersections=intersections,
+        nnodes=nnodes,
+        nlayers=nlayers,
+        p=p,
+        seed=seed,
+        intersection_type=intersection_type,
+        copy_network=copy_network,
+        custom_check_function=custom_check_function,
+        workers=workers,
+        engine=engine,
+    ):
+        signature = _subgraph_signature(
+            network, nodelayers, nodelist, layerlist, allowed_aspects
+        )
+        if signature in invariants:
+            invariants.move_to_end(signature)
+            invariant = invariants[signature]
+        else:
+            invariant = pymnet.get_complete_invariant(
+                pymnet.subnet(network, nodelist, layerlist),
+                allowed_aspects=allowed_aspects,
+            )
+            invariants[signature] = invariant
+            if len(invariants) > cache_size:
+                invariants.popitem(last=False)
+        counts[invariant] = counts.get(invariant, 0) + 1
+    return counts
+
+
+def _subgraph_signature(network, nodelayers, nodelist, layerlist, allowed_aspects):
+    # Returns a key that is equal for two induced subgraphs only if they are
+    # isomorphic: the bitmasks of the existing nodelayers and of the edges between
+    # them when the nodes and layers are in the given order, and the names of the
+    # nodes or layers that cannot be permuted. The network is undirected, so each
+    # pair of nodelayers is checked once.
+    present = []
+    presence = 0
+    bit = 1
+    for node in nodelist:
+        for layer in layerlist:
+            if (node, layer) in nodelayers:
+                present.append((node, layer))
+                presence |= bit
+            bit <<= 1
+    edges = 0
+    bit = 1
+    for i, nodelayer1 in enumerate(present):
+        node = network[nodelayer1]
+        for nodelayer2 in present[i:]:
+            if node[nodelayer2] != network.noEdge:
+                edges |= bit
+            bit <<= 1
+    signature = (len(nodelist), len(layerlist), presence, edges)
+    if 0 not in allowed_aspects:
+        signature += (tuple(nodelist),)
+    if 1 not in allowed_aspects:
+        signature += (tuple(layerlist),)
+    return signature
+
+
+def _iter_from_nodelayers(
+    network,
+    check_function,
+    numberings,
+    inverse_numberings,
+    network_index,
+    req_nodelist_len,
+    req_layerlist_len,
+    p,
+    rng,
+    copy_network,
+):
+    # Searches from each starting nodelayer in the order of their numbers
+    for indexnumber in range(len(numberings)):
+        if network_index != None:
+            yield from _extend_from_nodelayer_iterative(
+                network,
+                network_index,
+                indexnumber,
+                check_function,
+                req_nodelist_len,
+                req_layerlist_len,
+                p,
+                rng,
+            )
+        else:
+            v = inverse_numberings[indexnumber]
+            yield from _extend_from_nodelayer(
+                network,
                 v,
+                check_function,
+                numberings,
                 req_nodelist_len,
                 req_layerlist_len,
-                depth + 1,
                 p,
-                results,
+                rng,
+            )
+            if copy_network == True:
+                for neighbor in list(network[v]):
+                    network[neighbor][v] = 0
+
+
+def _iter_batches(subgraphs, batch_size):
+    # Groups the subgraphs to tuples of node and layer arrays
+    import numpy
+
+    while True:
+        batch = list(itertools.islice(subgraphs, batch_size))
+        if len(batch) == 0:
+            return
+        yield (
+            numpy.array([nodelist for nodelist, layerlist in batch]),
+            numpy.array([layerlist for nodelist, layerlist in batch]),
+        )
+
+
+def _extend_from_nodelayer(
+    network,
+    v,
+    check_function,
+    numberings,
+    req_nodelist_len,
+    req_layerlist_len,
+    p,
+    rng,
+):
+    # A helper function of sample_multilayer_subgraphs_esu, not intended for use by users
+    depth = 0
+    if rng.random() < p[depth]:
+        start_node = v[0]
+        start_layer = v[1]
+        V_extension_nodes = set()
+        V_extension_layers = set()
+        for neighbor in network[v]:
+            if numberings[neighbor] > numberings[v]:
+                no_node_conflicts = True
+                no_layer_conflicts = True
+                node = neighbor[0]
+                layer = neighbor[1]
+                if (node, start_layer) in numberings and numberings[
+                    (node, start_layer)
+                ] < numberings[v]:
+                    no_node_conflicts = False
+                if (start_node, layer) in numberings and numberings[
+                    (start_node, layer)
+                ] < numberings[v]:
+                    no_layer_conflicts = False
+                if (
+                    node != start_node
+                    and no_node_conflicts
+                    and node not in V_extension_nodes
+                ):
+                    V_extension_nodes.add(node)
+                if (
+                    layer != start_layer
+                    and no_layer_conflicts
+                    and layer not in V_extension_layers
+                ):
+                    V_extension_layers.add(layer)
+        yield from _extend_subgraph(
+            network,
+            [start_node],
+            [start_layer],
+            check_function,
+            V_extension_nodes,
+            V_extension_layers,
+            numberings,
+            v,
+            req_nodelist_len,
+            req_layerlist_len,
+            depth + 1,
+            p,
+            rng,
+        )
+
+
+def _index_network(network, numberings, inverse_numberings):
+    # Gives integer ids to the nodes and layers of the network for the iterative
+    # engine. Returns the node id, the layer id and the numbers of the neighbors
+    # (in increasing order) of each nodelayer number, the nodelayer numbers keyed
+    # by node_id*len(layers)+layer_id, and the nodes and layers listed by their ids.
+    node_ids = dict()
+    layer_ids = dict()
+    nodes = []
+    layers = []
+    for number in range(len(inverse_numberings)):
+        node, layer = inverse_numberings[number]
+        if node not in node_ids:
+            node_ids[node] = len(nodes)
+            nodes.append(node)
+        if layer not in layer_ids:
+            layer_ids[layer] = len(layers)
+            layers.append(layer)
+
+    nodelayer_nodes = []
+    nodelayer_layers = []
+    neighbors = []
+    codes = dict()
+    for number in range(len(inverse_numberings)):
+        nodelayer = inverse_numberings[number]
+        node_id = node_ids[nodelayer[0]]
+        layer_id = layer_ids[nodelayer[1]]
+        nodelayer_nodes.append(node_id)
+        nodelayer_layers.append(layer_id)
+        codes[node_id * len(layers) + layer_id] = number
+        neighbors.append(
+            sorted(numberings[neighbor] for neighbor in network[nodelayer])
+        )
+    return nodelayer_nodes, nodelayer_layers, neighbors, codes, nodes, layers
+
+
+def _extend_from_nodelayer_iterative(
+    network,
+    network_index,
+    v,
+    check_function,
+    req_nodelist_len,
+    req_layerlist_len,
+    p,
+    rng,
+):
+    # A helper function of sample_multilayer_subgraphs_esu, not intended for use by users.
+    # Does the same search as _extend_from_nodelayer and _extend_subgraph from the
+    # nodelayer with number v, but with an explicit stack. The nodes and layers are
+    # integer ids, and the original neighborhood of the current subgraph (the nodes
+    # and layers of the neighbors numbered after v) is kept as counts in node_counts
+    # and layer_counts, which are updated when nodes and layers are added and removed.
+    nodelayer_nodes, nodelayer_layers, neighbors, codes, nodes, layers = network_index
+    nlayers = len(layers)
+    if not rng.random() < p[0]:
+        return
+    start_node = nodelayer_nodes[v]
+    start_layer = nodelayer_layers[v]
+    if req_nodelist_len == 1 and req_layerlist_len == 1:
+        if check_function(network, [nodes[start_node]], [layers[start_layer]]):
+            yield ([nodes[start_node]], [layers[start_layer]])
+        return
+
+    nodelist = [start_node]
+    layerlist = [start_layer]
+    node_counts = dict()
+    layer_counts = dict()
+    later_neighbors = neighbors[v][bisect_right(neighbors[v], v) :]
+    V_extension_nodes = set()
+    V_extension_layers = set()
+    for neighbor in later_neighbors:
+        node = nodelayer_nodes[neighbor]
+        layer = nodelayer_layers[neighbor]
+        node_counts[node] = node_counts.get(node, 0) + 1
+        layer_counts[layer] = layer_counts.get(layer, 0) + 1
+        if node != start_node and codes.get(node * nlayers + start_layer, v) >= v:
+            V_extension_nodes.add(node)
+        if layer != start_layer and codes.get(start_node * nlayers + layer, v) >= v:
+            V_extension_layers.add(layer)
+    if req_nodelist_len == 1:
+        V_extension_nodes.clear()
+    if req_layerlist_len == 1:
+        V_extension_layers.clear()
+
+    # Each entry of the stack holds the extension sets and the depth of a subgraph,
+    # and whether a node or a layer was added to get it from the subgraph below it
+    # together with the later neighbors of the nodelayers that were added
+    stack = [(V_extension_nodes, V_extension_layers, 1, True, [])]
+    while stack:
+        V_extension_nodes, V_extension_layers, depth, added_node, added_neighbors = (
+            stack[-1]
+        )
+        if V_extension_nodes:
+            is_node = True
+            added = V_extension_nodes.pop()
+        elif V_extension_layers:
+            is_node = False
+            added = V_extension_layers.pop()
+        else:
+            stack.pop()
+            if added_node:
+                nodelist.pop()
+            else:
+                layerlist.pop()
+            for later_neighbors in added_neighbors:
+                for neighbor in later_neighbors:
+                    node_counts[nodelayer_nodes[neighbor]] -= 1
+                    layer_counts[nodelayer_layers[neighbor]] -= 1
+            continue
+        if not rng.random() < p[depth]:
+            continue
+
+        if is_node:
+            nodelist.append(added)
+            added_codes = [added * nlayers + layer for layer in layerlist]
+        else:
+            layerlist.append(added)
+            added_codes = [node * nlayers + added for node in nodelist]
+        nodes_full = len(nodelist) == req_nodelist_len
+        layers_full = len(layerlist) == req_layerlist_len
+        if nodes_full and layers_full:
+            nodenames = [nodes[node] for node in nodelist]
+            layernames = [layers[layer] for layer in layerlist]
+            if check_function(network, nodenames, layernames):
+                yield (nodenames, layernames)
+            if is_node:
+                nodelist.pop()
+            else:
+                layerlist.pop()
+            continue
+
+        V_extension_nodes_prime = set() if nodes_full else set(V_extension_nodes)
+        V_extension_layers_prime = set() if layers_full else set(V_extension_layers)
+        added_neighbors = []
+        for code in added_codes:
+            if code not in codes:
+                continue
+            nodelayer = codes[code]
+            later_neighbors = neighbors[nodelayer][
+                bisect_right(neighbors[nodelayer], v) :
+            ]
+            added_neighbors.append(later_neighbors)
+            for neighbor in later_neighbors:
+                node = nodelayer_nodes[neighbor]
+                layer = nodelayer_layers[neighbor]
+                if (
+                    not nodes_full
+                    and node_counts.get(node, 0) == 0
+                    and node not in V_extension_nodes_prime
+                    and node not in nodelist
+                    and all(codes.get(node * nlayers + l, v) >= v for l in layerlist)
+                ):
+                    V_extension_nodes_prime.add(node)
+                if (
+                    not layers_full
+                    and layer_counts.get(layer, 0) == 0
+                    and layer not in V_extension_layers_prime
+                    and layer not in layerlist
+                    and all(codes.get(n * nlayers + layer, v) >= v for n in nodelist)
+                ):
+                    V_extension_layers_prime.add(layer)
+        for later_neighbors in added_neighbors:
+            for neighbor in later_neighbors:
+                node = nodelayer_nodes[neighbor]
+                layer = nodelayer_layers[neighbor]
+                node_counts[node] = node_counts.get(node, 0) + 1
+                layer_counts[layer] = layer_counts.get(layer, 0) + 1
+        stack.append(
+            (
+                V_extension_nodes_prime,
+                V_extension_layers_prime,
+                depth + 1,
+                is_node,
+                added_neighbors,
+            )
+        )
+
+
+def _extend_batch(args, indexnumbers):
+    # Runs the search from a batch of starting nodelayers and returns the results
+    (
+        network,
+        check_function,
+        numberings,
+        inverse_numberings,
+        network_index,
+        req_nodelist_len,
+        req_layerlist_len,
+        p,
+        seed,
+    ) = args
+    results = []
+    for indexnumber in indexnumbers:
+        rng = random.Random(repr((seed, indexnumber)))
+        if network_index != None:
+            results.extend(
+                _extend_from_nodelayer_iterative(
+                    network,
+                    network_index,
+                    indexnumber,
+                    check_function,
+                    req_nodelist_len,
+                    req_layerlist_len,
+                    p,
+                    rng,
+                )
             )
-        if copy_network == True:
-            for neighbor in list(network_copy[v]):
-                network_copy[neighbor][v] = 0
+        else:
+            results.extend(
+                _extend_from_nodelayer(
+                    network,
+                    inverse_numberings[indexnumber],
+                    check_function,
+                    numberings,
+                    req_nodelist_len,
+                    req_layerlist_len,
+                    p,
+                    rng,
+                )
+            )
+    return results
+
+
+def _iter_in_workers(workers, args):
+    # Distributes the starting nodelayers to a pool of worker processes in
+    # small batches, and yields the results in the order of the starting
+    # nodelayers. Only a few batches per worker are submitted ahead of the
+    # batch whose results are being yielded.
+    n = len(args[2])
+    batch_size = max(1, min(100, n // (32 * workers)))
+    batches = (range(i, min(i + batch_size, n)) for i in range(0, n, batch_size))
+    with _worker_pool(workers, initializer=_init_worker, initargs=(args,)) as pool:
+        pending = collections.deque()
+        for batch in itertools.islice(batches, 4 * workers):
+            pending.append(pool.apply_async(_call_in_worker, ((_extend_batch, batch),)))
+        while pending:
+            batch_results = pending.popleft().get()
+            for batch in itertools.islice(batches, 1):
+                pending.append(
+                    pool.apply_async(_call_in_worker, ((_extend_batch, batch),))
+                )
+            yield from batch_results
 
 
 def _extend_subgraph(
@@ -413,23 +979,15 @@ def _extend_subgraph(
     req_layerlist_len,
     depth,
     p,
-    results,
+    rng,
 ):
     # A helper function of sample_multilayer_subgraphs_esu, not intended for use by users
     if len(nodelist) > req_nodelist_len or len(layerlist) > req_layerlist_len:
         return
     if len(nodelist) == req_nodelist_len and len(layerlist) == req_layerlist_len:
         if check_function(network, nodelist, layerlist):
-            if isinstance(results, list):
-                results.append((list(nodelist), list(layerlist)))
-                return
-            elif callable(results):
-                results((list(nodelist), list(layerlist)))
-                return
-            else:
-                raise TypeError("Please provide results container as list or callable")
-        else:
-            return
+            yield (list(nodelist), list(layerlist))
+        return
     if len(nodelist) == req_nodelist_len:
         V_extension_nodes = set()
 
@@ -465,7 +1023,7 @@ def _extend_subgraph(
         else:
             layer_added = V_extension_layers.pop()
             new_layerlist.append(layer_added)
-        if random.random() < p[depth]:
+        if rng.random() < p[depth]:
             if node_added != None:
                 added_graph = [
                     nl
@@ -508,7 +1066,7 @@ def _extend_subgraph(
                             if no_layer_conflicts:
                                 V_extension_layers_prime.add(layer)
 
-            _extend_subgraph(
+            yield from _extend_subgraph(
                 network,
                 new_nodelist,
                 new_layerlist,
@@ -521,6 +1079,6 @@ def _extend_subgraph(
                 req_layerlist_len,
                 depth + 1,
                 p,
-                results,
+                rng,
             )
     return
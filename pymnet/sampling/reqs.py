@@ -224,7 +224,7 @@ def default_check_reqs(
     assert len(nodelist) == req_nodelist_len, "Wrong number of nodes"
     assert len(layerlist) == req_layerlist_len, "Wrong number of layers"
     assert all(i >= 1 for i in sizes), "Inappropriate sizes"
-    induced_graph = pymnet.subnet(network, nodelist, layerlist)
+    induced_graph = pymnet.SubnetView(network, nodelist, layerlist)
     try:
         graph_is_connected = pymnet.nx.is_connected(
             pymnet.transforms.get_underlying_graph(induced_graph)
@@ -432,7 +432,7 @@ def relaxed_check_reqs(network, nodelist, layerlist):
 
     returns False, because node 1 is empty.
     """
-    induced_graph = pymnet.subnet(network, nodelist, layerlist)
+    induced_graph = pymnet.SubnetView(network, nodelist, layerlist)
     try:
         graph_is_connected = pymnet.nx.is_connected(
             pymnet.transforms.get_underlying_graph(induced_graph)
@@ -596,6 +596,121 @@ class TestCC(unittest.TestCase):
         # net=models.full_multilayer(10,5)
         # self.test_unweighted_consistency(net)
 
+    def test_elementary_cycles_all(self):
+        nets = [
+            models.er(15, [0.4, 0.3, 0.5]),
+            models.er_partially_interconnected(
+                [range(8), range(4, 12), range(0, 12)], [0.5] * 3
+            ),
+        ]
+        for net in nets:
+            nodelayers, cycles = cc.elementary_cycles_all(net)
+            self.assertEqual(set(nodelayers), set(net.iter_node_layers()))
+            for nl, nl_cycles in zip(nodelayers, cycles):
+                self.assertEqual(
+                    tuple(nl_cycles), cc.cc_cycle_vector_bf(net, nl[0], nl[1])
+                )
+            self.assertEqual(cc.elementary_cycles(net), tuple(cycles.sum(axis=0)))
+
+            lccs = [cc.lcc_aw(net, nl[0], nl[1]) for nl in nodelayers]
+            self.assertAlmostEqual(cc.avg_lcc_aw(net), sum(lccs) / len(lccs))
+
+    def test_aw_methods(self):
+        fnet = models.er(12, [0.4, 0.3, 0.5])
+        pnet = models.er_partially_interconnected(
+            [range(8), range(4, 12), range(0, 12)], [0.5] * 3
+        )
+        for net, methods in [
+            (fnet, ["bf", "anet", "sparse"]),
+            (pnet, ["bf", "sparse"]),
+        ]:
+            ref = cc.gcc_aw(net, returnCVector=True, method="bf")
+            for method in methods:
+                for c, c_ref in zip(
+                    cc.gcc_aw(net, returnCVector=True, method=method), ref
+                ):
+                    self.assertAlmostEqual(c, c_ref)
+                self.assertEqual(
+                    cc.cc_aw_vector(net, method=method), cc.cc_aw_vector(net)
+                )
+                for node, layer in net.iter_node_layers():
+                    self.assertAlmostEqual(
+                        cc.lcc_aw(net, node, layer, w3=0.2, method=method),
+                        cc.lcc_aw(net, node, layer, w3=0.2),
+                    )
+                    self.assertEqual(
+                        cc.elementary_cycles(net, node, method=method),
+                        cc.elementary_cycles(net, node, method="bf"),
+                    )
+        for net, methods in [
+            (fnet, ["adj", "bf", "anet", "sparse"]),
+            (pnet, ["bf", "sparse"]),
+        ]:
+            ref = cc.gcc_aw(net, returnCVector=True, method="bf")
+            for method in methods:
+                for c, c_ref in zip(
+                    cc.gcc_aw_seplayers_adj(net, returnCVector=True, method=method),
+                    ref,
+                ):
+                    self.assertAlmostEqual(c, c_ref)
+        self.assertRaises(ValueError, lambda: cc.gcc_aw(fnet, method="dense"))
+        self.assertRaises(ValueError, lambda: cc.gcc_aw(pnet, method="anet"))
+        self.assertRaises(
+            ValueError, lambda: cc.elementary_cycles(pnet, 0, method="anet")
+        )
+
+    def test_compute_all(self):
+        net = models.er(30, [0.2, 0.3])
+        anet = transforms.aggregate(net, 1)
+        for measure in [cc.lcc_brodka, cc.lcc_criado, cc.cc_barrett]:
+            ccs = {node: measure(net, node, anet=anet) for node in net}
+            self.assertEqual(cc.compute_all(measure, net), ccs)
+            done = []
+            self.assertEqual(
+                cc.compute_all(
+                    measure, net, workers=2, chunkSize=7, progress=done.append
+                ),
+                ccs,
+            )
+            self.assertEqual(done, [7, 14, 21, 28, 30])
+        self.assertEqual(
+            cc.compute_all(cc.lcc, anet, nodes=[0, 1]),
+            {0: cc.lcc(anet, 0), 1: cc.lcc(anet, 1)},
+        )
+        self.assertEqual(
+            cc.compute_all(cc.cc_zhang, anet, undefReturn=-1.0),
+            {node: cc.cc_zhang(anet, node, undefReturn=-1.0) for node in anet},
+        )
+        # Errors raised in the workers are raised by compute_all
+        self.assertRaises(
+            TypeError, lambda: cc.compute_all(cc.lcc, anet, workers=2, invalid=1)
+        )
+
+    def test_cached_anet(self):
+        net = models.er(15, [0.4, 0.3, 0.5])
+        for i in range(2):
+            anet = transforms.aggregate(net, 1)
+            for node in net:
+                self.assertEqual(
+                    cc.cc_barrett(net, node), cc.cc_barrett(net, node, anet)
+                )
+                self.assertEqual(
+                    cc.cc_barrett_optimized(net, node),
+                    cc.cc_barrett_optimized(net, node, anet),
+                )
+                self.assertEqual(
+                    cc.elementary_cycles(net, node, method="anet"),
+                    cc.elementary_cycles(net, node, method="bf"),
+                )
+                for layer in net.slices[1]:
+                    self.assertAlmostEqual(
+                        cc.lcc_aw(net, node, layer, method="sparse"),
+                        cc.lcc_aw(net, node, layer),
+                    )
+            # The cached data is updated after the network is modified
+            for node in range(1, 15):
+                net[0, node, 0] = 1 - net[0, node, 0]
+
     def test_unweighted_nonglobalnodes_consistency(self, net):
         # Tests direct cycle vector numeration against matrix multiplication
         for snode in net.slices[0]:
@@ -635,6 +750,10 @@ def test_cc(consistency_tests=False):
     suite.addTest(TestCC("test_directed_unweighted"))
     suite.addTest(TestCC("test_unweighted_consistency_er"))
     suite.addTest(TestCC("test_normalization_full_mslice"))
+    suite.addTest(TestCC("test_elementary_cycles_all"))
+    suite.addTest(TestCC("test_aw_methods"))
+    suite.addTest(TestCC("test_compute_all"))
+    suite.addTest(TestCC("test_cached_anet"))
     if consistency_tests:
         suite.addTest(TestCC("test_consistency_mslice_er"))
         suite.addTest(TestCC("test_unweighted_nonglobalnodes_consistency_er"))
@@ -1,5 +1,9 @@
+import os
+import random
 import sys
+import tempfile
 import unittest
+from unittest import mock
 
 import pymnet.graphlets as graphlets
 from pymnet import isomorphisms, net
@@ -88,6 +92,59 @@ class TestGraphlets(unittest.TestCase):
         }
         assert auts == target_auts
 
+    def test_graphlets_workers(self):
+        nets, invs = graphlets.graphlets(
+            n=4, layers=["a", "b"], couplings="categorical", allowed_aspects="all"
+        )
+        auts = graphlets.automorphism_orbits(nets, allowed_aspects="all")
+        nets_w, invs_w = graphlets.graphlets(
+            n=4,
+            layers=["a", "b"],
+            couplings="categorical",
+            allowed_aspects="all",
+            workers=2,
+        )
+        auts_w = graphlets.automorphism_orbits(nets_w, allowed_aspects="all", workers=2)
+        self.assertEqual(invs_w, invs)
+        self.assertEqual(auts_w, auts)
+        for n_nodes in nets:
+            self.assertEqual(len(nets_w[n_nodes]), len(nets[n_nodes]))
+            for net_w, net_ref in zip(nets_w[n_nodes], nets[n_nodes]):
+                self.assertEqual(net_w, net_ref)
+
+    def test_cached_graphlets(self):
+        nets, invs = graphlets.graphlets(
+            n=3, layers=["a", "b"], couplings="categorical", allowed_aspects="all"
+        )
+        auts = graphlets.automorphism_orbits(nets, allowed_aspects="all")
+        with tempfile.TemporaryDirectory() as cache_dir:
+            for _ in range(2):
+                nets_c, invs_c, auts_c = graphlets.cached_graphlets(
+                    n=3,
+                    layers=["a", "b"],
+                    couplings="categorical",
+                    allowed_aspects="all",
+                    cache_dir=cache_dir,
+                )
+                self.assertEqual(invs_c, invs)
+                self.assertEqual(auts_c, auts)
+                for n_nodes in nets:
+                    self.assertEqual(nets_c[n_nodes], nets[n_nodes])
+            nets_c, invs_c, auts_c = graphlets.cached_graphlets(
+                n=2, layers=["a", "b"], couplings="categorical", cache_dir=cache_dir
+            )
+            self.assertEqual(list(nets_c), [2])
+
+            # Files written by other versions of pymnet are not loaded
+            n_files = len(os.listdir(cache_dir))
+            module = sys.modules["pymnet.graphlets.graphlets"]
+            with mock.patch.object(module, "_library_version", lambda: "0.0.0"):
+                nets_c, invs_c, auts_c = graphlets.cached_graphlets(
+                    n=2, layers=["a", "b"], couplings="categorical", cache_dir=cache_dir
+                )
+            self.assertEqual(list(nets_c), [2])
+            self.assertEqual(len(os.listdir(cache_dir)), n_files + 1)
+
     def test_list_orbits(self):
         nets, invs = graphlets.graphlets(
             n=3,
@@ -364,17 +421,79 @@ class TestGraphlets(unittest.TestCase):
         }
         assert orbits_n0 == target_orbits_n0
 
+    def test_orbit_counts_all_random(self):
+        rng = random.Random(3)
+        M = net.MultiplexNetwork(couplings="categorical", fullyInterconnected=True)
+        for node in range(15):
+            M.add_node(node)
+        for layer in ["x", "y"]:
+            M.add_layer(layer)
+            for i in range(15):
+                for j in range(i + 1, 15):
+                    if rng.random() < 0.2:
+                        M[i, j, layer] = 1
+        n_edges = len(M.edges)
+        nets, invs = graphlets.graphlets(
+            n=3, layers=["a", "b"], couplings="categorical", allowed_aspects="all"
+        )
+        auts = graphlets.automorphism_orbits(nets, allowed_aspects="all")
+        orbit_is = graphlets.orbit_numbers(n=3, nets=nets, auts=auts)
+        orbit_list = graphlets.ordered_orbit_list(orbit_is)
+        orbits = graphlets.orbit_counts_all(
+            net=M, n=3, nets=nets, invs=invs, auts=auts, orbit_list=orbit_list
+        )
+        self.assertEqual(len(M.edges), n_edges)
+        target_orbits = dict()
+        for node in M.slices[0]:
+            graphlets.orbit_counts(
+                n=3,
+                node0=node,
+                net=M,
+                nets=nets,
+                orbits=target_orbits,
+                invs=invs,
+                auts=auts,
+                orbit_list=orbit_list,
+            )
+        self.assertEqual(dict(orbits), target_orbits)
+
+    def test_gcd(self):
+        import numpy
+
+        rng = numpy.random.default_rng(1)
+        orbits = rng.poisson(2, (20, 5))
+        gcm = graphlets.GCM(orbits)
+        self.assertEqual(gcm.shape, (5, 5))
+        self.assertTrue(numpy.allclose(numpy.diag(gcm), 1))
+        self.assertEqual(orbits.shape, (20, 5))
+
+        gcms = [graphlets.GCM(rng.poisson(2, (20, 5))) for _ in range(7)]
+        gcds = graphlets.GCD_matrix(gcms)
+        for i in range(7):
+            for j in range(7):
+                gcd = 0
+                for k in range(5):
+                    for l in range(k + 1, 5):
+                        gcd += (gcms[i][k][l] - gcms[j][k][l]) ** 2
+                self.assertAlmostEqual(gcds[i][j], gcd**0.5)
+                self.assertAlmostEqual(graphlets.GCD(gcms[i], gcms[j]), gcd**0.5)
+        self.assertTrue(numpy.allclose(graphlets.GCD_matrix(gcms, chunk_size=3), gcds))
+
 
 def makesuite():
     suite = unittest.TestSuite()
     suite.addTest(TestGraphlets("test_graphlets"))
     suite.addTest(TestGraphlets("test_automorphism_orbits"))
+    suite.addTest(TestGraphlets("test_graphlets_workers"))
+    suite.addTest(TestGraphlets("test_cached_graphlets"))
     suite.addTest(TestGraphlets("test_list_orbits"))
     suite.addTest(TestGraphlets("test_orbit_equations"))
     suite.addTest(TestGraphlets("test_independent_equations"))
     suite.addTest(TestGraphlets("test_redundant_orbits"))
     suite.addTest(TestGraphlets("test_orbit_counts_all"))
     suite.addTest(TestGraphlets("test_orbit_counts"))
+    suite.addTest(TestGraphlets("test_orbit_counts_all_random"))
+    suite.addTest(TestGraphlets("test_gcd"))
     return suite
 
 
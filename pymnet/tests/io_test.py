@@ -1,4 +1,5 @@
 import os
+import pathlib
 import sys
 import tempfile
 import unittest
@@ -191,6 +192,117 @@ Data:
             net = netio.read_edge_file(fn, sep="\t")
             self.assertEqual(len(net.edges), 1)
 
+            # paths and open files are also accepted, and files are left open
+            net = netio.read_edge_file(pathlib.Path(fn), sep="\t")
+            self.assertEqual(len(net.edges), 1)
+            with open(fn) as f:
+                net = netio.read_edge_file(f, sep="\t")
+                self.assertFalse(f.closed)
+            self.assertEqual(len(net.edges), 1)
+
+    def test_read_edge_file_chunks(self):
+        lines = ["1\t1\t2\t0.5", "1\t2\t3\t1", "2\t1\t3\t2", "2\t3\t3\t1", "3\t4\t1\t1"]
+        n = net.MultiplexNetwork(couplings=["categorical"])
+        for line in lines:
+            l, f, t, w = line.split("\t")
+            if f != t:
+                n[int(f), int(t), int(l)] = float(w)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            import gzip
+
+            fn = os.path.join(tmp, "test.txt")
+            with open(fn, "w") as f:
+                f.write("\n".join(lines) + "\n")
+            fngz = os.path.join(tmp, "test.txt.gz")
+            with gzip.open(fngz, "wt") as f:
+                f.write("\n".join(lines) + "\n")
+
+            nlines = []
+            for filename in [fn, fngz]:
+                net1 = netio.read_edge_file(
+                    filename, chunkSize=10, progress=nlines.append
+                )
+                self.assertEqual(net1, n)
+            self.assertEqual(nlines[-1], len(lines))
+            self.assertTrue(len(nlines) > 2)
+
+            net2 = netio.read_edge_file(fngz, labelType=str)
+            self.assertEqual(set(net2), {"1", "2", "3", "4"})
+            self.assertEqual(set(net2.get_layers()), {"1", "2", "3"})
+            self.assertEqual(net2["1", "2", "1"], 0.5)
+            self.assertEqual(len(net2.A["2"].edges), 1)
+            self.assertEqual(len(net2.edges), len(n.edges))
+
+    def test_binary(self):
+        n1 = net.MultilayerNetwork(aspects=1)
+        n1[1, 2, "a", "b"] = 1
+        n1[2, 3, "a", "a"] = 2.5
+        n1[3, 3, "b", "b"] = 1
+        n1.add_node(4)
+
+        n2 = net.MultilayerNetwork(aspects=2, directed=True, fullyInterconnected=False)
+        n2[1, 2, "a", "b", "x", "x"] = 1
+        n2[2, 1, "a", "a", "x", "y"] = 2
+        n2.add_node(3, layer=("b", "y"))
+
+        n3 = net.CSRMultilayerNetwork(aspects=0)
+        n3.add_edges([(1, 2, 1), (2, 3, 2), (3, 1, 0)])
+
+        m1 = net.MultiplexNetwork(
+            couplings=["categorical", ("ordinal", 0.5)], fullyInterconnected=False
+        )
+        m1[1, 2, "a", 1] = 1
+        m1[2, 3, "b", 2] = 1
+
+        coupling = net.MultilayerNetwork(aspects=0)
+        coupling["a", "b"] = 0.5
+        m2 = net.MultiplexNetwork(couplings=[coupling], directed=True)
+        m2[1, 2, "a"] = 1
+        m2[2, 3, "b"] = 3
+
+        with tempfile.TemporaryDirectory() as tmp:
+            # Memory-mapped files cannot be overwritten or removed on all
+            # platforms, so each network is written into a different file.
+            for i, n in enumerate([n1, n2, n3]):
+                for mmap in [True, False]:
+                    fn = os.path.join(tmp, "test%d%d.bin" % (i, mmap))
+                    netio.write_binary(n, fn)
+                    n_read = netio.read_binary(fn, mmap=mmap)
+                    self.assertTrue(isinstance(n_read, net.CSRMultilayerNetwork))
+                    self.assertEqual(sorted(n_read.edges), sorted(n.edges))
+                    self.assertEqual(n_read.slices, n.slices)
+                    self.assertEqual(
+                        set(n_read.iter_node_layers()), set(n.iter_node_layers())
+                    )
+                    for nl in n.iter_node_layers():
+                        self.assertEqual(n_read[nl].deg(), n[nl].deg())
+                    for edge in n.edges:
+                        self.assertEqual(n_read[edge[:-1]], edge[-1])
+                    self.assertEqual(n_read[(1, 7) + (len(n.slices) - 1) * ("a",)], 0)
+
+                    # The read network can be modified
+                    n_read[(5, 6) + (len(n.slices) - 1) * ("c",)] = 1
+                    n_read[(5, 1) + (len(n.slices) - 1) * ("c",)] = 1
+                    self.assertEqual(len(n_read.edges), len(n.edges) + 2)
+                    self.assertEqual(
+                        n_read[(5,) + (len(n.slices) - 1) * ("c",)].deg(), 2
+                    )
+            del n_read
+
+            fn = os.path.join(tmp, "test.bin")
+            for n in [m1, m2]:
+                netio.write_binary(n, fn)
+                self.assertEqual(netio.read_binary(fn), n)
+
+            with open(fn, "w") as f:
+                f.write("1\t2\t3\t1.0")
+            self.assertRaises(ValueError, lambda: netio.read_binary(fn))
+
+            n = net.MultilayerNetwork(aspects=0)
+            n[(1, 2), 3] = 1
+            self.assertRaises(ValueError, lambda: netio.write_binary(n, fn))
+
     def test_write_edge_file(self):
         n = net.MultiplexNetwork(couplings=[("categorical", 1)])
         n[1, 2, 3, 3] = 1
@@ -215,6 +327,8 @@ def test_io():
     suite.addTest(TestIO("test_write_json"))
     suite.addTest(TestIO("test_write_edge_files"))
     suite.addTest(TestIO("test_read_edge_file"))
+    suite.addTest(TestIO("test_read_edge_file_chunks"))
+    suite.addTest(TestIO("test_binary"))
     suite.addTest(TestIO("test_write_edge_file"))
 
     return unittest.TextTestRunner().run(suite).wasSuccessful()
@@ -1,3 +1,4 @@
+import pickle
 import random
 import sys
 import unittest
@@ -443,6 +444,15 @@ class TestIsomorphisms(unittest.TestCase):
     def test_get_isomorphism_bbind(self):
         self.test_get_isomorphism(backend="bliss_bind")
 
+    def test_pickle_complete_invariant_bbind(self):
+        # Complete invariants are sent between processes, e.g., in graphlets
+        for _ in range(10):
+            n = models.er_partially_interconnected([[1, 2, 3, 4], [2, 3, 4]], [0.5] * 2)
+            ci = isomorphisms.get_complete_invariant(n, backend="bliss_bind")
+            ci_copy = pickle.loads(pickle.dumps(ci))
+            self.assertEqual(ci_copy, ci)
+            self.assertEqual(hash(ci_copy), hash(ci))
+
 
 def test_isomorphisms():
     suite = unittest.TestSuite()
@@ -480,6 +490,7 @@ def test_isomorphisms():
         )
         suite.addTest(TestIsomorphisms("test_automorphism_generator_bbind"))
         suite.addTest(TestIsomorphisms("test_get_isomorphism_bbind"))
+        suite.addTest(TestIsomorphisms("test_pickle_complete_invariant_bbind"))
 
     return unittest.TextTestRunner().run(suite).wasSuccessful()
 
@@ -31,6 +31,21 @@ class TestModels(unittest.TestCase):
         models.single_layer_er(net3, range(10), p=1.0, edges=None)
         self.assertEqual(len(net3.edges), 45)
 
+        net4 = net.MultilayerNetwork(aspects=0)
+        models.single_layer_er(net4, range(10), p=0.0)
+        self.assertEqual(len(net4.edges), 0)
+        self.assertEqual(len(net4), 10)
+
+        # the number of edges is binomially distributed
+        size, p = 2000, 0.01
+        net5 = net.MultilayerNetwork(aspects=0)
+        models.single_layer_er(net5, list(range(size)), p=p)
+        pairs = size * (size - 1) / 2
+        self.assertLess(
+            abs(len(net5.edges) - pairs * p), 5 * math.sqrt(pairs * p * (1 - p))
+        )
+        self.assertEqual(len(net5), size)
+
     def test_multiplex_erdosrenyi(self):
         net = models.er(10, 0.5)
         net2 = models.er(10, [0.4, 0.6])
@@ -107,6 +122,48 @@ class TestModels(unittest.TestCase):
         self.assertEqual(set(net.A["l1"]), set(range(100)))
         self.assertEqual(set(net.A["l2"]), set(range(20, 120)))
 
+    def test_conf_ensemble(self):
+        random.seed(7)
+        nets = list(models.conf_ensemble({3: 20, 0: 2}, 50))
+        self.assertEqual(len(nets), 50)
+        for n in nets:
+            self.assertEqual(diagnostics.degs(n), {3: 20, 0: 2})
+            self.assertEqual(len(list(n.edges)), 30)
+            for e in n.edges:
+                self.assertNotEqual(e[0], e[1])
+        self.assertTrue(len(set(frozenset(n.edges) for n in nets)) > 1)
+
+        # dense degree sequences require many swaps
+        for n in models.conf_ensemble({18: 20}, 5):
+            self.assertEqual(diagnostics.degs(n), {18: 20})
+        for n in models.conf_ensemble({3: 4}, 50):
+            self.assertEqual(diagnostics.degs(n), {3: 4})
+        for n in models.conf_ensemble({29: 30}, 50):
+            self.assertEqual(diagnostics.degs(n), {29: 30})
+
+        # the degree sequences that are not graphical are rejected
+        degrees = [7, 7, 5, 4, 2, 2, 1, 0, 0]
+        degs = {100 + i: d for i, d in enumerate(degrees)}
+        self.assertRaises(ValueError, models.conf, degs, degstype="nodes")
+        self.assertRaises(
+            ValueError, lambda: list(models.conf_ensemble(degs, 2, degstype="nodes"))
+        )
+        self.assertRaises(ValueError, models.conf, {1: 3})
+        self.assertRaises(ValueError, models.conf, {4: 4})
+
+        degs = {"a": {0: 2, 1: 2, 2: 2}, "b": {0: 1, 1: 1, 3: 2}}
+        nets = list(models.conf_ensemble(degs, 10, degstype="nodes"))
+        for n in nets:
+            self.assertEqual(diagnostics.multiplex_degs(n, degstype="nodes"), degs)
+            self.assertFalse(n.fullyInterconnected)
+
+        # the realizations are reproducible with random.seed
+        random.seed(7)
+        nets = list(models.conf_ensemble({3: 20, 0: 2}, 3))
+        random.seed(7)
+        nets2 = list(models.conf_ensemble({3: 20, 0: 2}, 3))
+        self.assertEqual([set(n.edges) for n in nets], [set(n.edges) for n in nets2])
+
     def test_full_multiplex_network(self):
         self.assertEqual(diagnostics.degs(models.full(nodes=10, layers=None)), {9: 10})
 
@@ -132,7 +189,7 @@ class TestModels(unittest.TestCase):
             nodes, ps, couplings=("categorical", 0.9)
         )
         self.assertListEqual(
-            list(model.edges)[:2], [(0, 5, 0, 0, 1), (0, 0, 0, 1, 0.9)]
+            list(model.edges)[:2], [(0, 0, 0, 1, 0.9), (2, 9, 0, 0, 1)]
         )
 
     def test_conf_overlaps(self):
@@ -170,9 +227,17 @@ class TestModels(unittest.TestCase):
         model = models.ba_total_degree(100, [1, 2])
         self.assertEqual(len(list(model.edges)), 295)
         self.assertListEqual(
-            list(model.edges)[10:12], [(0, 12, 1, 1, 1), (0, 22, 1, 1, 1)]
+            list(model.edges)[10:12], [(0, 28, 1, 1, 1), (0, 34, 1, 1, 1)]
         )
 
+        # each node i >= m links to m distinct earlier nodes in a layer
+        ms = [3, 1, 5]
+        model = models.ba_total_degree(300, ms)
+        for layer, m in enumerate(ms):
+            for i in range(300):
+                earlier = [j for j in model.A[layer][i] if j < i]
+                self.assertEqual(len(earlier), m if i >= m else 0)
+
     # TODO double-check model implementation
     def test_geo(self):
         random.seed(42)
@@ -194,6 +259,46 @@ class TestModels(unittest.TestCase):
     def test_er_overlaps_match_aggregated(self):
         pass
 
+    def test_ensemble(self):
+        nets = models.ensemble(models.er, 6, 20, [0.2, 0.3], seed=3)
+        self.assertEqual(len(nets), 6)
+        self.assertEqual(set(nets[0].get_layers()), {0, 1})
+        self.assertTrue(len(set(frozenset(n.edges) for n in nets)) > 1)
+
+        # the results do not depend on the workers or the global random state
+        degs = models.ensemble(
+            models.conf, 8, {3: 20}, statistic=diagnostics.degs, seed=3
+        )
+        self.assertEqual(degs, 8 * [{3: 20}])
+        edges = models.ensemble(models.er, 6, 20, [0.2, 0.3], seed=3, workers=2)
+        self.assertEqual([set(n.edges) for n in nets], [set(n.edges) for n in edges])
+        random.seed(1)
+        edges = models.ensemble(models.er, 6, 20, [0.2, 0.3], seed=3, chunkSize=4)
+        self.assertEqual([set(n.edges) for n in nets], [set(n.edges) for n in edges])
+
+        # without a seed the ensemble is reproducible with random.seed
+        progress = []
+        random.seed(1)
+        counts = models.ensemble(
+            models.ba_total_degree,
+            4,
+            30,
+            [1, 2],
+            statistic=_count_edges,
+            chunkSize=3,
+            progress=progress.append,
+        )
+        random.seed(1)
+        counts2 = models.ensemble(
+            models.ba_total_degree, 4, 30, [1, 2], statistic=_count_edges
+        )
+        self.assertEqual(counts, counts2)
+        self.assertEqual(progress, [3, 4])
+
+
+def _count_edges(net):
+    return len(list(net.edges))
+
 
 def test_models():
     suite = unittest.TestSuite()
@@ -201,6 +306,7 @@ def test_models():
     suite.addTest(TestModels("test_multiplex_erdosrenyi"))
     suite.addTest(TestModels("test_monoplex_configuration_model"))
     suite.addTest(TestModels("test_multiplex_configuration_model"))
+    suite.addTest(TestModels("test_conf_ensemble"))
     suite.addTest(TestModels("test_full_multiplex_network"))
     suite.addTest(TestModels("test_er_partially_interconnected"))
     suite.addTest(TestModels("test_conf_overlaps"))
@@ -208,6 +314,7 @@ def test_models():
     suite.addTest(TestModels("test_geo"))
     suite.addTest(TestModels("test_ws"))
     suite.addTest(TestModels("test_er_overlaps_match_aggregated"))
+    suite.addTest(TestModels("test_ensemble"))
 
     return unittest.TextTestRunner().run(suite).wasSuccessful()
 
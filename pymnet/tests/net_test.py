@@ -1,3 +1,4 @@
+import pickle
 import sys
 import unittest
 from operator import itemgetter
@@ -247,6 +248,14 @@ class TestNet(unittest.TestCase):
         testnet = net.MultilayerNetwork(aspects=0)
         self.test_flat(testnet)
 
+    def test_flat_directed_csrnet(self):
+        testnet = net.CSRMultilayerNetwork(aspects=0, directed=True)
+        self.test_flat_directed(testnet)
+
+    def test_flat_csrnet(self):
+        testnet = net.CSRMultilayerNetwork(aspects=0)
+        self.test_flat(testnet)
+
     def test_set_link(self):
         testnet = net.MultilayerNetwork(aspects=0)
         with self.assertRaises(TypeError):
@@ -308,6 +317,13 @@ class TestNet(unittest.TestCase):
         testnet[3, 3, 1, 2] = 1
         self.test_simple_couplings(testnet)
 
+    def test_simple_couplings_csrnet(self):
+        testnet = net.CSRMultilayerNetwork(aspects=1)
+        testnet[1, 1, 1, 2] = 1
+        testnet[2, 2, 1, 2] = 1
+        testnet[3, 3, 1, 2] = 1
+        self.test_simple_couplings(testnet)
+
     def test_simple_couplings_categorical_mplex(self):
         testnet = net.MultiplexNetwork(couplings=[("categorical", 1.0)])
         self.test_simple_couplings(testnet)
@@ -540,6 +556,402 @@ class TestNet(unittest.TestCase):
 
         self.test_2dim_categorical_couplings(testnet)
 
+    def test_2dim_categorical_couplings_csrnet(self):
+        testnet = net.CSRMultilayerNetwork(aspects=2)
+        for layer1, layer2 in [("a", "b"), ("a", "c"), ("c", "b")]:
+            for x in ["x", "y"]:
+                for node in [1, 2, 3]:
+                    testnet[node, node, layer1, layer2, x, x] = 1
+        for layer in ["a", "b", "c"]:
+            for node in [1, 2, 3]:
+                testnet[node, node, layer, layer, "x", "y"] = 1
+        self.add_intralayer_edges_2dim(testnet)
+
+        self.test_2dim_categorical_couplings(testnet)
+
+    def test_csrnet_modifications(self):
+        """Test that the CSR network agrees with the dict based network when
+        edges are added, overwritten and removed between reads.
+        """
+        for directed in [False, True]:
+            mnet = net.MultilayerNetwork(aspects=1, directed=directed)
+            cnet = net.CSRMultilayerNetwork(aspects=1, directed=directed)
+            modifications = [
+                ((1, 2, "a", "a"), 1),
+                ((2, 3, "a", "b"), 2),
+                ((3, 3, "b", "b"), 3),
+                ((2, 1, "a", "a"), 4),
+                ((1, 2, "a", "a"), 0),
+                ((4, 5, "b", "a"), 1.5),
+                ((5, 4, "a", "b"), 2.5),
+                ((6, 7, "b", "b"), 0),
+            ]
+            for i, (link, w) in enumerate(modifications):
+                mnet[link] = w
+                cnet[link] = w
+                if i % 3 == 0:
+                    self.assertEqual(len(cnet.edges), len(mnet.edges))
+
+            self.assertEqual(sorted(cnet.edges), sorted(mnet.edges))
+            self.assertEqual(len(cnet.edges), len(mnet.edges))
+            self.assertEqual(len(cnet.edges), len(list(cnet.edges)))
+            self.assertEqual(cnet.slices, mnet.slices)
+            for nl in mnet.iter_node_layers():
+                self.assertEqual(set(cnet[nl]), set(mnet[nl]))
+                self.assertEqual(set(cnet[nl].iter_in()), set(mnet[nl].iter_in()))
+                self.assertEqual(cnet[nl].deg(), mnet[nl].deg())
+                self.assertEqual(cnet[nl].deg_in(), mnet[nl].deg_in())
+                self.assertEqual(cnet[nl].deg_out(), mnet[nl].deg_out())
+                self.assertEqual(cnet[nl].strength(), mnet[nl].strength())
+                self.assertEqual(cnet[nl].strength_in(), mnet[nl].strength_in())
+                for nl2 in mnet.iter_node_layers():
+                    self.assertEqual(cnet[nl][nl2], mnet[nl][nl2])
+
+    def test_add_edges(self):
+        """Test that adding and removing edges in bulk gives the same network
+        as setting the edges one by one."""
+        import numpy
+
+        edges1 = [
+            (1, 2, "a", "a", 1),
+            (2, 3, "a", "b", 2),
+            (3, 3, "b", "b", 3),
+            (3, 4, "c", "c", 1.5),
+        ]
+        edges2 = [(1, 2, "a", "a"), (4, 3, "c", "c"), (2, 1, "a", "a")]
+        mplexedges = [
+            edge for edge in edges1 if edge[2] == edge[3] and edge[0] != edge[1]
+        ]
+
+        def nets():
+            for directed in [False, True]:
+                for fullyInterconnected in [False, True]:
+                    yield (
+                        net.MultilayerNetwork(
+                            aspects=1,
+                            directed=directed,
+                            fullyInterconnected=fullyInterconnected,
+                        ),
+                        edges1,
+                    )
+                    yield (
+                        net.CSRMultilayerNetwork(
+                            aspects=1,
+                            directed=directed,
+                            fullyInterconnected=fullyInterconnected,
+                        ),
+                        edges1,
+                    )
+                    yield (
+                        net.MultiplexNetwork(
+                            couplings="categorical",
+                            directed=directed,
+                            fullyInterconnected=fullyInterconnected,
+                        ),
+                        mplexedges,
+                    )
+
+        def sorted_edges(n):
+            # Undirected edges can be listed in either orientation, depending on
+            # the iteration order of the nodes and layers.
+            if n.directed:
+                return sorted(n.edges)
+            edges = []
+            for edge in n.edges:
+                ends = sorted([edge[0:-1:2], edge[1:-1:2]])
+                edges.append(sum(zip(*ends), ()) + edge[-1:])
+            return sorted(edges)
+
+        for (n1, edges), (n2, edges), (n3, edges), (n4, edges) in zip(
+            nets(), nets(), nets(), nets()
+        ):
+            for edge in edges:
+                n1[edge[:-1]] = edge[-1]
+            n2.add_edges(edges)
+            n3.add_edges(
+                numpy.array(
+                    edges,
+                    dtype=[
+                        ("node1", int),
+                        ("node2", int),
+                        ("layer1", "U1"),
+                        ("layer2", "U1"),
+                        ("weight", float),
+                    ],
+                )
+            )
+            columns = list(zip(*edges))
+            n4.add_edges(
+                node1=numpy.array(columns[0]),
+                node2=columns[1],
+                layer1=columns[2],
+                layer2=columns[3],
+                weight=columns[4],
+            )
+            for n in [n2, n3, n4]:
+                self.assertEqual(sorted_edges(n), sorted_edges(n1))
+                self.assertEqual(n.slices, n1.slices)
+                self.assertEqual(set(n.iter_node_layers()), set(n1.iter_node_layers()))
+                for nl in n1.iter_node_layers():
+                    self.assertEqual(n[nl].deg(), n1[nl].deg())
+
+            for edge in edges2:
+                n1[edge] = 0
+            n2.remove_edges(edges2)
+            n3.add_edges(edges2, weight=0)
+            self.assertEqual(sorted_edges(n2), sorted_edges(n1))
+            self.assertEqual(sorted_edges(n3), sorted_edges(n1))
+            for nl in n1.iter_node_layers():
+                self.assertEqual(n2[nl].deg(), n1[nl].deg())
+                self.assertEqual(n3[nl].deg(), n1[nl].deg())
+
+        # Same with two aspects
+        n1 = net.MultilayerNetwork(aspects=2, directed=True)
+        n2 = net.MultilayerNetwork(aspects=2, directed=True)
+        n1[1, 2, "a", "b", "x", "x"] = 1
+        n1[2, 1, "b", "b", "x", "y"] = 2
+        n2.add_edges(
+            node1=[1, 2],
+            node2=[2, 1],
+            layer1=[["a", "b"], ["x", "x"]],
+            layer2=[["b", "b"], ["x", "y"]],
+            weight=[1, 2],
+        )
+        self.assertEqual(n1, n2)
+        self.assertEqual(n1[2, "b", "x"].deg(), n2[2, "b", "x"].deg())
+
+        n1 = net.MultilayerNetwork(aspects=2)
+        n2 = net.MultilayerNetwork(aspects=2)
+        n1[1, 2, "a", "b", "x", "x"] = 1
+        n1[3, 1, "b", "a", "y", "x"] = 2
+        n2.add_edges([(2, 1, "b", "a", "x", "x", 1), (1, 3, "a", "b", "x", "y", 2)])
+        self.assertEqual(sorted_edges(n1), sorted_edges(n2))
+        self.assertEqual(len(sorted_edges(n2)), 2)
+
+        n = net.MultilayerNetwork(aspects=0)
+        self.assertRaises(TypeError, lambda: n.add_edges([(1, 2, "a")]))
+        self.assertRaises(KeyError, lambda: n.add_edges([(1, 2, 3, 4)]))
+        n = net.MultiplexNetwork(couplings="categorical")
+        self.assertRaises(KeyError, lambda: n.add_edges([(1, 2, "a", "b", 1)]))
+
+        # A rejected batch leaves the network unchanged
+        for fullyInterconnected in [True, False]:
+            n = net.MultiplexNetwork(
+                couplings="categorical", fullyInterconnected=fullyInterconnected
+            )
+            n[1, 2, "a"] = 1
+            nodelayers = sorted(n.iter_node_layers())
+            edges = sorted_edges(n)
+            for batch in [
+                [(5, 6, "a", "a", 1), (7, 8, "a", "b", 1)],
+                [(5, 6, "b", "b", 1), (7, 7, "c", "c", 1)],
+            ]:
+                self.assertRaises(KeyError, lambda: n.add_edges(batch))
+                self.assertRaises(KeyError, lambda: n.remove_edges(batch))
+                self.assertEqual(list(n.slices[1]), ["a"])
+                self.assertEqual(sorted(n.iter_node_layers()), nodelayers)
+                self.assertEqual(sorted_edges(n), edges)
+
+    def test_degree_cache(self):
+        """Test that the cached degrees and strengths stay equal to the ones
+        computed from scratch when links are set and removed."""
+
+        def assert_same_degrees(n1, n2):
+            self.assertEqual(len(n1.edges), len(n2.edges))
+            for nl in n2.iter_node_layers():
+                dimslist = [None, (None,) + nl[1:]]
+                if n2.aspects > 0:
+                    dimslist.append((None,) + (None,) * (n2.aspects - 1) + ("b",))
+                for dims in dimslist:
+                    if dims == None:
+                        node1, node2 = n1[nl], n2[nl]
+                    else:
+                        node1 = net.MultilayerNode(nl, n1, layers=dims)
+                        node2 = net.MultilayerNode(nl, n2, layers=dims)
+                    self.assertEqual(node1.deg(), node2.deg())
+                    self.assertEqual(node1.deg_in(), node2.deg_in())
+                    self.assertEqual(node1.deg_out(), node2.deg_out())
+                    self.assertEqual(node1.strength(), node2.strength())
+                    self.assertEqual(node1.strength_in(), node2.strength_in())
+                    self.assertEqual(node1.strength_out(), node2.strength_out())
+
+        for aspects in [0, 1, 2]:
+            for directed in [False, True]:
+                n1 = net.MultilayerNetwork(aspects=aspects, directed=directed)
+                n2 = net.MultilayerNetwork(aspects=aspects, directed=directed)
+                layers = [
+                    ("a",) * aspects,
+                    ("b",) * aspects,
+                    ("a",) * (aspects - 1) + ("b",),
+                ]
+                layers = layers if aspects > 0 else [()]
+
+                def link(i, j, s, r):
+                    return (i, j) + tuple(x for pair in zip(s, r) for x in pair)
+
+                links = []
+                for i in range(4):
+                    for j in range(4):
+                        for s in layers:
+                            for r in layers:
+                                if (i + j + len(links)) % 3 == 0:
+                                    links.append(link(i, j, s, r))
+                for k, l in enumerate(links[: len(links) // 2]):
+                    n1[l] = k + 1
+                n2.cache_degrees()
+                for k, l in enumerate(links[: len(links) // 2]):
+                    n2[l] = k + 1
+                assert_same_degrees(n1, n2)
+
+                # Changing and removing links one by one and in bulk
+                for k, l in enumerate(links):
+                    for n in [n1, n2]:
+                        n[l] = k % 4
+                assert_same_degrees(n1, n2)
+                n1.add_edges([l + (2,) for l in links[::2]])
+                n2.add_edges([l + (2,) for l in links[::2]])
+                assert_same_degrees(n1, n2)
+                n1.remove_edges(links[::3])
+                n2.remove_edges(links[::3])
+                assert_same_degrees(n1, n2)
+
+                # The cache built from an existing network
+                n1.cache_degrees()
+                assert_same_degrees(n2, n1)
+                n2.cache_degrees(False)
+                assert_same_degrees(n2, n1)
+
+        for directed in [False, True]:
+            for fullyInterconnected in [False, True]:
+                n1 = net.MultiplexNetwork(
+                    couplings="categorical",
+                    directed=directed,
+                    fullyInterconnected=fullyInterconnected,
+                )
+                n2 = net.MultiplexNetwork(
+                    couplings="categorical",
+                    directed=directed,
+                    fullyInterconnected=fullyInterconnected,
+                )
+                n1[1, 2, "a"] = 2
+                n2[1, 2, "a"] = 2
+                n2.cache_degrees()
+                for n in [n1, n2]:
+                    n[2, 3, "a"] = 1.5
+                    n[1, 3, "b"] = 3
+                    n[1, 2, "a"] = 0
+                    n.add_edges([(3, 4, "b", "b", 1)])
+                assert_same_degrees(n1, n2)
+                self.assertTrue(n2.A["b"]._degreeCache is not None)
+
+    def test_get_derived(self):
+        """Test that the derived data is cached until the network is modified."""
+        calls = []
+
+        def n_edges(n):
+            calls.append(1)
+            return len(list(n.edges))
+
+        nets = [
+            net.MultilayerNetwork(aspects=1),
+            net.CSRMultilayerNetwork(aspects=1),
+            net.MultiplexNetwork(couplings="categorical"),
+            net.MultiplexNetwork(couplings="categorical", fullyInterconnected=False),
+        ]
+        for n in nets:
+            del calls[:]
+            n[1, 2, "a", "a"] = 1
+            self.assertEqual(n.get_derived("n_edges", n_edges), 1)
+            self.assertEqual(n.get_derived("n_edges", n_edges), 1)
+            self.assertEqual(len(calls), 1)
+
+            n.add_edges([(2, 3, "a", "a", 1), (1, 3, "a", "a", 1)])
+            self.assertEqual(n.get_derived("n_edges", n_edges), 3)
+            n.remove_edges([(2, 3, "a", "a")])
+            self.assertEqual(n.get_derived("n_edges", n_edges), 2)
+            n[1, 3, "a", "a"] = 0
+            self.assertEqual(n.get_derived("n_edges", n_edges), 1)
+            n.add_layer("b")
+            n.add_node(4, layer="b")
+            n_nodes = n.get_derived("n_nodes", lambda n: len(n.slices[0]))
+            self.assertEqual(n_nodes, 4)
+            self.assertEqual(len(calls), 4)
+
+        n = nets[2]
+        n_edges_before = n.get_derived("n_edges", n_edges)
+        n.A["b"][1, 4] = 1
+        self.assertEqual(n.get_derived("n_edges", n_edges), n_edges_before + 1)
+        replacement = net.MultilayerNetwork(aspects=0)
+        replacement[1, 2] = 1
+        replacement[2, 3] = 1
+        n.A["b"] = replacement
+        self.assertEqual(n.get_derived("n_edges", n_edges), n_edges_before + 2)
+
+        # The cached data is not pickled, so it does not change the hash
+        for n in nets:
+            before = pickle.dumps(n)
+            n.cache_degrees()
+            n.get_derived("n_edges", n_edges)
+            self.assertEqual(pickle.dumps(n), before)
+            copy = pickle.loads(pickle.dumps(n))
+            self.assertEqual(copy, n)
+            self.assertTrue(copy._degreeCache is None)
+            self.assertEqual(copy.get_derived("n_edges", n_edges), len(list(n.edges)))
+            copy[1, 4, "b", "b"] = 1
+            self.assertEqual(
+                copy.get_derived("n_edges", n_edges), len(list(copy.edges))
+            )
+            self.assertNotEqual(len(list(copy.edges)), len(list(n.edges)))
+
+    def test_subnet_view(self):
+        def check_view(n, nodes, *layers):
+            view = net.SubnetView(n, nodes, *layers)
+            sub = pymnet.transforms.subnet(n, nodes, *layers)
+            self.assertEqual(view.slices, sub.slices)
+            self.assertEqual(set(view), set(sub))
+            self.assertEqual(set(view.iter_node_layers()), set(sub.iter_node_layers()))
+            self.assertEqual(len(view.edges), len(sub.edges))
+            self.assertEqual(len(list(view.edges)), len(sub.edges))
+            for edge in sub.edges:
+                self.assertEqual(view[edge[:-1]], edge[-1])
+            for nl in sub.iter_node_layers():
+                self.assertEqual(set(view[nl]), set(sub[nl]))
+                self.assertEqual(view[nl].deg(), sub[nl].deg())
+                self.assertEqual(view[nl].strength_out(), sub[nl].strength_out())
+            self.assertEqual(view.materialize(), sub)
+
+        n = net.MultilayerNetwork(aspects=1, fullyInterconnected=False)
+        n[1, 2, "a", "a"] = 1
+        n[2, 3, "a", "b"] = 2
+        n[3, 4, "b", "b"] = 3
+        n[1, 4, "c", "c"] = 1
+        n.add_node(5, layer="a")
+        check_view(n, [1, 2, 3, 5], ["a", "b"])
+        check_view(n, [1, 3, 4, 6], None)
+        check_view(n, None, ["c"])
+        self.assertEqual(net.SubnetView(n, [1, 2, 3], ["a", "b"])[1, 3, "a", "b"], 0)
+        self.assertEqual(net.SubnetView(n, [1, 2], ["a"])[2, 3, "a", "b"], 0)
+
+        n = net.MultiplexNetwork(couplings="categorical", directed=True)
+        n[1, 2, "a", "a"] = 1
+        n[2, 1, "b", "b"] = 1
+        n[2, 3, "b", "b"] = 1
+        check_view(n, [1, 2], ["a", "b"])
+        check_view(n, [2, 3], ["b"])
+        view = net.SubnetView(n, [1, 2], ["b"])
+        self.assertEqual(view[2, "b"].deg_in(), 0)
+        self.assertEqual(view[2, "b"].deg_out(), 1)
+
+        # The view follows the changes of the original network
+        n[1, 2, "b", "b"] = 1
+        self.assertEqual(view[2, "b"].deg_in(), 1)
+        self.assertEqual(view[2, "b"].deg_out(), 1)
+        self.assertRaises(TypeError, view.__setitem__, (1, 2, "b", "b"), 2)
+        self.assertRaises(TypeError, view.add_node, 4)
+        self.assertRaises(TypeError, view.add_edges, [(1, 2, "b", "b", 2)])
+        self.assertRaises(TypeError, view.remove_edges, [(1, 2, "b", "b")])
+        self.assertEqual(view[1, 2, "b", "b"], 1)
+
     def test_2dim_categorical_couplings_cmnet(self):
         testnet = net.MultiplexNetwork(
             couplings=[("categorical", 1.0), ("categorical", 1.0)]
@@ -948,6 +1360,15 @@ def test_net():
     suite.addTest(TestNet("test_mplex_adding_intralayer_nets"))
     suite.addTest(TestNet("test_selfedges"))
     suite.addTest(TestNet("test_set_link"))
+    suite.addTest(TestNet("test_flat_csrnet"))
+    suite.addTest(TestNet("test_flat_directed_csrnet"))
+    suite.addTest(TestNet("test_simple_couplings_csrnet"))
+    suite.addTest(TestNet("test_2dim_categorical_couplings_csrnet"))
+    suite.addTest(TestNet("test_csrnet_modifications"))
+    suite.addTest(TestNet("test_add_edges"))
+    suite.addTest(TestNet("test_degree_cache"))
+    suite.addTest(TestNet("test_get_derived"))
+    suite.addTest(TestNet("test_subnet_view"))
 
     return unittest.TextTestRunner().run(suite).wasSuccessful()
 
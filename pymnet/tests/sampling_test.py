@@ -1,13 +1,16 @@
 # -*- coding: utf-8 -*-
 
+import multiprocessing
 import sys
 import time
 import unittest
+from unittest import mock
 
 import scipy
 import scipy.stats
 
-from pymnet import models, net
+import pymnet
+from pymnet import _parallel, isomorphisms, models, net
 from pymnet.sampling import creators, dumb, esu, reqs
 
 
@@ -2699,6 +2702,222 @@ class TestSampling(unittest.TestCase):
         resultlist.sort()
         self.assertEqual(resultlist, [([1, 3], ["X", "Y", "Z"])])
 
+    def test_esu_workers(self):
+        network = creators.er_multilayer_partially_interconnected(
+            creators.random_nodelists(30, 10, 5), 0.1
+        )
+        for requirement in [([1, 2], [1]), ([2, 3], [1])]:
+            resultlist_esu = []
+            resultlist_workers = []
+            esu.sample_multilayer_subgraphs_esu(
+                network,
+                resultlist_esu,
+                sizes=requirement[0],
+                intersections=requirement[1],
+            )
+            esu.sample_multilayer_subgraphs_esu(
+                network,
+                resultlist_workers,
+                sizes=requirement[0],
+                intersections=requirement[1],
+                workers=2,
+            )
+            for result in resultlist_esu + resultlist_workers:
+                result[0].sort()
+                result[1].sort()
+            self.assertEqual(sorted(resultlist_esu), sorted(resultlist_workers))
+
+        # The sample does not depend on the number of workers
+        samples = []
+        for workers in [1, 2, 2]:
+            resultlist = []
+            esu.sample_multilayer_subgraphs_esu(
+                network,
+                resultlist.append,
+                nnodes=3,
+                nlayers=2,
+                p=[1, 0.8, 0.5, 0.5],
+                seed=42,
+                workers=workers,
+            )
+            samples.append(resultlist)
+        self.assertTrue(len(samples[0]) > 0)
+        self.assertEqual(samples[0], samples[1])
+        self.assertEqual(samples[0], samples[2])
+
+    def test_esu_workers_spawn(self):
+        # Workers that are not forked, as on macOS, get the same sample also when
+        # the nodes and layers are strings, whose hashes are randomized
+        network = net.MultilayerNetwork(aspects=1, fullyInterconnected=False)
+        for edge in creators.er_multilayer_partially_interconnected(
+            creators.random_nodelists(30, 10, 5, seed=1), 0.1, seed=1
+        ).edges:
+            network[
+                "n%d" % edge[0], "n%d" % edge[1], "l%d" % edge[2], "l%d" % edge[3]
+            ] = edge[4]
+        spawn = multiprocessing.get_context("spawn")
+        samples = []
+        with mock.patch.object(_parallel, "_pool_context", lambda: spawn):
+            for workers in [1, 2]:
+                resultlist = []
+                esu.sample_multilayer_subgraphs_esu(
+                    network,
+                    resultlist.append,
+                    nnodes=3,
+                    nlayers=2,
+                    p=[1, 0.8, 0.5, 0.5],
+                    seed=42,
+                    workers=workers,
+                )
+                samples.append(resultlist)
+        self.assertTrue(len(samples[0]) > 0)
+        self.assertEqual(samples[0], samples[1])
+
+    def test_esu_iterative(self):
+        network = creators.er_multilayer_partially_interconnected(
+            creators.random_nodelists(30, 10, 5, seed=1), 0.05, seed=1
+        )
+        parameter_sets = [
+            {"sizes": [1, 1], "intersections": [1]},
+            {"sizes": [2, 3], "intersections": [1]},
+            {"sizes": [2, 1, 1], "intersections": [1, 0, 0, 0]},
+            {"nnodes": 1, "nlayers": 1},
+            {"nnodes": 3, "nlayers": 2},
+            {"nnodes": 1, "nlayers": 3},
+        ]
+        for parameters in parameter_sets:
+            resultlist_recursive = []
+            resultlist_iterative = []
+            esu.sample_multilayer_subgraphs_esu(
+                network, resultlist_recursive, **parameters
+            )
+            esu.sample_multilayer_subgraphs_esu(
+                network, resultlist_iterative, engine="iterative", **parameters
+            )
+            for result in resultlist_recursive + resultlist_iterative:
+                result[0].sort()
+                result[1].sort()
+            self.assertEqual(sorted(resultlist_recursive), sorted(resultlist_iterative))
+
+        resultlist_iterative = []
+        resultlist_workers = []
+        esu.sample_multilayer_subgraphs_esu(
+            network, resultlist_iterative, nnodes=3, nlayers=2, engine="iterative"
+        )
+        esu.sample_multilayer_subgraphs_esu(
+            network,
+            resultlist_workers,
+            nnodes=3,
+            nlayers=2,
+            engine="iterative",
+            workers=2,
+        )
+        self.assertEqual(resultlist_iterative, resultlist_workers)
+
+    def test_iter_subgraphs(self):
+        network = creators.er_multilayer_partially_interconnected(
+            creators.random_nodelists(30, 10, 5, seed=1), 0.05, seed=1
+        )
+        for engine in ["recursive", "iterative"]:
+            resultlist = []
+            esu.sample_multilayer_subgraphs_esu(
+                network, resultlist, nnodes=2, nlayers=2, engine=engine
+            )
+            self.assertEqual(
+                list(
+                    esu.iter_multilayer_subgraphs_esu(
+                        network, nnodes=2, nlayers=2, engine=engine
+                    )
+                ),
+                resultlist,
+            )
+
+            batches = list(
+                esu.iter_multilayer_subgraphs_esu(
+                    network,
+                    nnodes=2,
+                    nlayers=2,
+                    engine=engine,
+                    batch_size=4,
+                )
+            )
+            self.assertEqual(
+                sum(len(nodes) for nodes, layers in batches), len(resultlist)
+            )
+            self.assertTrue(len(batches) > 1)
+            self.assertEqual(batches[0][0].shape, (4, 2))
+            self.assertEqual(batches[0][1].shape, (4, 2))
+            self.assertEqual(
+                [
+                    (list(n), list(l))
+                    for nodes, layers in batches
+                    for n, l in zip(nodes, layers)
+                ],
+                resultlist,
+            )
+
+        # The subgraphs are checked only as far as they are consumed
+        checked = []
+
+        def custom_check(network, nodelist, layerlist):
+            checked.append(nodelist)
+            return True
+
+        subgraphs = esu.iter_multilayer_subgraphs_esu(
+            network, nnodes=2, nlayers=2, custom_check_function=custom_check
+        )
+        self.assertEqual(len(checked), 0)
+        next(subgraphs)
+        next(subgraphs)
+        self.assertEqual(len(checked), 2)
+
+        resultlist = []
+        dumb.dumb_enumeration(network, resultlist, sizes=[1, 2], intersections=[1])
+        self.assertEqual(
+            list(dumb.iter_dumb_enumeration(network, sizes=[1, 2], intersections=[1])),
+            resultlist,
+        )
+        nodes, layers = next(
+            dumb.iter_dumb_enumeration(
+                network, sizes=[1, 2], intersections=[1], batch_size=100
+            )
+        )
+        self.assertEqual(nodes.shape, (len(resultlist), 2))
+
+    def test_count_subgraph_types(self):
+        network = creators.er_multilayer_partially_interconnected(
+            creators.random_nodelists(40, 20, 4, seed=1), 0.05, seed=1
+        )
+        resultlist = []
+        esu.sample_multilayer_subgraphs_esu(network, resultlist, nnodes=3, nlayers=2)
+        for allowed_aspects in ["all", [0], [1]]:
+            counts = dict()
+            for nodelist, layerlist in resultlist:
+                invariant = pymnet.get_complete_invariant(
+                    pymnet.subnet(network, nodelist, layerlist),
+                    allowed_aspects=allowed_aspects,
+                )
+                counts[invariant] = counts.get(invariant, 0) + 1
+            for cache_size in [1, 2**16]:
+                self.assertEqual(
+                    esu.count_subgraph_types(
+                        network,
+                        nnodes=3,
+                        nlayers=2,
+                        allowed_aspects=allowed_aspects,
+                        cache_size=cache_size,
+                    ),
+                    counts,
+                )
+
+        # The subgraphs of directed networks cannot be classified
+        directed = net.MultilayerNetwork(aspects=1, directed=True)
+        directed[1, 2, "a", "a"] = 1
+        directed[2, 3, "a", "a"] = 1
+        self.assertRaises(
+            ValueError, esu.count_subgraph_types, directed, nnodes=2, nlayers=1
+        )
+
     def test_esu_exhaustive(self):
         reqlist = [
             ([1, 1], [0]),
@@ -3337,6 +3556,12 @@ def makesuite(
     suite.addTest(TestSampling("test_esu_callback"))
     suite.addTest(TestSampling("test_dumb_custom_check_function"))
     suite.addTest(TestSampling("test_esu_custom_check_function"))
+    suite.addTest(TestSampling("test_esu_workers"))
+    suite.addTest(TestSampling("test_esu_workers_spawn"))
+    suite.addTest(TestSampling("test_esu_iterative"))
+    suite.addTest(TestSampling("test_iter_subgraphs"))
+    if len(isomorphisms.complete_invariant_backends) > 0:
+        suite.addTest(TestSampling("test_count_subgraph_types"))
     if exhaustive:
         suite.addTest(TestSampling("test_esu_exhaustive"))
     if insane:
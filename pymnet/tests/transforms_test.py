@@ -1,3 +1,4 @@
+import random
 import sys
 import unittest
 from operator import itemgetter
@@ -252,6 +253,49 @@ class TestTransforms(unittest.TestCase):
         self.assertEqual(an3, transforms.aggregate(an1, 1))
         self.assertEqual(an3, transforms.aggregate(an2, 1))
 
+    def test_aggregate_random(self):
+        def aggregate_by_edges(n, aspects, selfEdges):
+            # A network that already has edges is filled edge by edge
+            an = net.MultilayerNetwork(
+                aspects=n.aspects - len(aspects),
+                fullyInterconnected=n.fullyInterconnected,
+                directed=n.directed,
+            )
+            extra = (-1, -2) + ("z", "z") * an.aspects
+            an[extra] = 1
+            transforms.aggregate(n, aspects, newNet=an, selfEdges=selfEdges)
+            an[extra] = 0
+            return an
+
+        rng = random.Random(42)
+        for weights in [
+            [1, 2, -1, 0.5, None],
+            [1, 2, 3, 2**53 + 1, -(2**62), 2**70],
+            [1, -1, 2**53 + 1, 0.5, -0.5, 2**70, None],
+        ]:
+            for directed in [False, True]:
+                n = net.MultilayerNetwork(
+                    aspects=2, fullyInterconnected=False, directed=directed
+                )
+                for _ in range(300):
+                    edge = (
+                        rng.randrange(10),
+                        rng.randrange(10),
+                        rng.choice("abc"),
+                        rng.choice("abc"),
+                        rng.choice("xy"),
+                        rng.choice("xy"),
+                    )
+                    weight = rng.choice(weights)
+                    n[edge] = rng.random() if weight is None else weight
+                for aspects in [(1,), (2,), (1, 2)]:
+                    for selfEdges in [False, True]:
+                        an = transforms.aggregate(n, aspects, selfEdges=selfEdges)
+                        ran = aggregate_by_edges(n, aspects, selfEdges)
+                        self.assertEqual(len(list(an.edges)), len(list(ran.edges)))
+                        for edge in ran.edges:
+                            self.assertEqual(repr(an[edge[:-1]]), repr(edge[-1]))
+
     def test_normalize_mplex_simple(self):
         n = net.MultiplexNetwork([("categorical", 1.0)])
 
@@ -318,6 +362,46 @@ class TestTransforms(unittest.TestCase):
 
         self.assertEqual(transforms.normalize(self.mplex_nonaligned_simple), n)
 
+    def test_relabel_to_indices(self):
+        newnet, indices, labels = transforms.relabel_to_indices(self.mplex_simple)
+        self.assertEqual(newnet, transforms.normalize(self.mplex_simple))
+        self.assertEqual(indices, [{1: 0, 2: 1, 3: 2, 4: 3}, {1: 0, 2: 1, 3: 2}])
+        self.assertEqual(labels, [[1, 2, 3, 4], [1, 2, 3]])
+
+        n = net.MultilayerNetwork(aspects=2, fullyInterconnected=False, directed=True)
+        n["a", "b", "x", "y", 1, 1] = 2
+        n["b", "c", 1, "y", 2, 1] = 1.5
+        n["c", "a", "x", "x", 2, 2] = 1
+        n.add_node("d", layer=("y", 2))
+        newnet, indices, labels = transforms.relabel_to_indices(n)
+        self.assertEqual(set(newnet), set(range(4)))
+        self.assertEqual(len(list(newnet.edges)), 3)
+        for a in range(3):
+            for name, index in indices[a].items():
+                self.assertEqual(labels[a][index], name)
+        self.assertEqual(
+            set(transforms.restore_labels(newnet.edges, labels)), set(n.edges)
+        )
+        self.assertEqual(
+            set(transforms.restore_labels(newnet.iter_node_layers(), labels)),
+            set(n.iter_node_layers()),
+        )
+        self.assertEqual(list(transforms.restore_labels([3], labels)), ["d"])
+
+        # Views are copied to multilayer networks
+        view = net.SubnetView(n, ["a", "b", "c"], ["x", "y"], [1, 2])
+        newnet, indices, labels = transforms.relabel_to_indices(view)
+        self.assertEqual(type(newnet), net.MultilayerNetwork)
+        self.assertEqual(
+            set(transforms.restore_labels(newnet.edges, labels)), set(view.edges)
+        )
+        view = net.SubnetView(self.mplex_simple, [1, 2, 3], [1, 2])
+        newnet, indices, labels = transforms.relabel_to_indices(view)
+        self.assertEqual(type(newnet), net.MultilayerNetwork)
+        self.assertEqual(
+            set(transforms.restore_labels(newnet.edges, labels)), set(view.edges)
+        )
+
     def test_randomize_nodes_by_layer(self):
         n = transforms.randomize_nodes_by_layer(self.mplex_nonaligned_simple)
         self.assertNotEqual(n, self.mplex_nonaligned_simple)
@@ -435,6 +519,63 @@ class TestTransforms(unittest.TestCase):
             ),
         )
 
+    def test_supra_adjacency_matrix(self):
+        def elementwise_matrix(n, nodes, includeCouplings):
+            m = []
+            for i_index, i in enumerate(nodes):
+                row = []
+                for j_index, j in enumerate(nodes):
+                    if n.aspects == 0:
+                        row.append(n[i][j] if i_index != j_index else 0)
+                    elif includeCouplings or i[1:] == j[1:]:
+                        row.append(n[i][j])
+                    else:
+                        row.append(0)
+                m.append(row)
+            return m
+
+        ordinal = net.MultiplexNetwork([("ordinal", 2.0)], directed=True)
+        ordinal[1, 2, 1] = 1
+        ordinal[2, 3, 2] = 3
+        ordinal[3, 1, 4] = 1
+
+        cnet = net.MultilayerNetwork(aspects=0)
+        cnet["a", "b"] = 0.5
+        cnet["b", "c"] = 2
+        netcoupling = net.MultiplexNetwork([cnet])
+        netcoupling[1, 2, "a"] = 1
+        netcoupling[2, 3, "c"] = 1
+
+        twoaspects = net.MultiplexNetwork(
+            [("categorical", 1.0), ("ordinal", 0.5)], fullyInterconnected=False
+        )
+        twoaspects[1, 2, "a", 1] = 1
+        twoaspects[1, 3, "b", 1] = 1
+        twoaspects[2, 3, "a", 2] = 1
+        twoaspects[1, 3, "a", 2] = 1
+
+        for n in [
+            self.mplex_simple,
+            self.mplex_nonaligned_simple,
+            self.mlayer_example_2d,
+            self.mlayer_example_1d,
+            self.mlayer_example_monoplex,
+            ordinal,
+            netcoupling,
+            twoaspects,
+        ]:
+            for includeCouplings in [True, False]:
+                dense, nodes1 = transforms.supra_adjacency_matrix(
+                    n, includeCouplings=includeCouplings
+                )
+                sparse, nodes2 = transforms.supra_adjacency_matrix(
+                    n, includeCouplings=includeCouplings, sparse=True
+                )
+                self.assertEqual(nodes1, nodes2)
+                m = elementwise_matrix(n, nodes1, includeCouplings)
+                self.assertEqual(dense.tolist(), m)
+                self.assertEqual(sparse.toarray().tolist(), m)
+
 
 def test_transforms():
     suite = unittest.TestSuite()
@@ -443,12 +584,15 @@ def test_transforms():
     suite.addTest(TestTransforms("test_aggregate_2dim_mlayer_nonglobal_nodes"))
     suite.addTest(TestTransforms("test_aggregate_1dim_mlayer_nonglobal_nodes"))
     suite.addTest(TestTransforms("test_aggregate_2dim_mlayer_interlayeredges"))
+    suite.addTest(TestTransforms("test_aggregate_random"))
     suite.addTest(TestTransforms("test_subnet_mlayer_example"))
     suite.addTest(TestTransforms("test_subnet_mplex_simple"))
     suite.addTest(TestTransforms("test_subnet_mplex_to_mlayer"))
     suite.addTest(TestTransforms("test_subnet_different_interconnectivities"))
     suite.addTest(TestTransforms("test_normalize_mplex_simple"))
+    suite.addTest(TestTransforms("test_relabel_to_indices"))
     suite.addTest(TestTransforms("test_randomize_nodes_by_layer"))
+    suite.addTest(TestTransforms("test_supra_adjacency_matrix"))
 
     return unittest.TextTestRunner().run(suite).wasSuccessful()
 
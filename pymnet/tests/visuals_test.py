@@ -236,6 +236,62 @@ class TestVisuals(unittest.TestCase):
         fig = visuals.draw(mplex, layout="fr")
         fig.savefig(os.path.join(self.figdirpath, "mplex_er100_fr.png"))
 
+    def test_fr_layout_repulsion(self):
+        import numpy
+
+        from pymnet import models
+
+        mplex = models.er(50, 2 * [0.1])
+        for repulsion in ["exact", "barnes-hut"]:
+            nc = visuals.layouts.get_fruchterman_reingold_multilayer_layout(
+                mplex, repulsion=repulsion, iterations=10
+            )
+            self.assertEqual(set(nc), set(mplex))
+            nlc = visuals.layouts.get_fruchterman_reingold_multilayer_layout(
+                self.mlayer_nonaligned_aligntest2,
+                alignedNodes=False,
+                repulsion=repulsion,
+                iterations=10,
+            )
+            self.assertEqual(
+                set(nlc), set(self.mlayer_nonaligned_aligntest2.iter_node_layers())
+            )
+            for x, y in list(nc.values()) + list(nlc.values()):
+                self.assertTrue(0 <= x <= 1 and 0 <= y <= 1)
+        self.assertRaises(
+            ValueError,
+            visuals.layouts.get_fruchterman_reingold_multilayer_layout,
+            mplex,
+            repulsion="invalid",
+        )
+
+        # The approximate forces are close to the exact forces, also when most
+        # of the points are in a small cluster
+        rng = numpy.random.RandomState(1)
+        coords = numpy.concatenate(
+            [rng.uniform(size=(1000, 2)), rng.normal(0.5, 0.005, size=(2000, 2))]
+        )
+        exact = visuals.layouts._fr_repulsive_forces_exact(coords, 0.02, 0.01)
+        norms = numpy.sqrt((exact**2).sum(axis=1))
+        approximate = visuals.layouts._fr_repulsive_forces_barnes_hut(
+            coords, 0.02, 0.01
+        )
+        errors = numpy.sqrt(((exact - approximate) ** 2).sum(axis=1))
+        self.assertLess(numpy.median(errors / norms), 0.05)
+        self.assertLess(errors.max(), 0.1 * norms.mean())
+        self.assertLess((errors / norms).max(), 0.5)
+
+        # A smaller theta bounds the error of every force
+        approximate = visuals.layouts._fr_repulsive_forces_barnes_hut(
+            coords, 0.02, 0.01, theta=1 / 3
+        )
+        errors = numpy.sqrt(((exact - approximate) ** 2).sum(axis=1))
+        self.assertLess((errors / norms).max(), 0.05)
+        nc = visuals.layouts.get_fruchterman_reingold_multilayer_layout(
+            mplex, repulsion="barnes-hut", theta=0.5, iterations=10
+        )
+        self.assertEqual(set(nc), set(mplex))
+
 
 def test_visuals():
     suite = unittest.TestSuite()
@@ -248,6 +304,7 @@ def test_visuals():
     suite.addTest(TestVisuals("test_multiaxis"))
     suite.addTest(TestVisuals("test_mplex_networkx_layouts"))
     suite.addTest(TestVisuals("test_mplex_fr_layout"))
+    suite.addTest(TestVisuals("test_fr_layout_repulsion"))
     return unittest.TextTestRunner().run(suite).wasSuccessful()
 
 
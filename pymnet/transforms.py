@@ -3,6 +3,8 @@
 
 import itertools
 import math
+import numbers
+import operator
 import random
 from functools import reduce
 
@@ -80,12 +82,15 @@ def aggregate(net, aspects, newNet=None, selfEdges=False):
     edgeIndices = list(
         filter(lambda x: math.floor(x / 2) not in aspects, range(2 * (net.aspects + 1)))
     )
-    for edge in net.edges:
-        newEdge = []
-        for index in edgeIndices:
-            newEdge.append(edge[index])
-        if selfEdges or not newEdge[0::2] == newEdge[1::2]:
-            newNet[tuple(newEdge)] = newNet[tuple(newEdge)] + edge[-1]
+    if newNet.noEdge == 0 and next(iter(newNet.edges), None) is None:
+        newNet.add_edges(_sum_projected_edges(net, edgeIndices, selfEdges))
+    else:
+        for edge in net.edges:
+            newEdge = []
+            for index in edgeIndices:
+                newEdge.append(edge[index])
+            if selfEdges or not newEdge[0::2] == newEdge[1::2]:
+                newNet[tuple(newEdge)] = newNet[tuple(newEdge)] + edge[-1]
 
     # Add node-layer tuples (if not node-aligned)
     if not net.fullyInterconnected and newNet.aspects > 0:
@@ -106,6 +111,98 @@ def aggregate(net, aspects, newNet=None, selfEdges=False):
     return newNet
 
 
+def _sum_projected_edges(net, edgeIndices, selfEdges):
+    """Returns the edges of net projected to the given indices of the edge
+    tuples, with the weights of the edges that are projected to the same edge
+    summed together and the edges with zero weight left out.
+
+    The projected node-layers are numbered and the weights are summed with a
+    group-by on the numbered pairs, in the order of net.edges. The sums are
+    the same as when adding the weights to an empty network edge by edge:
+    integer weights are summed exactly, and sums that mix integers and floats
+    follow the types given by Python, also after a partial sum of zero, at
+    which the edge is removed.
+    """
+    import numpy
+
+    # The projections always return tuples, also for a single index
+    project_source = operator.itemgetter(*edgeIndices[0::2], -1)
+    project_target = operator.itemgetter(*edgeIndices[1::2], -1)
+    ids = {}
+    sources, targets, weights, intWeights = [], [], [], []
+    for edge in net.edges:
+        source = project_source(edge)[:-1]
+        target = project_target(edge)[:-1]
+        if not selfEdges and source == target:
+            continue
+        sources.append(ids.setdefault(source, len(ids)))
+        targets.append(ids.setdefault(target, len(ids)))
+        weights.append(edge[-1])
+        intWeights.append(isinstance(edge[-1], numbers.Integral))
+
+    sources = numpy.array(sources, dtype=numpy.int64)
+    targets = numpy.array(targets, dtype=numpy.int64)
+    if not net.directed:
+        # Both directions of an undirected edge are the same edge
+        sources, targets = (
+            numpy.minimum(sources, targets),
+            numpy.maximum(sources, targets),
+        )
+    keys, inverse = numpy.unique(sources * len(ids) + targets, return_inverse=True)
+    weights = numpy.array(weights, dtype=object)
+    intWeights = numpy.array(intWeights, dtype=bool)
+    counts = numpy.bincount(inverse, minlength=len(keys))
+    intCounts = numpy.bincount(inverse[intWeights], minlength=len(keys))
+
+    # Integer weights are summed in int64 if the sums cannot overflow, and as
+    # Python ints otherwise
+    intGroups = intCounts == counts
+    isSummed = intGroups[inverse]
+    ints = weights[isSummed]
+    if len(ints) == 0 or max(-ints.min(), ints.max()) * len(ints) < 2**63:
+        ints = ints.astype(numpy.int64)
+    intSums = numpy.zeros(len(keys), dtype=ints.dtype)
+    numpy.add.at(intSums, inverse[isSummed], ints)
+
+    # bincount adds the weights one at a time in the order of the edges, so
+    # the float sums are the same as when adding them to newNet edge by edge
+    isSummed = (intCounts == 0)[inverse]
+    floatSums = numpy.bincount(
+        inverse[isSummed],
+        weights=weights[isSummed].astype(numpy.float64),
+        minlength=len(keys),
+    )
+
+    sums = [
+        intSum if isInt else floatSum
+        for intSum, floatSum, isInt in zip(
+            intSums.tolist(), floatSums.tolist(), intGroups.tolist()
+        )
+    ]
+    # The rare sums of both integers and floats are added edge by edge
+    isMixed = ((intCounts > 0) & ~intGroups)[inverse]
+    for i in numpy.unique(inverse[isMixed]).tolist():
+        sums[i] = 0
+    for i, weight in zip(inverse[isMixed].tolist(), weights[isMixed].tolist()):
+        sums[i] = sums[i] + weight
+        if sums[i] == 0:
+            sums[i] = 0
+
+    nodelayers = [None] * len(ids)
+    for nodelayer, i in ids.items():
+        nodelayers[i] = nodelayer
+    newEdges = []
+    for key, weight in zip(keys.tolist(), sums):
+        if weight != 0:
+            source, target = nodelayers[key // len(ids)], nodelayers[key % len(ids)]
+            newEdge = [source[0], target[0]]
+            for sourceLayer, targetLayer in zip(source[1:], target[1:]):
+                newEdge.extend((sourceLayer, targetLayer))
+            newEdge.append(weight)
+            newEdges.append(tuple(newEdge))
+    return newEdges
+
+
 def overlay_network(net):
     """Returns the overlay network of a multilayer network with 1 aspect.
 
@@ -150,6 +247,10 @@ def subnet(net, nodes, *layers, **kwargs):
         The induced subgraph that contains only nodes given in
         `nodes` and the edges between those nodes that are
         present in `net`. Node properties etc are left untouched.
+
+    See also
+    --------
+    net.SubnetView : A read-only induced subnetwork that is not copied
     """
 
     if "newNet" in kwargs:
@@ -274,7 +375,7 @@ def subnet(net, nodes, *layers, **kwargs):
     return newNet
 
 
-def supra_adjacency_matrix(net, includeCouplings=True):
+def supra_adjacency_matrix(net, includeCouplings=True, sparse=False):
     """Returns the supra-adjacency matrix and a list of node-layer pairs.
 
     Parameters
@@ -282,15 +383,21 @@ def supra_adjacency_matrix(net, includeCouplings=True):
     includeCoupings : bool
        If True, the inter-layer edges are included, if False, only intra-layer
        edges are included.
+    sparse : bool
+       If True, the matrix is returned as a scipy.sparse CSR matrix. This should
+       be used for large networks, as the dense matrix needs memory quadratic in
+       the number of node-layers.
 
     Returns
     -------
-    matrix, nodes : numpy.matrix, list
+    matrix, nodes : numpy.matrix or scipy.sparse.csr_matrix, list
        The supra-adjacency matrix and the list of node-layer pairs. The order
        of the elements in the list and the supra-adjacency matrix are the same.
     """
 
-    return net.get_supra_adjacency_matrix(includeCouplings=includeCouplings)
+    return net.get_supra_adjacency_matrix(
+        includeCouplings=includeCouplings, sparse=sparse
+    )
 
 
 def relabel(net, nodeNames=None, layerNames=None):
@@ -312,15 +419,6 @@ def relabel(net, nodeNames=None, layerNames=None):
         The normalized network.
     """
 
-    def dget(d, e):
-        if e in d:
-            return d[e]
-        else:
-            return e
-
-    def layer_to_indexlayer(layer, layerNames):
-        return tuple([dget(layerNames[i], elayer) for i, elayer in enumerate(layer)])
-
     if nodeNames == None:
         nodeNames = {}
 
@@ -335,14 +433,108 @@ def relabel(net, nodeNames=None, layerNames=None):
         if len(layerNames) < aspect + 1:
             layerNames.append({})
 
-    if type(net) == netmodule.MultilayerNetwork:
-        newNet = netmodule.MultilayerNetwork(
-            aspects=net.aspects,
-            noEdge=net.noEdge,
-            directed=net.directed,
-            fullyInterconnected=net.fullyInterconnected,
-        )
-    elif type(net) == netmodule.MultiplexNetwork:
+    if type(net) not in (netmodule.MultilayerNetwork, netmodule.MultiplexNetwork):
+        raise Exception("Invalid type of net", type(net))
+
+    return _relabeled_copy(
+        net,
+        [
+            lambda labels, names=names: [names.get(e, e) for e in labels]
+            for names in [nodeNames] + layerNames
+        ],
+    )
+
+
+def relabel_to_indices(net):
+    """Returns a copy of the network with nodes and layers relabeled with
+    contiguous integers, and the maps between the labels and the integers.
+
+    In network with n nodes the nodes are renamed so that they run from 0 to n-1,
+    and in aspect a the b_a elementary layers run from 0 to b_a-1. The labels are
+    numbered in sorted order if they can be sorted, so the numbering is the same
+    as in normalize. Algorithms that are faster with dense integer indices can be
+    run on the new network, and their results can be mapped back to the original
+    labels with restore_labels.
+
+    Parameters
+    ----------
+    net : MultilayerNetwork, CSRMultilayerNetwork, or MultiplexNetwork
+       The original network. Views such as SubnetView are also accepted.
+
+    Return
+    ------
+    newnet : MultilayerNetwork, CSRMultilayerNetwork, or MultiplexNetwork
+        The relabeled network. It is a MultiplexNetwork or a
+        CSRMultilayerNetwork if net is one, and a MultilayerNetwork otherwise.
+    indices : list of dicts
+        The maps from node names and (elementary) layer names to indices, one
+        for the nodes followed by one for each aspect.
+    labels : list of lists
+        The node names and (elementary) layer names of the indices, one list
+        for the nodes followed by one for each aspect. That is,
+        labels[a][indices[a][name]] == name.
+
+    See also
+    --------
+    normalize, restore_labels
+    """
+    labels = []
+    for aspect in range(net.aspects + 1):
+        try:
+            labels.append(sorted(net.slices[aspect]))
+        except TypeError:
+            labels.append(list(net.slices[aspect]))
+    indices = [dict(zip(elayers, range(len(elayers)))) for elayers in labels]
+
+    newNet = _relabeled_copy(
+        net,
+        [
+            lambda names, index=index: list(map(index.__getitem__, names))
+            for index in indices
+        ],
+    )
+    return newNet, indices, labels
+
+
+def restore_labels(items, labels):
+    """Iterates over node-layers or edges of a network relabeled with
+    relabel_to_indices with the indices replaced by the original labels.
+
+    Parameters
+    ----------
+    items : iterable
+       Nodes, node-layer tuples (i,s_1,...,s_d), link tuples
+       (i,j,s_1,r_1, ... ,s_d,r_d), or edge tuples with additional values such as
+       weights after the link. Additional values are kept as they are.
+    labels : list of lists
+       The labels returned by relabel_to_indices.
+
+    Examples
+    --------
+    >>> newnet, indices, labels = relabel_to_indices(net)
+    >>> for edge in restore_labels(newnet.edges, labels):
+    ...     print(edge)
+    """
+    d = len(labels)
+    for item in items:
+        if not isinstance(item, tuple):
+            yield labels[0][item]
+        elif len(item) == d:
+            yield tuple(labels[a][e] for a, e in enumerate(item))
+        else:
+            link = tuple(labels[k // 2][e] for k, e in enumerate(item[: 2 * d]))
+            yield link + item[2 * d :]
+
+
+def _relabeled_copy(net, maps):
+    """Returns a copy of the network where the labels in each dimension are
+    changed by the given functions.
+
+    Each function takes a list of labels of the nodes, or of the elementary
+    layers of an aspect, and returns a list of the new labels. The edges are
+    relabeled a column at a time and added to the new network in bulk.
+    """
+    if isinstance(net, netmodule.MultiplexNetwork):
         newNet = netmodule.MultiplexNetwork(
             couplings=net.couplings,
             directed=net.directed,
@@ -350,41 +542,59 @@ def relabel(net, nodeNames=None, layerNames=None):
             fullyInterconnected=net.fullyInterconnected,
         )
     else:
-        raise Exception("Invalid type of net", type(net))
+        # Views and other subclasses cannot be constructed from these
+        # parameters, so they are copied to plain multilayer networks
+        if isinstance(net, netmodule.CSRMultilayerNetwork):
+            networkType = netmodule.CSRMultilayerNetwork
+        else:
+            networkType = netmodule.MultilayerNetwork
+        newNet = networkType(
+            aspects=net.aspects,
+            noEdge=net.noEdge,
+            directed=net.directed,
+            fullyInterconnected=net.fullyInterconnected,
+        )
 
-    for node in net:
-        newNet.add_node(dget(nodeNames, node))
+    for node in maps[0](list(net)):
+        newNet.add_node(node)
     for aspect in range(net.aspects):
-        for layer in net.slices[aspect + 1]:
-            newNet.add_layer(dget(layerNames[aspect], layer), aspect=aspect + 1)
+        for layer in maps[aspect + 1](list(net.slices[aspect + 1])):
+            newNet.add_layer(layer, aspect=aspect + 1)
 
     if not net.fullyInterconnected:
-        for nodelayer in net.iter_node_layers():
-            layer = layer_to_indexlayer(nodelayer[1:], layerNames)
-            if net.aspects == 1:
-                layer = layer[0]
-            newNet.add_node(dget(nodeNames, nodelayer[0]), layer=layer)
-
-    if type(net) == netmodule.MultilayerNetwork:
-        for edge in net.edges:
-            newedge = [dget(nodeNames, edge[0]), dget(nodeNames, edge[1])]
-            for aspect in range(net.aspects):
-                newedge.append(dget(layerNames[aspect], edge[2 + aspect * 2]))
-                newedge.append(dget(layerNames[aspect], edge[2 + aspect * 2 + 1]))
-            newNet[tuple(newedge)] = edge[-1]
-    elif type(net) == netmodule.MultiplexNetwork:
+        nodelayers = list(zip(*net.iter_node_layers()))
+        if len(nodelayers) > 0:
+            nodes = maps[0](nodelayers[0])
+            layers = [maps[a](nodelayers[a]) for a in range(1, net.aspects + 1)]
+            for node, layer in zip(nodes, zip(*layers)):
+                newNet.add_node(node, layer=layer[0] if net.aspects == 1 else layer)
+
+    if isinstance(net, netmodule.MultiplexNetwork):
+        # Only the intra-layer edges are copied, the couplings follow the layers
+        columns = [[] for i in range(net.aspects + 3)]
         for layer in net.iter_layers():
-            if net.aspects == 1:
-                layertuple = (layer,)
-            else:
-                layertuple = layer
-            for node in net.A[layer]:
-                for neigh in net.A[layer][node]:
-                    newNet[
-                        (dget(nodeNames, node), dget(nodeNames, neigh))
-                        + layer_to_indexlayer(layertuple, layerNames)
-                    ] = net[(node, neigh) + layertuple]
-
+            layertuple = (layer,) if net.aspects == 1 else layer
+            for edge in net.A[layer].edges:
+                for k, e in enumerate(edge[:2] + layertuple + edge[-1:]):
+                    columns[k].append(e)
+        # Both ends of the intra-layer links are on the same layer
+        columns = (
+            columns[:2]
+            + [column for column in columns[2:-1] for i in range(2)]
+            + columns[-1:]
+        )
+    else:
+        columns = list(map(list, zip(*net.edges)))
+
+    if len(columns) > 0 and len(columns[-1]) > 0:
+        links = [maps[k // 2](column) for k, column in enumerate(columns[:-1])]
+        newNet.add_edges(
+            node1=links[0],
+            node2=links[1],
+            layer1=links[2] if net.aspects == 1 else links[2::2],
+            layer2=links[3] if net.aspects == 1 else links[3::2],
+            weight=columns[-1],
+        )
     return newNet
 
 
@@ -1,6 +1,8 @@
 """Module for creating network layouts.
 """
 
+import functools
+import itertools
 import math
 import random
 
@@ -104,6 +106,8 @@ def get_fruchterman_reingold_multilayer_layout(
     fixedNodes=None,
     fixedNodeLayers=None,
     iterations=100,
+    repulsion="exact",
+    theta=1.0,
 ):
     """A multilayer version of the Fructherman-Reingold algorithm for network layouts.
 
@@ -141,6 +145,25 @@ def get_fruchterman_reingold_multilayer_layout(
        set is recommended for speed when the number of elements is large.
     iterations : int
        The number of times the nodes/node-layer tuples are moved.
+    repulsion : string
+       The way the repulsive forces are computed. If "exact", the forces between
+       all pairs of nodes are computed. If "barnes-hut", the forces from distant
+       nodes are approximated with the forces from the centers of mass of cells in
+       a hierarchy of grids. The time per iteration then grows as n log n
+       instead of n**2 in the number of nodes n.
+    theta : float
+       The accuracy of the "barnes-hut" repulsion. The cells whose forces are
+       approximated are at least 1/theta cell widths away from the nodes. The
+       errors of most forces are of the order of a percent with the default
+       value of 1, but they can be much larger for nodes whose forces nearly
+       cancel. Smaller values are more accurate and slower.
+
+    Notes
+    -----
+    The coordinates are kept in numpy arrays and the forces are computed for all
+    the nodes at once. Nodes that share several layers repulse each other once for
+    each shared layer, so the repulsive forces are computed separately within each
+    layer.
     """
 
     # Parsing parameters and sanity check for them
@@ -202,127 +225,237 @@ def get_fruchterman_reingold_multilayer_layout(
     if fixedNodeLayers == None:
         fixedNodeLayers = set()
 
+    if repulsion == "exact":
+        repulsive_forces = _fr_repulsive_forces_exact
+    elif repulsion == "barnes-hut":
+        assert theta > 0
+        repulsive_forces = functools.partial(
+            _fr_repulsive_forces_barnes_hut, theta=theta
+        )
+    else:
+        raise ValueError("Invalid repulsion: " + str(repulsion))
+
     # Parsing complete
 
+    import numpy
+
+    # The coordinates are rows of an array, and the springs and the groups of
+    # mutually repulsive points are given as indices to the rows
+    if alignedNodes:
+        points = list(nc)
+        index = dict(zip(points, range(len(points))))
+        coords = numpy.array([nc[node] for node in points], dtype=float)
+        fixed = numpy.array([node in fixedNodes for node in points], dtype=bool)
+        springs = [
+            (index[edge[0]], index[edge[1]]) for edge in net.edges if edge[0] != edge[1]
+        ]
+        minSpringDist = 0.0
+        groups = {}
+        for nl in net.iter_node_layers():
+            groups.setdefault(nl[1:], []).append(index[nl[0]])
+    else:
+        points = list(nlc)
+        index = dict(zip(points, range(len(points))))
+        coords = numpy.array([nlc[nl] for nl in points], dtype=float)
+        fixed = numpy.array([nl in fixedNodeLayers for nl in points], dtype=bool)
+        springs = [
+            tuple(index[nl] for nl in net._link_to_nodes(edge[:-1]))
+            for edge in net.edges
+        ]
+        minSpringDist = 0.01
+        groups = {}
+        for nl in points:
+            groups.setdefault(nl[1:], []).append(index[nl])
+    springs = numpy.array(springs, dtype=numpy.int64).reshape(-1, 2)
+    groups = [numpy.array(group, dtype=numpy.int64) for group in groups.values()]
+    moving = ~fixed
+
     # Some internal parameters
     temperature = 0.1 * max(boxSize)
     delta_temperature = temperature / float(iterations)
     min_dist = 0.01
 
     for iteration in range(iterations):
-        if alignedNodes:  # we have coordinates for nodes
-            delta_nc = dict(((k, (0.0, 0.0)) for k in nc))
-            # Spring forces
-            for edge in net.edges:
-                node1 = edge[0]
-                node2 = edge[1]
-                if node1 != node2:
-                    diff = (nc[node1][0] - nc[node2][0], nc[node1][1] - nc[node2][1])
-                    dist = math.sqrt(diff[0] ** 2 + diff[1] ** 2)
-                    c = dist / float(nodeDist)
-                    delta_nc[node1] = (
-                        delta_nc[node1][0] - c * diff[0],
-                        delta_nc[node1][1] - c * diff[1],
-                    )
-                    delta_nc[node2] = (
-                        delta_nc[node2][0] + c * diff[0],
-                        delta_nc[node2][1] + c * diff[1],
-                    )
-
-            # Repulsive forces
-            for node1 in net:
-                for node2 in net:
-                    if node1 != node2:
-                        layer_overlap = len(
-                            net._nodeToLayers[node1].intersection(
-                                net._nodeToLayers[node2]
-                            )
-                        )
-                        diff = (
-                            nc[node1][0] - nc[node2][0],
-                            nc[node1][1] - nc[node2][1],
-                        )
-                        dist = math.sqrt(diff[0] ** 2 + diff[1] ** 2)
-                        dist = max(dist, min_dist)
-                        c = layer_overlap * nodeDist**2 / float(dist**2)
-                        delta_nc[node1] = (
-                            delta_nc[node1][0] + c * diff[0],
-                            delta_nc[node1][1] + c * diff[1],
-                        )
-                        delta_nc[node2] = (
-                            delta_nc[node2][0] - c * diff[0],
-                            delta_nc[node2][1] - c * diff[1],
-                        )
-
-            # Normalize coordinate, and apply them
-            # for node,(x,y) in delta_nc.iteritems():
-            for node in delta_nc:
-                x, y = delta_nc[node]
-                if node not in fixedNodes:
-                    delta_len = math.sqrt(x**2 + y**2)
-                    nc[node] = (
-                        nc[node][0] + temperature * delta_len * x,
-                        nc[node][1] + temperature * delta_len * y,
-                    )
-            normalize_coordinates(nc, boxSize, inplace=True)
-
-        else:  # we have coordinates for node-layer tuples
-
-            # There is currently a lot of code dublication here when compared to the
-            # case where nodes are aligned. Some of this should be removed, and some
-            # of it will probably disappear once the code is optimized a bit.
-
-            delta_nlc = dict(((k, (0.0, 0.0)) for k in nlc))
-            # Spring forces
-            for edge in net.edges:
-                nl1, nl2 = net._link_to_nodes(edge[:-1])
-                diff = (nlc[nl1][0] - nlc[nl2][0], nlc[nl1][1] - nlc[nl2][1])
-                dist = math.sqrt(diff[0] ** 2 + diff[1] ** 2)
-                dist = max(dist, min_dist)
-                c = dist / float(nodeDist)
-                delta_nlc[nl1] = (
-                    delta_nlc[nl1][0] - c * diff[0],
-                    delta_nlc[nl1][1] - c * diff[1],
-                )
-                delta_nlc[nl2] = (
-                    delta_nlc[nl2][0] + c * diff[0],
-                    delta_nlc[nl2][1] + c * diff[1],
-                )
+        # Spring forces
+        diff = coords[springs[:, 0]] - coords[springs[:, 1]]
+        dist = numpy.sqrt((diff**2).sum(axis=1))
+        c = numpy.maximum(dist, minSpringDist) / float(nodeDist)
+        delta = numpy.zeros_like(coords)
+        for axis in range(2):
+            delta[:, axis] += numpy.bincount(
+                springs[:, 1], weights=c * diff[:, axis], minlength=len(coords)
+            ) - numpy.bincount(
+                springs[:, 0], weights=c * diff[:, axis], minlength=len(coords)
+            )
 
-            # Repulsive forces
-            for nl1 in net.iter_node_layers():
-                layer = nl1[1:][0] if net.aspects == 1 else nl1[1:]
-                for node2 in net.iter_nodes(layer=layer):
-                    nl2 = (node2,) + nl1[1:]
-                    if nl1 != nl2:
-                        diff = (nlc[nl1][0] - nlc[nl2][0], nlc[nl1][1] - nlc[nl2][1])
-                        dist = math.sqrt(diff[0] ** 2 + diff[1] ** 2)
-                        dist = max(dist, min_dist)
-                        c = nodeDist**2 / float(dist**2)
-                        delta_nlc[nl1] = (
-                            delta_nlc[nl1][0] + c * diff[0],
-                            delta_nlc[nl1][1] + c * diff[1],
-                        )
-                        delta_nlc[nl2] = (
-                            delta_nlc[nl2][0] - c * diff[0],
-                            delta_nlc[nl2][1] - c * diff[1],
-                        )
-
-            # Normalize coordinate, and apply them
-            # for nl,(x,y) in delta_nlc.iteritems():
-            for nl in delta_nlc:
-                x, y = delta_nlc[nl]
-                if nl not in fixedNodeLayers:
-                    delta_len = math.sqrt(x**2 + y**2)
-                    nlc[nl] = (
-                        nlc[nl][0] + temperature * delta_len * x,
-                        nlc[nl][1] + temperature * delta_len * y,
-                    )
-            normalize_coordinates(nlc, boxSize, inplace=True)
+        # Repulsive forces
+        for group in groups:
+            delta[group] += repulsive_forces(coords[group], nodeDist, min_dist)
+
+        # Normalize coordinate, and apply them
+        delta_len = numpy.sqrt((delta**2).sum(axis=1))
+        coords[moving] += temperature * (delta_len[:, None] * delta)[moving]
+        low = coords.min(axis=0)
+        coords = (coords - low) / (coords.max(axis=0) - low)
 
         temperature -= delta_temperature
 
-    if alignedNodes:
-        return nc
+    return dict(zip(points, map(tuple, coords.tolist())))
+
+
+def _fr_repulsive_forces_exact(coords, nodeDist, min_dist):
+    """Return the repulsive forces between all pairs of the points in the
+    Fruchterman-Reingold layout.
+
+    Each pair of points is counted twice, once in both orders, as in the original
+    version of the algorithm.
+    """
+    import numpy
+
+    x, y = coords[:, 0], coords[:, 1]
+    force = numpy.zeros_like(coords)
+    # Compute the pairwise differences for a block of rows at a time
+    blockSize = max(1, 2**20 // len(coords))
+    for start in range(0, len(coords), blockSize):
+        block = slice(start, start + blockSize)
+        diffX = x[block, None] - x[None, :]
+        diffY = y[block, None] - y[None, :]
+        c = 1.0 / numpy.maximum(diffX**2 + diffY**2, min_dist**2)
+        force[block, 0] = (c * diffX).sum(axis=1)
+        force[block, 1] = (c * diffY).sum(axis=1)
+    return 2 * nodeDist**2 * force
+
+
+def _fr_repulsive_forces_barnes_hut(coords, nodeDist, min_dist, theta=1.0):
+    """Return approximate repulsive forces between the points in the
+    Fruchterman-Reingold layout.
+
+    The bounding box of the points is divided into a hierarchy of grids with
+    2**level cells in both directions. Two cells are neighbors if they are at
+    most r = ceil(1 / theta) cells apart in both directions. At each level, each
+    point is repulsed by the centers of mass of the cells that are neighbors of
+    the parent of its own cell but not neighbors of its own cell. The grids are
+    refined until there are only a few points per cell, and at the finest level
+    the forces from the points in the neighboring cells are computed exactly.
+
+    The cells approximated by their centers of mass are thus at least r cell
+    widths away from the cell of the point, so theta bounds the ratio of the
+    cell width to the distance as in the opening criterion of the Barnes-Hut
+    algorithm. The error of the force on a point is at most of the order of
+    theta**2 times the forces from the distant cells, but it can be large
+    compared to the total force on a point where the forces from different
+    directions nearly cancel. With theta=1 the median error is about a percent
+    of the force or less, but the error of a few points at the edges of dense
+    clusters can be tens of percents. Halving theta reduces the errors by a
+    factor of two to four, and multiplies the number of cells each point
+    interacts with, and the running time, by about two to four.
+    """
+    import numpy
+
+    n = len(coords)
+    if n <= 500:
+        return _fr_repulsive_forces_exact(coords, nodeDist, min_dist)
+
+    x, y = coords[:, 0], coords[:, 1]
+    forceX, forceY = numpy.zeros(n), numpy.zeros(n)
+    low = coords.min(axis=0)
+    size = max((coords.max(axis=0) - low).max(), min_dist)
+    unitX, unitY = (x - low[0]) / size, (y - low[1]) / size
+
+    def add_forces(points, sourceX, sourceY, weights):
+        diffX, diffY = x[points] - sourceX, y[points] - sourceY
+        c = weights / numpy.maximum(diffX**2 + diffY**2, min_dist**2)
+        forceX[:] += numpy.bincount(points, weights=c * diffX, minlength=n)
+        forceY[:] += numpy.bincount(points, weights=c * diffY, minlength=n)
+
+    r = int(math.ceil(1.0 / theta))
+    allPoints = numpy.arange(n)
+    # Cell indices at level 30 still fit in int64
+    for level in range(2, 31):
+        cells = 2**level
+        cellX = numpy.minimum((unitX * cells).astype(numpy.int64), cells - 1)
+        cellY = numpy.minimum((unitY * cells).astype(numpy.int64), cells - 1)
+        # Only the non-empty cells are stored, in the order of their ids
+        cellIds, inverse, mass = numpy.unique(
+            cellX * cells + cellY, return_inverse=True, return_counts=True
+        )
+        centerX = numpy.bincount(inverse, weights=x) / mass
+        centerY = numpy.bincount(inverse, weights=y) / mass
+
+        if cells**2 <= 16 * n:
+            # Small grids are looked up from a table of all cells
+            table = numpy.full(cells**2, -1)
+            table[cellIds] = numpy.arange(len(cellIds))
+
+        def find_cells(points, otherX, otherY):
+            """Return the points whose other cell is non-empty, and the index
+            of the other cell."""
+            otherIds = otherX * cells + otherY
+            if cells**2 <= 16 * n:
+                index = table[otherIds]
+                found = index >= 0
+            else:
+                index = numpy.searchsorted(cellIds, otherIds)
+                index = numpy.minimum(index, len(cellIds) - 1)
+                found = cellIds[index] == otherIds
+            return points[found], index[found]
+
+        # The cells that are within the neighbors of the parent cell, and
+        # whether they are in the grid or neighbors of the cell of the point
+        otherX = [2 * (cellX // 2) - 2 * r + i for i in range(4 * r + 2)]
+        otherY = [2 * (cellY // 2) - 2 * r + i for i in range(4 * r + 2)]
+        inGridX = [(other >= 0) & (other < cells) for other in otherX]
+        inGridY = [(other >= 0) & (other < cells) for other in otherY]
+        nearX = [numpy.abs(other - cellX) <= r for other in otherX]
+        nearY = [numpy.abs(other - cellY) <= r for other in otherY]
+        for i in range(4 * r + 2):
+            points, others = [], []
+            for j in range(4 * r + 2):
+                valid = inGridX[i] & inGridY[j] & ~(nearX[i] & nearY[j])
+                found = find_cells(allPoints[valid], otherX[i][valid], otherY[j][valid])
+                points.append(found[0])
+                others.append(found[1])
+            others = numpy.concatenate(others)
+            add_forces(
+                numpy.concatenate(points),
+                centerX[others],
+                centerY[others],
+                mass[others],
+            )
+
+        # Points closer than min_dist repulse each other with a force that is
+        # linear in their distance, so when the neighboring cells are that close
+        # the forces from them are exactly the forces from their centers of mass
+        nearCenters = (r + 1) * math.sqrt(2) * size / cells <= min_dist
+        if nearCenters or (mass**2).sum() <= 4 * n:
+            break
+
+    # The forces from the neighboring cells at the finest level
+    points, others = [], []
+    for i, j in itertools.product(range(-r, r + 1), repeat=2):
+        valid = (
+            (cellX + i >= 0)
+            & (cellX + i < cells)
+            & (cellY + j >= 0)
+            & (cellY + j < cells)
+        )
+        found = find_cells(allPoints[valid], cellX[valid] + i, cellY[valid] + j)
+        points.append(found[0])
+        others.append(found[1])
+    points, others = numpy.concatenate(points), numpy.concatenate(others)
+    if nearCenters:
+        add_forces(points, centerX[others], centerY[others], mass[others])
     else:
-        return nlc
+        order = numpy.argsort(inverse, kind="stable")
+        first = numpy.cumsum(mass) - mass
+        counts = mass[others]
+        points = numpy.repeat(points, counts)
+        # The position of each pair among the pairs of its point
+        positions = numpy.arange(len(points)) - numpy.repeat(
+            numpy.cumsum(counts) - counts, counts
+        )
+        neighbors = order[numpy.repeat(first[others], counts) + positions]
+        add_forces(points, x[neighbors], y[neighbors], 1.0)
+
+    force = numpy.stack([forceX, forceY], axis=1)
+    return 2 * nodeDist**2 * force